@@ -0,0 +1,108 @@
+"""
+Benchmark of the constraint parser on long constraints.
+
+Usage: PYTHONPATH=. python benchmarks/ast_parser.py [--repeat N] [--sizes 100,1000,...]
+                                                     [--baseline REVISION]
+
+The time per element must remain roughly constant as the constraints grow,
+since the parser is linear in the input length.
+
+With --baseline, the parser of famapy/core/models/ast.py at that git revision
+(e.g. the commit before the linear parser, 7173468^) is timed on the same
+constraints, and the speedup of the current parser over it is reported. The
+constraints have no parentheses then, since that parser fails on parenthesized
+groups inside a chain of operators.
+"""
+import argparse
+import random
+import subprocess
+import timeit
+from types import ModuleType
+from typing import Any, Optional
+
+from famapy.core.models.ast import AST, ASTINFO
+
+
+def generate_constraint(
+    number_of_features: int,
+    seed: int = 0,
+    parentheses: bool = True
+) -> str:
+    generator = random.Random(seed)
+    binary_operators = ASTINFO.get_binary_operators()
+    elements = []
+
+    for idx in range(number_of_features):
+        if idx:
+            elements.append(generator.choice(binary_operators))
+        feature = f'F{idx}'
+        if generator.random() < 0.2:
+            feature = f'not {feature}'
+        if parentheses and generator.random() < 0.1:
+            feature = f'({feature} and G{idx})'
+        elements.append(feature)
+
+    return ' '.join(elements)
+
+
+def load_baseline(revision: str) -> ModuleType:
+    """ The ast module at the git revision, which must not import other famapy modules """
+
+    source = subprocess.run(
+        ['git', 'show', f'{revision}:famapy/core/models/ast.py'],
+        capture_output=True, check=True, text=True
+    ).stdout
+    module = ModuleType('baseline_ast')
+    exec(compile(source, f'<ast.py at {revision}>', 'exec'), module.__dict__)
+    return module
+
+
+def time_parser(parser: Any, constraint: str, repeat: int) -> Optional[float]:
+    """ Best time of parsing the constraint, None if the parser fails on it """
+
+    try:
+        return min(timeit.repeat(lambda: parser(constraint), number=1, repeat=repeat))
+    except (RecursionError, IndexError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='AST parser benchmark')
+    parser.add_argument('--repeat', default=5, type=int, help='Repetitions per size. Default: 5')
+    parser.add_argument(
+        '--sizes',
+        default='10,100,250,500,750',
+        type=str,
+        help='Comma separated number of features per constraint. Default: 10,100,250,500,750'
+    )
+    parser.add_argument(
+        '--baseline',
+        default=None,
+        type=str,
+        help='Git revision of a parser to compare with, e.g. 7173468^. Default: none'
+    )
+    args = parser.parse_args()
+    baseline = load_baseline(args.baseline) if args.baseline else None
+
+    header = f'{"features":>10} {"elements":>10} {"seconds":>12} {"us/element":>12}'
+    if baseline is not None:
+        header += f' {"baseline":>12} {"speedup":>10}'
+    print(header)
+
+    for size in (int(size) for size in args.sizes.split(',')):
+        constraint = generate_constraint(size, parentheses=baseline is None)
+        elements = len(AST(constraint).list)
+        seconds = min(timeit.repeat(lambda: AST(constraint), number=1, repeat=args.repeat))
+        line = f'{size:>10} {elements:>10} {seconds:>12.6f} {seconds / elements * 1e6:>12.2f}'
+
+        if baseline is not None:
+            baseline_seconds = time_parser(baseline.AST, constraint, args.repeat)
+            if baseline_seconds is None:
+                line += f' {"failed":>12} {"-":>10}'
+            else:
+                line += f' {baseline_seconds:>12.6f} {baseline_seconds / seconds:>9.1f}x'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark of the bulk constraint parser.
+
+Usage: PYTHONPATH=. python benchmarks/bulk_parser.py [--constraints N] [--workers 1,2,4,...]
+
+Compares the number of workers: the ASTs are pickled back to the main process,
+so more than one worker only pays off with several cores. On a single core, 2
+and 4 workers are slower than 1.
+"""
+import argparse
+import os
+import random
+import time
+
+from benchmarks.ast_parser import generate_constraint
+from famapy.core.models.ast import parse_constraints
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Bulk constraint parser benchmark')
+    parser.add_argument(
+        '--constraints', default=50000, type=int, help='Number of constraints. Default: 50000'
+    )
+    parser.add_argument(
+        '--workers',
+        default=','.join(str(2 ** idx) for idx in range((os.cpu_count() or 1).bit_length())),
+        type=str,
+        help='Comma separated number of workers. Default: powers of 2 up to the cores'
+    )
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    constraints = [
+        generate_constraint(generator.randint(2, 12), seed=idx)
+        for idx in range(args.constraints)
+    ]
+
+    print(f'{"workers":>10} {"seconds":>12} {"us/constraint":>14}')
+    for workers in (int(workers) for workers in args.workers.split(',')):
+        start = time.perf_counter()
+        parse_constraints(constraints, workers=workers)
+        seconds = time.perf_counter() - start
+        print(f'{workers:>10} {seconds:>12.6f} {seconds / len(constraints) * 1e6:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
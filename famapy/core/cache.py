@@ -0,0 +1,310 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import ChainMap
+from pathlib import Path
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import (
+    Any, Callable, Generator, Iterable, List, MutableMapping, Optional, Tuple, Union
+)
+
+from famapy.core.utils import LRUCache
+
+
+class ResultCache:
+    '''
+    Results of operations, addressed by a hash of everything they depend on: the content
+    of the model, the plugin (its name, version and source code), the operation and its
+    parameters. A result is computed again only if one of them changes; editing any file
+    of a plugin invalidates all its results.
+
+    Results are kept in memory (an LRU of maxsize entries) and, if a directory is given,
+    pickled on disk, so they survive between processes (e.g. runs of a CI). When the files
+    take more than max_disk_size bytes, the least recently used ones are deleted. Results
+    that cannot be pickled are only kept in memory.
+
+    Both tiers keep the results pickled, so every hit returns a new copy that the caller
+    may change. The directory must be trusted: loading a pickle can run arbitrary code.
+    '''
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        maxsize: int = 1024,
+        max_disk_size: int = 256 * 1024 * 1024
+    ) -> None:
+
+        # pickled results, or the result in a tuple if it cannot be pickled
+        self.memory: LRUCache[str, Union[bytes, Tuple[Any]]] = LRUCache(maxsize)
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_size = max_disk_size
+        self.disk_size: Optional[int] = None  # computed when the first result is stored
+        self.fingerprints: dict[str, str] = {}
+
+    def get_key(
+        self,
+        fingerprint: str,
+        operation: str,
+        model_digest: str,
+        parameters: Optional[dict[str, Any]] = None
+    ) -> str:
+        """ Hash of a result; the parameters must have a repr that does not change """
+
+        content = repr((fingerprint, operation, model_digest, sorted((parameters or {}).items())))
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get_fingerprint(self, module: ModuleType) -> str:
+        """ Hash of the name, version and source files of a plugin, computed once """
+
+        name = module.__name__
+        if name not in self.fingerprints:
+            self.fingerprints[name] = plugin_fingerprint(module)
+        return self.fingerprints[name]
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """ The result with the key, computed and stored if it is not cached """
+
+        cached = self.memory.get(key)
+        if cached is None:
+            cached = self.load(key)
+        if isinstance(cached, tuple):
+            return cached[0]
+        if cached is not None:
+            loaded = unpickle(cached)
+            if loaded is not None:
+                self.memory.put(key, cached)
+                return loaded[0]
+
+        result = compute()
+        # results are pickled in a tuple, so a cached None is not a miss
+        try:
+            content = pickle.dumps((result,))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self.memory.put(key, (result,))
+            return result
+        self.memory.put(key, content)
+        self.store(key, content)
+        return result
+
+    def get_path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / key[:2] / f'{key}.pickle'
+
+    def load(self, key: str) -> Optional[bytes]:
+
+        if self.directory is None:
+            return None
+
+        path = self.get_path(key)
+        try:
+            content = path.read_bytes()
+            os.utime(path)  # the modification time orders the eviction
+        except OSError:
+            return None
+        return content
+
+    def store(self, key: str, content: bytes) -> None:
+
+        if self.directory is None or len(content) > self.max_disk_size:
+            return
+
+        path = self.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.disk_size is not None and path.exists():
+            # the result is replaced, so its previous size no longer counts
+            self.disk_size -= path.stat().st_size
+        # written to a temporary file first, so other processes never read half a result
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(content)
+        os.replace(temporary, path)
+
+        if self.disk_size is None:
+            self.disk_size = sum(size for _, size, _ in self.iter_files())
+        else:
+            self.disk_size += len(content)
+        if self.disk_size > self.max_disk_size:
+            self.evict()
+
+    def iter_files(self) -> list[tuple[float, int, Path]]:
+        """ Modification time, size and path of the results on disk """
+
+        assert self.directory is not None
+        files = []
+        for path in self.directory.glob('*/*.pickle'):
+            try:
+                status = path.stat()
+            except OSError:
+                continue
+            files.append((status.st_mtime, status.st_size, path))
+        return files
+
+    def evict(self) -> None:
+        """ Deletes the least recently used results until they fit in max_disk_size """
+
+        files = sorted(self.iter_files())
+        size = sum(item[1] for item in files)
+        for _, file_size, path in files:
+            if size <= self.max_disk_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= file_size
+        self.disk_size = size
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.fingerprints.clear()
+        if self.directory is not None:
+            for _, _, path in self.iter_files():
+                path.unlink(missing_ok=True)
+            self.disk_size = 0
+
+
+def plugin_fingerprint(module: ModuleType) -> str:
+    """
+    Hash of the name, the version and the source files of the package of a plugin, and of
+    the source files of famapy.core, as plugins inherit the implementations it provides
+    """
+
+    digest = hashlib.sha256(module.__name__.encode())
+    digest.update(str(getattr(module, '__version__', '')).encode())
+
+    # the files are named relative to the package, so moving it keeps the fingerprint
+    roots = [Path(path) for path in getattr(module, '__path__', [])]
+    files = [(root, file) for root in roots for file in sorted(root.rglob('*.py'))]
+    if not roots and getattr(module, '__file__', None):
+        files = [(Path(str(module.__file__)).parent, Path(str(module.__file__)))]
+
+    core = Path(__file__).parent
+    files += [(core.parent, file) for file in sorted(core.rglob('*.py'))]
+
+    for root, file in files:
+        digest.update(file.relative_to(root).as_posix().encode())
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def unpickle(content: bytes) -> Optional[Tuple[Any]]:
+    try:
+        cached = pickle.loads(content)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError):
+        return None
+    return cached if isinstance(cached, tuple) and len(cached) == 1 else None
+
+
+def model_digest(model: Any) -> Optional[str]:
+    """
+    Hash of the content of the model, None if it cannot be pickled. It does not depend on
+    the order of sets or dicts, so it is the same in every process whatever the hash seed.
+    """
+
+    parts: List[str] = []
+    try:
+        run(canonical_form(model, {}, {}, parts))
+    except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+        return None
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+    return digest.hexdigest()
+
+
+# step of the canonical form: a generator that yields the steps of the values it contains,
+# which are written before it continues
+Step = Generator[Any, None, None]
+
+
+def canonical_form(
+    value: Any,
+    memo: dict[int, Tuple[int, Any]],
+    outer: MutableMapping[int, Tuple[int, Any]],
+    parts: List[str]
+) -> Step:
+    """
+    Writes the types and contents of the objects reached from the value, following the
+    same protocol as pickle (__reduce_ex__). The items of sets and dicts are sorted by
+    their own canonical form. Objects reached again are replaced by the order in which
+    they were first reached, so shared and cyclic references are kept.
+
+    The canonical form of an item to sort starts a memo of its own, and the objects of
+    the outer memo are written as references to them, so it never goes around a cycle.
+    """
+
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        parts.append(repr(value))
+        return
+    if isinstance(value, (type, FunctionType, BuiltinFunctionType)):
+        name = f'{value.__module__}.{value.__qualname__}'
+        if '<' in name:
+            raise pickle.PicklingError(f'{name} is not importable')
+        parts.append(f'global({name})')
+        return
+
+    if id(value) in memo:
+        parts.append(f'reference({memo[id(value)][0]})')
+        return
+    if id(value) in outer:
+        parts.append(f'outer({outer[id(value)][0]})')
+        return
+    # the value is kept in the memo, so its id is not reused during the traversal
+    memo[id(value)] = (len(memo), value)
+
+    def sort(items: Iterable[Any], key: Callable[[Any], Any] = lambda item: item) -> Step:
+        # the sorted items are left in keyed, once the steps that write their keys are done
+        for item in items:
+            key_parts: List[str] = []
+            yield canonical_form(key(item), {}, ChainMap(memo, outer), key_parts)
+            keyed.append((''.join(key_parts), item))
+        keyed.sort(key=lambda pair: pair[0])
+
+    keyed: List[Tuple[str, Any]] = []
+    kind = type(value).__qualname__
+    if type(value) in (list, tuple, set, frozenset, dict):
+        parts.append(f'{kind}(')
+        if type(value) in (list, tuple):
+            items = list(value)
+        elif type(value) is dict:
+            yield from sort(value.items(), key=lambda item: item[0])
+            items = [part for _, item in keyed for part in item]
+        else:
+            yield from sort(value)
+            items = [item for _, item in keyed]
+        for item in items:
+            yield canonical_form(item, memo, outer, parts)
+            parts.append(',')
+        parts.append(')')
+        return
+
+    reduced = value.__reduce_ex__(pickle.DEFAULT_PROTOCOL)
+    if isinstance(reduced, str):
+        parts.append(f'global({type(value).__module__}.{reduced})')
+        return
+    function, arguments, state, list_items, dict_items = (tuple(reduced) + (None,) * 5)[:5]
+    parts.append('object(')
+    for item in (function, arguments, state, list(list_items or ()), dict(dict_items or ())):
+        yield canonical_form(item, memo, outer, parts)
+        parts.append(',')
+    parts.append(')')
+
+
+def run(step: Step) -> None:
+    """ Runs the step and the ones it yields, without recursion """
+
+    stack = [step]
+    while stack:
+        try:
+            stack.append(next(stack[-1]))
+        except StopIteration:
+            stack.pop()
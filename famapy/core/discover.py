@@ -3,17 +3,21 @@ import logging
 from importlib import import_module
 from pkgutil import iter_modules
 from types import ModuleType
-from typing import Any, Type
+from typing import Any, Iterable, Iterator, Optional, Type, cast
 
+from famapy.core.cache import ResultCache, file_digest, model_digest
 from famapy.core.config import PLUGIN_PATHS
-from famapy.core.models import VariabilityModel
-from famapy.core.operations import Operation
+from famapy.core.models import Configuration, VariabilityModel
+from famapy.core.operations import Operation, Products
+from famapy.core.operations.products import ProductsPage
 from famapy.core.plugins import (
     Operations,
     Plugin,
     Plugins
 )
+from famapy.core.session import AnalysisSession
 from famapy.core.transformations import Transformation
+from famapy.core.utils import extract_filename_extension
 
 
 LOGGER = logging.getLogger('discover')
@@ -31,9 +35,10 @@ def filter_modules_from_plugin_paths() -> list[ModuleType]:
 
 
 class DiscoverMetamodels:
-    def __init__(self) -> None:
+    def __init__(self, cache: Optional[ResultCache] = None) -> None:
         self.module_paths = filter_modules_from_plugin_paths()
         self.plugins: Plugins = self.discover()
+        self.cache = cache
 
     def search_classes(self, module: ModuleType) -> list[Any]:
         classes = []
@@ -116,19 +121,103 @@ class DiscoverMetamodels:
         plugin = self.plugins.get_plugin_by_variability_model(src)
         return plugin.use_operation(operation, src)
 
-    def use_operation_from_file(self, plugin_name: str, operation_name: str, file: str) -> Any:
+    def use_operation_batch(
+        self,
+        src: VariabilityModel,
+        operation: str,
+        configurations: Iterable[Configuration],
+        explain: bool = False,
+        workers: Optional[int] = 1
+    ) -> list[Any]:
+        plugin = self.plugins.get_plugin_by_variability_model(src)
+        return plugin.use_operation_batch(operation, src, configurations, explain, workers)
+
+    def create_session(self, src: VariabilityModel) -> AnalysisSession:
+        """ Session to run several operations on the model, sharing their encodings """
+        return AnalysisSession(self.plugins.get_plugin_by_variability_model(src), src)
+
+    def iter_products(self, src: VariabilityModel) -> Iterator[Any]:
+        """ Products of a model, computed while they are consumed """
+        operation = cast(Products, self.use_operation(src, 'Products'))
+        return operation.iter_products()
+
+    def get_products_page(
+        self,
+        src: VariabilityModel,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> ProductsPage:
+        """
+        A page of the products of a model. A cursor is only valid for the same model, and
+        its page comes from the suspended enumeration without executing the operation again.
+        """
+
+        # models that cannot be hashed by content are named by the object
+        owner = model_digest(src) or f'{type(src).__qualname__}:{id(src)}'
+        page = Products.resume_page(limit, cursor, owner)
+        if page is not None:
+            return page
+        operation = cast(Products, self.use_operation(src, 'Products'))
+        return operation.get_products_page(limit, cursor, owner)
+
+    def get_products_page_from_file(
+        self,
+        plugin_name: str,
+        file: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> ProductsPage:
+        """
+        A page of the products of the model in a file. A cursor is only valid for the same
+        plugin and content of the file, and its page comes from the suspended enumeration
+        without transforming the file nor executing the operation again.
+        """
+
+        plugin: Plugin = self.plugins.get_plugin_by_name(plugin_name)
+        owner = f'{plugin_name}:{extract_filename_extension(file)}:{file_digest(file)}'
+        page = Products.resume_page(limit, cursor, owner)
+        if page is not None:
+            return page
+        variability_model = plugin.use_transformation_t2m(file)
+        operation = cast(Products, plugin.use_operation('Products', variability_model))
+        return operation.get_products_page(limit, cursor, owner)
+
+    def use_operation_from_file(
+        self,
+        plugin_name: str,
+        operation_name: str,
+        file: str,
+        parameters: Optional[dict[str, Any]] = None
+    ) -> Any:
         """
         Steps:
         * Search plugins by name
         * Search TextToModel transformation
         * Apply transformation
         * Apply operation
+
+        With a cache, the result is looked up by the content and the extension of the file
+        first, so an unchanged file is not transformed nor analysed again.
         """
 
         plugin: Plugin = self.plugins.get_plugin_by_name(plugin_name)
-        variability_model = plugin.use_transformation_t2m(file)
-        operation = plugin.use_operation(operation_name, variability_model)
-        return operation.get_result()
+
+        def compute() -> Any:
+            variability_model = plugin.use_transformation_t2m(file)
+            operation = plugin.use_operation(operation_name, variability_model, parameters)
+            return operation.get_result()
+
+        if self.cache is None:
+            return compute()
+
+        key = self.cache.get_key(
+            self.cache.get_fingerprint(plugin.module),
+            operation_name,
+            # the extension selects the transformation
+            f'{extract_filename_extension(file)}:{file_digest(file)}',
+            parameters
+        )
+        return self.cache.get_or_compute(key, compute)
 
     def use_operation_from_fm_file(
         self,
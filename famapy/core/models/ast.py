@@ -1,7 +1,25 @@
-from typing import Any, List, Optional
+import itertools
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import (
+    Any, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, cast
+)
+
+from famapy.core.models.symbol_table import SymbolTable
+from famapy.core.utils import map_bounded, paused_gc
 
 
 class Node:  # noqa
+
+    # there is one node per element of each constraint, so they do not have a __dict__
+    __slots__ = (
+        "_token", "is_leaf", "feature", "is_feature", "unary_operator", "binary_operator",
+        "points_to", "operator", "level"
+    )
+
     def __init__(  # noqa
         self,
         token: int,
@@ -28,6 +46,25 @@ class Node:  # noqa
     def token(self) -> Any:
         return self._token
 
+    # compact pickling, since the nodes are sent between processes by the bulk parser
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (Node, (
+            self._token, self.is_leaf, self.feature, self.is_feature, self.unary_operator,
+            self.binary_operator, self.points_to, self.operator, self.level
+        ))
+
+    def copy(self) -> 'Node':
+        return Node(
+            self._token, self.is_leaf, self.feature, self.is_feature, self.unary_operator,
+            self.binary_operator, self.points_to, self.operator, self.level
+        )
+
+    # places the node in another position of the tree, after an edit of the constraint
+    def move(self, token: int, points_to: Optional[int], level: int) -> None:
+        self._token = token
+        self.points_to = points_to
+        self.level = level
+
     def is_root(self) -> bool:
         return self.points_to is None
 
@@ -57,17 +94,99 @@ class Node:  # noqa
         )
 
 
+class Token(NamedTuple):
+    position: int  # position of the element in AST.list
+    value: str  # element without parentheses
+    opens: int  # "(" preceding the element
+    closes: int  # ")" following the element
+
+    def get_element(self) -> str:
+        return "(" * self.opens + self.value + ")" * self.closes
+
+
+class Grammar:
+    '''
+    Operators of the constraint language. The earlier a binary operator appears in
+    binary_operators, the weaker it binds.
+
+    A grammar does not change once created, so it can be shared by threads parsing at the
+    same time, and its operator sets and precedences are computed only once.
+    '''
+
+    def __init__(
+        self,
+        unary_operators: Iterable[str] = ("not",),
+        binary_operators: Iterable[str] = ("or", "and", "implies", "excludes", "requires")
+    ):
+
+        self.unary_operators: Tuple[str, ...] = tuple(unary_operators)
+        self.binary_operators: Tuple[str, ...] = tuple(binary_operators)
+        self.unary_set = frozenset(self.unary_operators)
+        self.binary_set = frozenset(self.binary_operators)
+
+        if self.unary_set & self.binary_set:
+            raise ValueError(
+                f"Operators cannot be both unary and binary: {self.unary_set & self.binary_set}"
+            )
+
+        # 1 for the weakest operator; a repeated operator keeps its first precedence
+        precedence: dict[str, int] = {}
+        for idx, operator in enumerate(self.binary_operators):
+            precedence.setdefault(operator, idx + 1)
+        self.precedence: Mapping[str, int] = MappingProxyType(precedence)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (Grammar, (self.unary_operators, self.binary_operators))
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Grammar) and
+            self.unary_operators == other.unary_operators and
+            self.binary_operators == other.binary_operators
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.unary_operators, self.binary_operators))
+
+    def is_unary_operator(self, element: str) -> bool:
+        return element in self.unary_set
+
+    def is_binary_operator(self, element: str) -> bool:
+        return element in self.binary_set
+
+    def is_feature(self, element: str) -> bool:
+        return (
+            element not in self.binary_set and
+            element not in self.unary_set and
+            element not in ("(", ")")
+        )
+
+    def get_precedence(self, operator: str) -> int:
+        """ Precedence of a binary operator, 0 for any other element """
+        return self.precedence.get(operator, 0)
+
+
 class ASTINFO:
-    unary_operators = ["not"]
-    binary_operators = ["or", "and", "implies", "excludes", "requires"]
+    '''
+    Default grammar, used when no grammar is given to the parser. Prefer passing a Grammar
+    to AST over changing the default, which affects every parse in the process.
+    '''
+
+    grammar = Grammar()
+    unary_operators = list(grammar.unary_operators)
+    binary_operators = list(grammar.binary_operators)
+
+    @staticmethod
+    def get_grammar() -> Grammar:
+        return ASTINFO.grammar
 
     @staticmethod
     def get_unary_operators() -> List[str]:
         return ASTINFO.unary_operators
 
-    # TODO: use list as variable is not correct
     @staticmethod
     def set_unary_operators(operators: List[str]) -> None:
+        ASTINFO.grammar = Grammar(operators, ASTINFO.grammar.binary_operators)
         ASTINFO.unary_operators = operators
 
     @staticmethod
@@ -76,27 +195,149 @@ class ASTINFO:
 
     @staticmethod
     def set_binary_operators(operators: List[str]) -> None:
+        ASTINFO.grammar = Grammar(ASTINFO.grammar.unary_operators, operators)
         ASTINFO.binary_operators = operators
 
 
 class ASTCHECK:
 
+    # checks that look at the first and last tokens, or at all the parentheses, so they do
+    # not apply to a slice of the tokens of a constraint
+    GLOBAL_CHECKS = (0, 2, 3, 4)
+
     @staticmethod
-    def check_all(string: str) -> None:
+    def check_all(string: str, grammar: Optional[Grammar] = None) -> None:
 
         ASTCHECK.check_is_empty(string)
-        ASTCHECK.check_parentheses(string)
-        ASTCHECK.check_empty_parentheses(string)
-        ASTCHECK.check_binary_operator_at_start_or_end(string)
-        ASTCHECK.check_unary_operator_at_end(string)
-        ASTCHECK.check_adjacent_binary_operators(string)
-        ASTCHECK.check_adjacent_unary_plus_binary_operators(string)
-        ASTCHECK.check_adjacent_features(string)
-        ASTCHECK.check_binary_operator_preceded_or_succeeded_by_parentheses(string)
-        ASTCHECK.check_unary_operator_succeeded_by_parentheses(string)
+        ASTCHECK.check_tokens(ASTUtilities.tokenize(ASTUtilities.string2list(string)), grammar)
 
     @staticmethod
-    def raise_syntax_error(string: str, element1: str = "", element2: str = "") -> None:
+    def check_tokens(tokens: List[Token], grammar: Optional[Grammar] = None) -> None:
+        """
+        Fused version of the checks of a preprocessed string: all of them are done in a single
+        pass over its tokens. If several checks fail, the error raised is the one of the check
+        that comes first in the check_all order, and its offset is the position of the token.
+        """
+
+        for error in ASTCHECK.find_errors(tokens, grammar):
+            if error is not None:
+                position, string, element1, element2 = error
+                ASTCHECK.raise_syntax_error(string, element1, element2, position=position)
+
+    @staticmethod
+    def find_errors(  # noqa: MC0001
+        tokens: List[Token],
+        grammar: Optional[Grammar] = None
+    ) -> List[Optional[Tuple[int, str, str, str]]]:
+        """
+        First error found by each check, in the check_all order, as a (position, message,
+        element1, element2) tuple, or None if the check passes.
+        """
+
+        if grammar is None:
+            grammar = ASTINFO.get_grammar()
+        binary_operators = grammar.binary_set
+        unary_operators = grammar.unary_set
+
+        # first error found by each check, in the order they are raised
+        errors: List[Optional[Tuple[int, str, str, str]]] = [None] * 10
+
+        def found(check: int, position: int, string: str, element1: str = "",
+                  element2: str = "") -> None:
+            if errors[check] is None:
+                errors[check] = (position, string, element1, element2)
+
+        unclosed: List[int] = []
+        unopened: List[int] = []
+        previous: Optional[Token] = None
+
+        for token in tokens:
+            element = token.get_element()
+            is_binary = token.value in binary_operators
+            is_unary = token.value in unary_operators
+
+            unclosed.extend([token.position] * token.opens)
+            for _ in range(token.closes):
+                if unclosed:
+                    unclosed.pop()
+                else:
+                    unopened.append(token.position)
+
+            if not token.value and token.opens and token.closes:
+                found(1, token.position, "There cannot be empty parentheses:", "(", ")")
+
+            if previous is not None:
+                previous_element = previous.get_element()
+                previous_is_binary = previous.value in binary_operators
+                previous_is_unary = previous.value in unary_operators
+
+                if previous_is_binary and is_binary:
+                    found(
+                        5, previous.position,
+                        "There cannot be two adjacent binary operators:",
+                        previous_element, element
+                    )
+                if previous_is_unary and is_binary:
+                    found(
+                        6, previous.position,
+                        "There cannot be a unary operator followed by a binary operator:",
+                        previous_element, element
+                    )
+                if (not previous_is_binary and not previous_is_unary and
+                        not is_binary and not is_unary):
+                    found(
+                        7, previous.position,
+                        "There cannot be two adjacent features:",
+                        previous_element, element
+                    )
+                if previous_is_binary and (previous.opens or previous.closes):
+                    found(
+                        8, previous.position,
+                        "A binary operator cannot be preceded or succeeded by parentheses:",
+                        previous_element, element
+                    )
+
+            if is_unary and token.closes:
+                found(
+                    9, token.position,
+                    "An unary operator cannot succeeded by parentheses:",
+                    element
+                )
+
+            previous = token
+
+        first, last = tokens[0], tokens[-1]
+
+        if len(unclosed) != len(unopened):
+            found(
+                0, (unopened or unclosed)[0],
+                "There is not the same number of open parentheses as closed ones"
+            )
+
+        if first.value in binary_operators:
+            found(
+                2, first.position, "There cannot be binary operator at start:", first.get_element()
+            )
+
+        if last.value in binary_operators:
+            found(
+                3, last.position, "There cannot be binary operators at end:", last.get_element()
+            )
+
+        if last.value in unary_operators:
+            found(
+                4, last.position, "There cannot be unary operators at end::", last.get_element()
+            )
+
+        return errors
+
+    @staticmethod
+    def raise_syntax_error(
+        string: str,
+        element1: str = "",
+        element2: str = "",
+        position: Optional[int] = None
+    ) -> None:
 
         raise_string = "SyntaxError: " + string
 
@@ -106,7 +347,9 @@ class ASTCHECK:
         if element2:
             raise_string += " " + element2
 
-        raise SyntaxError(raise_string)
+        error = SyntaxError(raise_string)
+        error.offset = position
+        raise error
 
     @staticmethod
     def check_is_empty(string: str) -> None:
@@ -267,6 +510,25 @@ class ASTUtilities:
         string = " ".join(string.split())
         return list(string.split(" "))
 
+    # splits the elements of a preprocessed string into tokens
+    @staticmethod
+    def tokenize(string_list: List[str]) -> List[Token]:
+
+        tokens = []
+
+        for position, element in enumerate(string_list):
+            without_open = element.lstrip("(")
+            value = without_open.rstrip(")")
+            tokens.append(Token(
+                position=position,
+                # feature and operator names repeat across constraints, so they are shared
+                value=sys.intern(value),
+                opens=len(element) - len(without_open),
+                closes=len(without_open) - len(value)
+            ))
+
+        return tokens
+
     # input string preprocessing
     @staticmethod
     def preprocessing(string: str) -> str:
@@ -278,55 +540,40 @@ class ASTUtilities:
         return preprocessed_string
 
     @staticmethod
-    def computing_blank_spaces(string: str) -> str:  # noqa: MC0001
-
-        preprocessed_string = string
+    def computing_blank_spaces(string: str) -> str:
+        """
+        Normalizes the blank spaces of a constraint in a single pass:
+        parentheses are glued to the element they enclose and the rest of the
+        elements are separated by exactly one blank space.
+        """
 
-        if "(" in preprocessed_string or ")" in preprocessed_string:
-
-            # remove spaces to the right of "("
-            while "( " in preprocessed_string:
-                for i in range(len(preprocessed_string) - 1):
-                    if preprocessed_string[i] == "(" and preprocessed_string[i + 1] == " ":
-                        preprocessed_string = ASTUtilities.replacer(preprocessed_string, "", i + 1)
-                        break
-
-            # remove spaces to the left of ")"
-            while " )" in preprocessed_string:
-                for i in range(len(preprocessed_string) - 1):
-                    if preprocessed_string[i] == " " and preprocessed_string[i + 1] == ")":
-                        preprocessed_string = ASTUtilities.replacer(preprocessed_string, "", i)
-                        break
-
-            # add a blank space to the left of "(" if what is on the left is not another "("
-            end = False
-            while not end:
-                for i in range(1, len(preprocessed_string) - 1):
-                    if preprocessed_string[i] == "(" and preprocessed_string[i - 1] != "(":
-                        preprocessed_string = ASTUtilities.replacer(preprocessed_string, " (", i)
-                        break
-                    end = True
-
-            # add a blank space to the right of ")" if what is on the right is not another ")"
-            end = False
-            while not end:
-                for i in range(1, len(preprocessed_string) - 1):
-                    if preprocessed_string[i] == ")" and preprocessed_string[i + 1] != ")":
-                        preprocessed_string = ASTUtilities.replacer(preprocessed_string, ") ", i)
-                        break
-                    end = True
-
-        # remove double spaces
-        while "  " in preprocessed_string:
-            for i in range(len(preprocessed_string) - 1):
-                if preprocessed_string[i] == " " and preprocessed_string[i + 1] == " ":
-                    preprocessed_string = ASTUtilities.replacer(preprocessed_string, "", i)
-                    break
-
-        # remove leading and trailing whitespace
-        preprocessed_string = preprocessed_string.strip()
+        lexemes: List[str] = []
+        word: List[str] = []
 
-        return preprocessed_string
+        for char in string:
+            if char in "()" or char.isspace():
+                if word:
+                    lexemes.append("".join(word))
+                    word = []
+                if not char.isspace():
+                    lexemes.append(char)
+            else:
+                word.append(char)
+
+        if word:
+            lexemes.append("".join(word))
+
+        preprocessed_string: List[str] = []
+        previous = ""
+
+        for lexeme in lexemes:
+            # there is no blank space to the right of "(" nor to the left of ")"
+            if preprocessed_string and previous != "(" and lexeme != ")":
+                preprocessed_string.append(" ")
+            preprocessed_string.append(lexeme)
+            previous = lexeme
+
+        return "".join(preprocessed_string)
 
     @staticmethod
     def count_repeating_characters(string: str, character: str) -> int:
@@ -348,20 +595,16 @@ class ASTUtilities:
         return cleaned_string
 
     @staticmethod
-    def is_unary_operator(element: str) -> bool:
-        return element in ASTINFO.get_unary_operators()
+    def is_unary_operator(element: str, grammar: Optional[Grammar] = None) -> bool:
+        return (grammar or ASTINFO.get_grammar()).is_unary_operator(element)
 
     @staticmethod
-    def is_binary_operator(element: str) -> bool:
-        return element in ASTINFO.get_binary_operators()
+    def is_binary_operator(element: str, grammar: Optional[Grammar] = None) -> bool:
+        return (grammar or ASTINFO.get_grammar()).is_binary_operator(element)
 
     @staticmethod
-    def is_feature(element: str) -> bool:
-        return (
-            not ASTUtilities.is_binary_operator(element) and
-            not ASTUtilities.is_unary_operator(element) and
-            not element == ")" and not element == "("
-        )
+    def is_feature(element: str, grammar: Optional[Grammar] = None) -> bool:
+        return (grammar or ASTINFO.get_grammar()).is_feature(element)
 
     @staticmethod
     def replacer(preprocessed_str: str, new_string: str, index: int, no_fail: bool = False) -> str:
@@ -381,293 +624,690 @@ class ASTUtilities:
 
 
 def print_tabs(node: Node) -> str:
-    level = node.get_level()
-    tabs = ""
-    for _ in range(level - 1):
-        tabs += "\t"
-    return tabs
+    return "\t" * (node.get_level() - 1)
 
 
-class AST():
+# (token index, children) pairs produced by the parser before building the nodes
+ParseTree = Tuple[int, Tuple[Any, ...]]
+
+
+class ASTParser:
     '''
-    This algorithm obtains an abstract syntax tree from a text string.
-    Support for parentheses is included
+    Operator precedence parser over the tokens of a preprocessed string.
+    Every token is visited once, so the parsing is linear in the input length, and it
+    uses explicit stacks, so any depth of nesting can be parsed.
+
+    The precedence follows the grammar (ASTINFO by default): the earlier a binary
+    operator appears in its binary operators, the weaker it binds, and operators with
+    the same precedence associate to the right. Unary operators bind stronger than any
+    binary operator.
     '''
 
-    def __init__(self, string: str = ""):
+    OPEN = -1
+    CLOSE = -2
 
-        # preprocessing
-        preprocessed_string = ASTUtilities.preprocessing(string)
+    def __init__(self, tokens: List[Token], grammar: Optional[Grammar] = None):
 
-        # basic syntax checks
-        ASTCHECK.check_all(preprocessed_string)
+        self.tokens = tokens
+        self.position = 0
 
-        self.string = preprocessed_string
-        self.nodes: list[Node] = []
-        self.list: list[str] = ASTUtilities.string2list(preprocessed_string)
+        self.grammar = grammar if grammar is not None else ASTINFO.get_grammar()
+        # plain dict copy: the lookups are in the innermost loop of the parser
+        self.precedence = dict(self.grammar.precedence)
+        self.unary_operators = self.grammar.unary_set
 
-        self.explore(i=0, j=len(self.list), points_to=None, level=0)
+        # parentheses are split from the elements they are glued to, and every lexeme
+        # remembers the position of the token it comes from
+        self.lexemes: List[int] = []
+        self.owners: List[int] = []
+        for token in tokens:
+            lexemes = (
+                [ASTParser.OPEN] * token.opens +
+                ([token.position] if token.value else []) +
+                [ASTParser.CLOSE] * token.closes
+            )
+            self.lexemes.extend(lexemes)
+            self.owners.extend([token.position] * len(lexemes))
+
+    def parse(self) -> List[Node]:
+        return self.build_nodes(self.parse_expression())
+
+    def parse_expression(self) -> ParseTree:  # noqa: MC0001
+        """
+        Shunting-yard parsing with explicit stacks instead of recursion, so the depth of a
+        constraint is not limited by the recursion limit of Python.
+        """
+
+        lexemes = self.lexemes
+        tokens = self.tokens
+        precedence = self.precedence
+        unary_operators = self.unary_operators
+
+        operands: List[ParseTree] = []
+        # pending operators: lexemes of operators, or OPEN for an open parenthesis
+        operators: List[int] = []
+
+        while True:
+            # an operand is expected: unary operators and parentheses come before it
+            while True:
+                if self.position >= len(lexemes):
+                    ASTCHECK.raise_syntax_error(
+                        "Unexpected end of constraint", position=tokens[-1].position
+                    )
+
+                lexeme = lexemes[self.position]
+                self.position += 1
+
+                if lexeme == ASTParser.OPEN:
+                    operators.append(lexeme)
+                    continue
+                if lexeme == ASTParser.CLOSE or tokens[lexeme].value in precedence:
+                    self.raise_unexpected_lexeme(self.position - 1)
+                if tokens[lexeme].value in unary_operators:
+                    operators.append(lexeme)
+                    continue
+
+                operand: ParseTree = (lexeme, ())
+                break
 
-    def __str__(self) -> str:
-        printed_tree = self.print_tree(self.get_root(), f'\n\n{self.get_root().get_name()}')
-        return f'\n"{self.string}"{printed_tree}'
+            # a binary operator or a closing parenthesis is expected after the operand
+            while True:
+                while operators and operators[-1] >= 0 and tokens[operators[-1]].value in \
+                        unary_operators:
+                    operand = (operators.pop(), (operand,))
+
+                if self.position >= len(lexemes):
+                    operands.append(operand)
+                    self.reduce(operands, operators, 0)
+                    if operators:
+                        ASTCHECK.raise_syntax_error(
+                            "Unbalanced parentheses", position=tokens[-1].position
+                        )
+                    return operands[0]
+
+                lexeme = lexemes[self.position]
+
+                if lexeme == ASTParser.CLOSE:
+                    operands.append(operand)
+                    self.reduce(operands, operators, 0)
+                    if not operators:
+                        self.raise_unexpected_lexeme(self.position)
+                    operators.pop()
+                    self.position += 1
+                    operand = operands.pop()
+                    continue
+
+                # elements that are not binary operators have precedence 0
+                operator_precedence = (
+                    precedence.get(tokens[lexeme].value, 0) if lexeme >= 0 else 0
+                )
+                if operator_precedence == 0:
+                    self.raise_unexpected_lexeme(self.position)
+
+                # operators with the same precedence associate to the right
+                operands.append(operand)
+                self.reduce(operands, operators, operator_precedence)
+                operators.append(lexeme)
+                self.position += 1
+                break
 
-    def print_tree(self, node: Node, string: str) -> str:
-        child_nodes = self.get_childs(node)
-        for child_node in child_nodes:
-            string += self.print_tree(
-                child_node, "\n" + print_tabs(child_node) + child_node.get_name()
-            )
+    # applies the pending binary operators that bind stronger than the given precedence
+    def reduce(self, operands: List[ParseTree], operators: List[int], precedence: int) -> None:
 
-        return string
+        while operators and operators[-1] >= 0:
+            operator = operators[-1]
+            if self.precedence[self.tokens[operator].value] <= precedence:
+                break
+            operators.pop()
+            right = operands.pop()
+            operands[-1] = (operator, (operands[-1], right))
 
-    # extracts the positions of the binary operators in the range (i, j]
-    def extract_binary_operators(self, i: int, j: int) -> List[int]:
+    def raise_unexpected_lexeme(self, position: int) -> None:
 
-        list_binary_operators = []
+        lexeme = self.lexemes[position]
 
-        for idx in range(i, j):
-            if self.list[idx] in ASTINFO.get_binary_operators():
-                list_binary_operators.append(idx)
+        if lexeme == ASTParser.OPEN:
+            element = "("
+        elif lexeme == ASTParser.CLOSE:
+            element = ")"
+        else:
+            element = self.tokens[lexeme].value
 
-        return list_binary_operators
+        ASTCHECK.raise_syntax_error(
+            "Unexpected element:", element, position=self.owners[position]
+        )
 
-    # extracts the positions of the unary operators in the range (i, j]
-    def extract_unary_operators(self, i: int, j: int) -> List[int]:
+    # nodes are created in pre-order: each parent before its children
+    def build_nodes(self, tree: ParseTree) -> List[Node]:
 
-        list_unary_operators = []
+        nodes = []
+        stack: List[Tuple[ParseTree, Optional[int], int]] = [(tree, None, 1)]
 
-        for idx in range(i, j):
-            if self.list[idx] in ASTINFO.get_unary_operators():
-                list_unary_operators.append(idx)
+        while stack:
+            (index, children), points_to, level = stack.pop()
+            value = self.tokens[index].value
 
-        return list_unary_operators
+            if children:
+                nodes.append(Node(operator=value, points_to=points_to, level=level, token=index))
+            else:
+                nodes.append(Node(
+                    is_leaf=True,
+                    is_feature=True,
+                    feature=value,
+                    points_to=points_to,
+                    level=level,
+                    token=index
+                ))
 
-    # discard binary operators enclosed in parentheses
-    def discard_nodes_in_parentheses(self, i: int, j: int, possible_nodes: List[int]) -> List[int]:
+            for child in reversed(children):
+                stack.append((child, index, level + 1))
 
-        candidate_root_nodes_without_parentheses = []
+        return nodes
 
-        for element in possible_nodes:
 
-            #  flag
-            without_parentheses = True
+class ASTChanges(NamedTuple):
+    changed: List[Node]  # new nodes, and nodes whose subtree changed
+    removed: List[Node]  # nodes that are no longer in the tree
 
-            # EXPLANATION OF THE ALGORITHM
-            # an element will be free if NEITHER to its left NOR to its right does not have
-            # any elements with opening or closing parentheses
 
-            # is there any parentheses "(" to the left?
-            # note: the first element is not counted because it is considered an outer parenthesis,
-            # hence the k! = i
-            for k in range(i, element):
-                if "(" in self.list[k] and k != i:
-                    without_parentheses = False
-                    break
+PARENTHESES = re.compile(r"[()]")
 
-            # is there any parentheses "(" to the right?
-            # note: the last element is not counted because it is considered an outer parenthesis,
-            # hence the k! = j-1
-            if without_parentheses:
-                for k in range(element + 1, j):
-                    if ")" in self.list[k] and k != j - 1:
-                        without_parentheses = False
-                        break
-
-            if without_parentheses:
-                candidate_root_nodes_without_parentheses.append(element)
-
-        return candidate_root_nodes_without_parentheses
-
-    def explore(self, i: int, j: int, points_to: Any, level: int) -> None:
-        """ DIVIDE AND CONQUER """
-
-        # BASE CASE 1
-        # There is the particular case of doing Divide and Conquer will win from a unary operator.
-        # This causes it to be a sublist WITHOUT elements, since the unary operator
-        # does not operate with elements to the left
-        if j - i == 0:
-            return
-
-        # BASE CASE 2: list with a single element (it is a feature type "A")
-        if j - i == 1:
-            node = Node(
-                is_leaf=True,
-                is_feature=True,
-                points_to=points_to,
-                feature=ASTUtilities.clean_parentheses(self.list[i]),
-                level=level + 1,
-                token=i
-            )
-            self.nodes.append(node)
-
-            return
-
-        # BASE CASE 3: list with two elements (it is of type "not A")
-        if j - i == 2:
-            # the first node is the unary
-            node_1 = Node(points_to=points_to, operator=self.list[i], level=level + 1, token=i)
-            self.nodes.append(node_1)
-
-            # the second node is the feature
-            node_2 = Node(
-                is_leaf=True,
-                is_feature=True,
-                points_to=i,
-                feature=ASTUtilities.clean_parentheses(self.list[i + 1]),
-                level=level + 2,
-                token=i + 1
-            )
-            self.nodes.append(node_2)
-
-            return
-
-        # BASE CASE 4: list with three elements (it is of type "A implies B")
-        if j - i == 3:
-            # the parent node (operator) is the central node (i + 1)
-            node = Node(
-                operator=self.list[i + 1],
-                points_to=points_to,
-                level=level + 1,
-                token=i + 1
-            )
-            self.nodes.append(node)
-
-            # the first child (feature) is the node on the left
-            node_1 = Node(
-                is_leaf=True,
-                is_feature=True,
-                points_to=i + 1,
-                feature=ASTUtilities.clean_parentheses(self.list[i]),
-                level=level + 2,
-                token=i
-            )
-            self.nodes.append(node_1)
-
-            # the second child (feature) is the node on the right
-            node_2 = Node(
-                is_leaf=True,
-                is_feature=True,
-                points_to=i + 1,
-                feature=ASTUtilities.clean_parentheses(self.list[i + 2]),
-                level=level + 2,
-                token=i + 2
-            )
-            self.nodes.append(node_2)
 
-            return
+# whether every parenthesis of the tokens is closed by a later one
+def is_balanced(tokens: List[Token]) -> bool:
 
-        parent = self.find_out_parent_node(i, j)
-        node = Node(points_to=points_to, operator=self.list[parent], level=level + 1, token=parent)
-        self.nodes.append(node)
+    depth = 0
+    for token in tokens:
+        depth += token.opens - token.closes
+        if depth < 0:
+            return False
+    return depth == 0
 
-        # we execute divide and conquer
-        self.explore(i, parent, points_to=parent, level=level + 1)
-        self.explore(parent + 1, j, points_to=parent, level=level + 1)
 
-    # finds the most suitable parent node in subset [i, j)
-    def find_out_parent_node(self, i: int, j: int) -> int:
+# precedence of the weakest binary operator outside parentheses, None if there are none
+def weakest_precedence(tokens: List[Token], grammar: Grammar) -> Optional[int]:
 
-        candidate_binary_parent_nodes = self.extract_binary_operators(i, j)
-        candidate_unary_parent_nodes = self.extract_unary_operators(i, j)
+    weakest = None
+    depth = 0
+    for token in tokens:
+        depth += token.opens
+        precedence = grammar.precedence.get(token.value)
+        if not depth and precedence is not None and (weakest is None or precedence < weakest):
+            weakest = precedence
+        depth -= token.closes
+    return weakest
 
-        candidate_binary_parent_nodes_without_parentheses = self.discard_nodes_in_parentheses(
-            i=i,
-            j=j,
-            possible_nodes=candidate_binary_parent_nodes
-        )
-        candidate_unary_parent_nodes_without_parentheses = self.discard_nodes_in_parentheses(
-            i=i,
-            j=j,
-            possible_nodes=candidate_unary_parent_nodes
-        )
 
-        # At the same level (understand by "same level" the nodes
-        # which are free of parentheses),
-        # unary operators take precedence if not previously
-        # there are binary operators
+class AST():
+    '''
+    This algorithm obtains an abstract syntax tree from a text string.
+    Support for parentheses is included
+    '''
 
-        # if the list of binary operators is NOT empty
-        if candidate_binary_parent_nodes_without_parentheses:
+    def __init__(self, string: str = "", grammar: Optional[Grammar] = None):
 
-            # of all binary operators, the one with the highest priority is obtained
-            parent = self.priority_binary_operator_according_to_hierarchy(
-                candidate_binary_parent_nodes_without_parentheses
-            )
+        # the default grammar is read once, so the whole parse uses the same one
+        self.grammar = grammar if grammar is not None else ASTINFO.get_grammar()
 
-        # if the list of binary operators is empty
-        else:
+        # preprocessing
+        preprocessed_string = ASTUtilities.preprocessing(string)
+
+        self.string = preprocessed_string
+        self.list: list[str] = ASTUtilities.string2list(preprocessed_string)
+
+        # basic syntax checks, sharing the tokens with the parser
+        tokens = ASTUtilities.tokenize(self.list)
+        ASTCHECK.check_is_empty(preprocessed_string)
+        ASTCHECK.check_tokens(tokens, self.grammar)
+
+        self.nodes: list[Node] = ASTParser(tokens, self.grammar).parse()
+        self.index_nodes()
+
+    @classmethod
+    def from_nodes(
+        cls,
+        string: str,
+        nodes: List[Node],
+        grammar: Optional[Grammar] = None
+    ) -> "AST":
+        """
+        AST of an already parsed constraint, from its preprocessed string and its nodes in
+        pre-order. Neither is checked.
+        """
+
+        ast = cls.__new__(cls)
+        ast.grammar = grammar if grammar is not None else ASTINFO.get_grammar()
+        ast.update(ASTUtilities.string2list(string), nodes)
+        return ast
+
+    def copy(self) -> "AST":
+        """ AST with copies of the nodes, so each one can be edited without the other """
+        return AST.from_nodes(self.string, [node.copy() for node in self.nodes], self.grammar)
+
+    # indexes the nodes by token so that parents and children are found in O(1)
+    def index_nodes(self) -> None:
+
+        size = max(node.token for node in self.nodes) + 1 if self.nodes else 0
+        self._nodes_by_token: list[Optional[Node]] = [None] * size
+        self._childs: list[Tuple[Node, ...]] = [()] * size
+
+        for node in self.nodes:
+            self._nodes_by_token[node.token] = node
+            if node.points_to is not None:
+                self._childs[node.points_to] += (node,)
+
+        # derived properties, computed the first time they are requested
+        self._root: Optional[Node] = None
+        self._height: Optional[int] = None
+        self._features: Optional[list[Node]] = None
+        self._nodes_by_name: Optional[dict[str, list[Node]]] = None
+
+    # the indexes are not pickled, they are rebuilt from the nodes
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            'grammar': self.grammar, 'string': self.string, 'list': self.list, 'nodes': self.nodes
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.index_nodes()
+
+    def edit(self, offset: int, length: int, text: str) -> ASTChanges:
+        """
+        Replaces length characters of the constraint string (as in self.string) at offset by
+        text, tokenizing again only the edited elements and parsing again only the innermost
+        parentheses that enclose them. Outside parentheses, the smallest subtree that contains
+        the edited elements is parsed again if the operators around it bind the new elements
+        the same way; otherwise the whole constraint is parsed again.
+
+        The AST is modified in place. Nodes whose subtree did not change are kept, with their
+        token and level updated, and the rest are reported as changed or removed. If the
+        edited constraint is not valid, the error of AST(string) is raised and the AST is not
+        modified.
+        """
+
+        string = self.string
+        if not 0 <= offset <= len(string) or not 0 <= length <= len(string) - offset:
+            raise ValueError("The edit is outside the constraint")
+
+        # the edited elements, from first to last, are replaced by elements
+        first = string.count(" ", 0, offset)
+        last = string.count(" ", 0, offset + length)
+        start = string.rfind(" ", 0, offset) + 1
+        end = string.find(" ", offset + length)
+        if end < 0:
+            end = len(string)
+        edited = ASTUtilities.preprocessing(
+            string[start:offset] + text + string[offset + length:end]
+        )
+        elements = ASTUtilities.string2list(edited) if edited else []
 
-            # of all unary operators, the one with the highest priority is obtained
-            parent = self.priority_unary_operator_according_to_hierarchy(
-                candidate_unary_parent_nodes_without_parentheses
+        # parentheses at the border of the edited elements would be glued to the next ones
+        if elements and (elements[0].startswith(")") or elements[-1].endswith("(")):
+            new_string = ASTUtilities.preprocessing(
+                string[:offset] + text + string[offset + length:]
             )
+            return self.reparse_all(ASTUtilities.string2list(new_string) if new_string else [])
+
+        new_list = self.list[:first] + elements + self.list[last + 1:]
+        delta = len(elements) - (last - first + 1)
+        group = self.find_group(offset, length)
+        changes = None
+        if group is not None:
+            changes = self.reparse_group(new_list, group, delta)
+        # outside parentheses, or if the group cannot be parsed alone
+        if changes is None:
+            changes = self.reparse_operand(new_list, first, last, delta)
+        if changes is not None:
+            return changes
+
+        return self.reparse_all(new_list)
+
+    def find_group(self, offset: int, length: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Innermost parentheses that enclose the characters from offset to offset + length, as
+        the elements where they are opened and closed, and the number of parentheses of those
+        elements that are outside the group. None if there are no such parentheses.
+        """
+
+        string = self.string
+
+        # parentheses of the edited characters that are closed after them or opened before
+        unclosed = unopened = 0
+        for char in PARENTHESES.findall(string, offset, offset + length):
+            if char == "(":
+                unclosed += 1
+            elif unclosed:
+                unclosed -= 1
+            else:
+                unopened += 1
+
+        left = right = -1
+        depth, needed = 0, unopened + 1
+        for match in reversed(list(PARENTHESES.finditer(string, 0, offset))):
+            depth += 1 if match.group() == ")" else -1
+            if depth < 0:
+                depth, needed = 0, needed - 1
+                if not needed:
+                    left = match.start()
+                    break
+
+        depth, needed = 0, unclosed + 1
+        for match in PARENTHESES.finditer(string, offset + length):
+            depth += 1 if match.group() == "(" else -1
+            if depth < 0:
+                depth, needed = 0, needed - 1
+                if not needed:
+                    right = match.start()
+                    break
+
+        if left < 0 or right < 0:
+            return None
 
-        return parent
+        left_element = string.count(" ", 0, left)
+        right_element = string.count(" ", 0, right)
+        return (
+            left_element,
+            left - (string.rfind(" ", 0, left) + 1),
+            right_element,
+            len(self.list[right_element]) - (right - (string.rfind(" ", 0, right) + 1)) - 1
+        )
+
+    def reparse_group(
+        self,
+        new_list: List[str],
+        group: Tuple[int, int, int, int],
+        delta: int
+    ) -> Optional[ASTChanges]:
+        """ Parses again the group of parentheses, or returns None if it is not possible """
+
+        left, left_outside, right, right_outside = group
+        new_right = right + delta
+
+        # the edited elements must keep the parentheses balanced inside the group...
+        tokens = ASTUtilities.tokenize(new_list[left:new_right + 1])
+        tokens[0] = tokens[0]._replace(opens=tokens[0].opens - left_outside - 1)
+        tokens[-1] = tokens[-1]._replace(closes=tokens[-1].closes - right_outside - 1)
+        if tokens[0].opens < 0 or tokens[-1].closes < 0:
+            return None
+        depth = 0
+        for token in tokens:
+            depth += token.opens - token.closes
+            if depth < 0:
+                return None
+        if depth != 0:
+            return None
+
+        # ...and pass the checks with the elements around them
+        window = ASTUtilities.tokenize(new_list[max(left - 1, 0):new_right + 2])
+        errors = ASTCHECK.find_errors(window, self.grammar)
+        if any(errors[check] for check in range(10) if check not in ASTCHECK.GLOBAL_CHECKS):
+            return None
+
+        try:
+            new_nodes = ASTParser(tokens, self.grammar).parse()
+        except SyntaxError:
+            return None
+
+        old_root = min(
+            (node for node in self._nodes_by_token[left:right + 1] if node is not None),
+            key=lambda node: node.level
+        )
+        return self.replace_subtree(new_list, old_root, left, right, new_nodes, delta)
+
+    def reparse_operand(
+        self,
+        new_list: List[str],
+        first: int,
+        last: int,
+        delta: int
+    ) -> Optional[ASTChanges]:
+        """
+        Parses again the smallest subtree that contains the edited elements, from first to
+        last, or returns None if it is not possible
+        """
+
+        edited = self._nodes_by_token[first:last + 1]
+        if not edited or any(node is None for node in edited):
+            return None
+
+        # lowest common ancestor of the edited nodes
+        old_root = cast(Node, edited[0])
+        for node in edited[1:]:
+            other = cast(Node, node)
+            while other.level > old_root.level:
+                other = cast(Node, self.get_parent(other))
+            while old_root.level > other.level:
+                old_root = cast(Node, self.get_parent(old_root))
+            while other is not old_root:
+                other = cast(Node, self.get_parent(other))
+                old_root = cast(Node, self.get_parent(old_root))
+
+        # the subtree spans the elements from its leftmost to its rightmost descendant
+        left = right = old_root
+        while len(self._childs[left.token]) == 2:
+            left = self._childs[left.token][0]
+        while self._childs[right.token]:
+            right = self._childs[right.token][-1]
+        left_element, right_element = left.token, right.token
+        new_right = right_element + delta
+        if new_right < left_element:
+            return None
+
+        # the parentheses of the subtree, before and after the edit, are closed inside it
+        old_tokens = ASTUtilities.tokenize(self.list[left_element:right_element + 1])
+        tokens = ASTUtilities.tokenize(new_list[left_element:new_right + 1])
+        if not is_balanced(old_tokens) or not is_balanced(tokens):
+            return None
+
+        # the operators around the subtree must not take part of the new elements: binary
+        # operators bind weaker than the one on the left and stronger than the one on the
+        # right, as operators with the same precedence associate to the right
+        weakest = weakest_precedence(tokens, self.grammar)
+        if weakest is not None:
+            precedence = self.grammar.precedence
+            if left_element > 0:
+                before = ASTUtilities.tokenize([self.list[left_element - 1]])[0].value
+                if self.grammar.is_unary_operator(before) or precedence.get(before, 0) > weakest:
+                    return None
+            if new_right + 1 < len(new_list):
+                after = ASTUtilities.tokenize([new_list[new_right + 1]])[0].value
+                if precedence.get(after, 0) >= weakest:
+                    return None
+
+        window = ASTUtilities.tokenize(new_list[max(left_element - 1, 0):new_right + 2])
+        errors = ASTCHECK.find_errors(window, self.grammar)
+        if any(errors[check] for check in range(10) if check not in ASTCHECK.GLOBAL_CHECKS):
+            return None
+
+        try:
+            new_nodes = ASTParser(tokens, self.grammar).parse()
+        except SyntaxError:
+            return None
+
+        return self.replace_subtree(
+            new_list, old_root, left_element, right_element, new_nodes, delta
+        )
+
+    def replace_subtree(
+        self,
+        new_list: List[str],
+        old_root: Node,
+        left: int,
+        right: int,
+        new_nodes: List[Node],
+        delta: int
+    ) -> ASTChanges:
+        """
+        Replaces the subtree of old_root, which spans the elements from left to right, by
+        the new nodes, parsed from the elements from left to right + delta of new_list
+        """
+
+        ancestors = []
+        parent = self.get_parent(old_root)
+        while parent is not None:
+            ancestors.append(parent)
+            parent = self.get_parent(parent)
+
+        root_parent = old_root.points_to
+        if root_parent is not None and root_parent > right:
+            root_parent += delta
+        for node in new_nodes:
+            node.move(
+                node.token + left,
+                node.points_to + left if node.points_to is not None else root_parent,
+                node.level + old_root.level - 1
+            )
 
-    # given a list of unary operators, find the highest priority
-    def priority_unary_operator_according_to_hierarchy(self, possible_nodes: List[int]) -> int:
+        start = self.nodes.index(old_root)
+        size = sum(node is not None for node in self._nodes_by_token[left:right + 1])
+        old_nodes = self.nodes[start:start + size]
+        nodes, changes = self.reuse_nodes(old_nodes, new_nodes)
 
-        unary_operators = ASTINFO.get_unary_operators()
-        position = len(unary_operators) - 1
-        priority = possible_nodes[0]
+        # the tokens after the subtree are shifted by the number of new elements
+        outside = self.nodes[:start] + self.nodes[start + size:]
+        if delta:
+            for node in outside:
+                points_to = node.points_to
+                if points_to is not None and points_to > right:
+                    points_to += delta
+                node.move(node.token + delta if node.token > right else node.token, points_to,
+                          node.level)
 
-        for element in possible_nodes:
-            new_position = unary_operators.index(self.list[element])
+        if nodes[0] is not old_root:
+            changes.changed.extend(ancestors)
 
-            if new_position < position:
-                position = new_position
-                priority = element
+        self.update(new_list, self.nodes[:start] + nodes + self.nodes[start + size:])
+        return changes
 
-        return priority
+    def reparse_all(self, new_list: List[str]) -> ASTChanges:
 
-    # given a list of binary operators, find the highest priority
-    def priority_binary_operator_according_to_hierarchy(self, possible_nodes: List[int]) -> int:
+        new_string = " ".join(new_list)
+        ASTCHECK.check_is_empty(new_string)
+        tokens = ASTUtilities.tokenize(new_list)
+        ASTCHECK.check_tokens(tokens, self.grammar)
+        new_nodes = ASTParser(tokens, self.grammar).parse()
 
-        binary_operators = ASTINFO.get_binary_operators()
-        position = len(binary_operators) - 1
-        priority = possible_nodes[0]
+        nodes, changes = self.reuse_nodes(self.nodes, new_nodes)
+        self.update(new_list, nodes)
+        return changes
 
-        for element in possible_nodes:
-            new_position = binary_operators.index(self.list[element])
+    def reuse_nodes(
+        self,
+        old_nodes: List[Node],
+        new_nodes: List[Node]
+    ) -> Tuple[List[Node], ASTChanges]:
+        """
+        Replaces each new node by an old node with the same name and the same childs, moved
+        to the position of the new one. Both lists are subtrees in pre-order.
+        """
+
+        unused: dict[Tuple[Any, ...], List[Node]] = {}
+        for node in old_nodes:
+            unused.setdefault((node.get_name(), *self._childs[node.token]), []).append(node)
+
+        new_childs: dict[int, List[Node]] = {}
+        for node in new_nodes[1:]:
+            new_childs.setdefault(node.points_to, []).append(node)
+
+        reused: dict[int, Node] = {}
+        changed = []
+        for node in reversed(new_nodes):
+            childs = new_childs.get(node.token, [])
+            key = (node.get_name(), *(reused[child.token] for child in childs))
+            candidates = unused.get(key)
+            if candidates:
+                old_node = candidates.pop()
+                old_node.move(node.token, node.points_to, node.level)
+                node = old_node
+            else:
+                changed.append(node)
+            reused[node.token] = node
+
+        removed = [node for nodes in unused.values() for node in nodes]
+        return [reused[node.token] for node in new_nodes], ASTChanges(changed[::-1], removed)
+
+    def update(self, new_list: List[str], nodes: List[Node]) -> None:
+        self.list = new_list
+        self.string = " ".join(new_list)
+        self.nodes = nodes
+        self.index_nodes()
 
-            if new_position < position:
-                position = new_position
-                priority = element
+    def __str__(self) -> str:
+        printed_tree = self.print_tree(self.get_root(), f'\n\n{self.get_root().get_name()}')
+        return f'\n"{self.string}"{printed_tree}'
 
-        return priority
+    def print_tree(self, node: Node, string: str) -> str:
+        lines = [string]
+        for descendant in self.iter_preorder(node):
+            if descendant is not node:
+                lines.append("\n" + print_tabs(descendant) + descendant.get_name())
+
+        return "".join(lines)
+
+    def iter_preorder(self, node: Optional[Node] = None) -> Iterator[Node]:
+        """ Nodes of the subtree of node (the whole tree by default), each before its childs """
+
+        stack = [node if node is not None else self.get_root()]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(reversed(self._childs[current.token]))
+
+    def iter_postorder(self, node: Optional[Node] = None) -> Iterator[Node]:
+        """ Nodes of the subtree of node (the whole tree by default), each after its childs """
+
+        stack = [(node if node is not None else self.get_root(), False)]
+        while stack:
+            current, visited = stack.pop()
+            if visited:
+                yield current
+            else:
+                stack.append((current, True))
+                stack.extend((child, False) for child in reversed(self._childs[current.token]))
 
     def get_nodes_by_feature(self, feature: str) -> List[Node]:
-        res_node = []
 
-        for node in self.nodes:
-            if node.get_name() == feature:
-                res_node.append(node)
+        if self._nodes_by_name is None:
+            self._nodes_by_name = {}
+            for node in self.nodes:
+                self._nodes_by_name.setdefault(node.get_name(), []).append(node)
 
-        return res_node
+        return list(self._nodes_by_name.get(feature, []))
 
     def get_root(self) -> Node:
 
-        # we take the first node by default
-        res_node = self.nodes[0]
-        for node in self.nodes:
+        if self._root is None:
+            # we take the first node by default
+            self._root = self.nodes[0]
+            for node in self.nodes:
 
-            if node.points_to is None:
-                res_node = node
-                break
+                if node.points_to is None:
+                    self._root = node
+                    break
 
-        return res_node
+        return self._root
 
-    def get_childs(self, parent_node: Node) -> List[Node]:
+    def get_node(self, token: int) -> Optional[Node]:
 
-        childs = []
-        points_to = parent_node.token
+        if 0 <= token < len(self._nodes_by_token):
+            return self._nodes_by_token[token]
 
-        for node in self.nodes:
-            if node.get_points_to() == str(points_to):
-                childs.append(node)
+        return None
+
+    def get_parent(self, node: Node) -> Optional[Node]:
+
+        if node.points_to is None:
+            return None
 
-        return childs
+        return self.get_node(node.points_to)
+
+    def get_childs(self, parent_node: Node) -> List[Node]:
+
+        if 0 <= parent_node.token < len(self._childs):
+            return list(self._childs[parent_node.token])
+
+        return []
 
     def get_first_child(self, parent_node: Node) -> Optional[Node]:  # noqa
 
@@ -693,21 +1333,140 @@ class AST():
 
     def get_height(self) -> int:
 
-        height = 1
+        if self._height is None:
+            self._height = 1
 
-        for node in self.get_nodes():
-            level = node.get_level()
-            if level > height:
-                height = level
+            for node in self.get_nodes():
+                level = node.get_level()
+                if level > self._height:
+                    self._height = level
 
-        return height
+        return self._height
 
     def get_features(self) -> List[Node]:
 
-        features = []
+        if self._features is None:
+            self._features = []
+
+            for node in self.get_nodes():
+                if node.is_feature:
+                    self._features.append(node)
+
+        return list(self._features)
+
+
+class ConstraintError(NamedTuple):
+    position: int
+    constraint: str
+    message: str
+    offset: Optional[int]
+
+
+class ParsedConstraints(NamedTuple):
+    asts: dict[int, AST]
+    errors: List[ConstraintError]
+    symbols: SymbolTable
+
+
+def parse_chunk(
+    chunk: List[Tuple[int, str]],
+    grammar: Optional[Grammar] = None
+) -> List[Tuple[int, Any]]:
+    """ Parses a chunk of numbered constraints, returning an AST or an error for each one """
+
+    results: List[Tuple[int, Any]] = []
+    with paused_gc():
+        for index, constraint in chunk:
+            try:
+                results.append((index, AST(constraint, grammar)))
+            except (SyntaxError, ValueError) as error:
+                offset = error.offset if isinstance(error, SyntaxError) else None
+                results.append((index, ConstraintError(index, constraint, str(error), offset)))
+    return results
+
+
+def parse_constraints(
+    constraints: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    grammar: Optional[Grammar] = None
+) -> ParsedConstraints:
+    """
+    Parses many constraints, in chunks spread over a pool of processes (workers=None uses
+    one per core, workers=1 parses in this process). Each worker has at most two chunks
+    submitted ahead of the results collected, so the memory is bounded. The ASTs are
+    pickled back to this process, which takes about as long as parsing them, so more
+    workers only pay off with several cores.
+
+    The ASTs are returned by position in the input. Their features are registered, in order
+    of appearance, in one symbol table and share the same name strings. Invalid constraints
+    are reported in errors instead of stopping the parsing.
+    """
+
+    numbered = ((index, constraint) for index, constraint in enumerate(constraints))
+    return parse_numbered_constraints(numbered, workers, chunk_size, grammar)
+
+
+def parse_constraints_file(
+    filepath: str,
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    grammar: Optional[Grammar] = None
+) -> ParsedConstraints:
+    """
+    Parses a file with one constraint per line, as parse_constraints. Blank lines are
+    skipped and the constraints are indexed by line, starting at 0.
+    """
+
+    with open(filepath, 'r', encoding='utf-8') as file:
+        numbered = (
+            (index, line) for index, line in enumerate(file) if line.strip()
+        )
+        return parse_numbered_constraints(numbered, workers, chunk_size, grammar)
+
+
+def parse_numbered_constraints(
+    numbered: Iterator[Tuple[int, str]],
+    workers: Optional[int],
+    chunk_size: int,
+    grammar: Optional[Grammar]
+) -> ParsedConstraints:
+
+    if chunk_size < 1:
+        raise ValueError('The chunk size must be positive')
+
+    # the workers do not see changes made to ASTINFO in this process, so the grammar is sent
+    if grammar is None:
+        grammar = ASTINFO.get_grammar()
+
+    chunks = iter(lambda: list(itertools.islice(numbered, chunk_size)), [])
+    parsed = ParsedConstraints({}, [], SymbolTable())
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            collect_chunk(parsed, parse_chunk(chunk, grammar))
+        return parsed
+
+    # the results are unpickled in this process, creating every node of every AST
+    with ProcessPoolExecutor(max_workers=workers) as executor, paused_gc():
+        arguments = ((chunk, grammar) for chunk in chunks)
+        for results in map_bounded(executor, parse_chunk, arguments, 2 * workers):
+            collect_chunk(parsed, results)
+
+    return parsed
+
+
+def collect_chunk(parsed: ParsedConstraints, results: List[Tuple[int, Any]]) -> None:
 
-        for node in self.get_nodes():
-            if node.is_feature:
-                features.append(node)
+    symbols = parsed.symbols
+    for index, result in results:
+        if isinstance(result, ConstraintError):
+            parsed.errors.append(result)
+            continue
 
-        return features
+        # features with the same name share the string stored in the symbol table
+        for node in result.get_features():
+            node.feature = symbols.names[symbols.add(node.feature) - 1]
+        parsed.asts[index] = result
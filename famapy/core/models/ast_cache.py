@@ -0,0 +1,235 @@
+from typing import Any, List, Optional, Tuple, Union
+from weakref import WeakValueDictionary
+
+from famapy.core.models.ast import AST, ASTUtilities, Grammar, Node
+from famapy.core.utils import LRUCache
+
+
+class SharedNode:
+    '''
+    Immutable node of a constraint: a feature when it has no childs, an operator otherwise.
+    Nodes created by the same SharedNodeTable are hash-consed, so two equal subtrees are
+    the same object and can be compared and used as keys by identity.
+    '''
+
+    __slots__ = ('name', 'childs', '__weakref__')
+
+    name: str
+    childs: Tuple['SharedNode', ...]
+
+    def __init__(self, name: str, childs: Tuple['SharedNode', ...] = ()) -> None:
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'childs', childs)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('SharedNode is immutable')
+
+    def is_feature(self) -> bool:
+        return not self.childs
+
+    def to_string(self) -> str:
+        """ Constraint string of the subtree, with parentheses around nested binary operators """
+
+        elements: List[str] = []
+        stack: List[Union[str, SharedNode]] = [self]
+
+        while stack:
+            item = stack.pop()
+
+            if isinstance(item, str):
+                elements.append(item)
+                continue
+
+            # the stack is LIFO, so the elements of each node are pushed in reverse order
+            if not item.childs:
+                elements.append(item.name)
+            elif len(item.childs) == 1:
+                stack.extend(reversed([item.name + ' ', *_operand(item.childs[0])]))
+            else:
+                left, right = item.childs
+                stack.extend(reversed([
+                    *_operand(left), ' ' + item.name + ' ', *_operand(right)
+                ]))
+
+        return ''.join(elements)
+
+    def __str__(self) -> str:
+        return self.to_string()
+
+
+def _operand(node: SharedNode) -> List[Union[str, SharedNode]]:
+    if len(node.childs) > 1:
+        return ['(', node, ')']
+    return [node]
+
+
+class SharedNodeTable:
+    '''
+    Hash-consing table of SharedNode. A node is kept while some constraint uses it.
+    '''
+
+    def __init__(self) -> None:
+        self.nodes: 'WeakValueDictionary[Tuple[str, Tuple[SharedNode, ...]], SharedNode]' = (
+            WeakValueDictionary()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def make(self, name: str, childs: Tuple[SharedNode, ...] = ()) -> SharedNode:
+
+        key = (name, childs)
+        node = self.nodes.get(key)
+
+        if node is None:
+            node = SharedNode(name, childs)
+            self.nodes[key] = node
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return node
+
+    def from_ast(self, ast: AST) -> SharedNode:
+
+        shared: dict[int, SharedNode] = {}
+
+        # the nodes of an AST are in pre-order, so in reverse the childs come before their parent
+        for node in reversed(ast.get_nodes()):
+            shared[node.token] = self.make(
+                node.get_name(), tuple(shared[child.token] for child in ast.get_childs(node))
+            )
+
+        return shared[ast.get_root().token]
+
+    @staticmethod
+    def to_ast(string: str, root: SharedNode, grammar: Optional[Grammar] = None) -> AST:
+        """
+        AST of a preprocessed constraint string from the tree of its nodes, without parsing
+        it again: the nodes, in order, are the elements of the string that are not only
+        parentheses.
+        """
+
+        # the subtrees in pre-order, with the position of their parent and their level
+        order: List[SharedNode] = []
+        parents: List[int] = []
+        levels: List[int] = []
+        childs: List[List[int]] = []
+        stack: List[Tuple[SharedNode, int, int]] = [(root, -1, 1)]
+        while stack:
+            node, parent, level = stack.pop()
+            if parent >= 0:
+                childs[parent].append(len(order))
+            order.append(node)
+            parents.append(parent)
+            levels.append(level)
+            childs.append([])
+            stack.extend((child, len(order) - 1, level + 1) for child in reversed(node.childs))
+
+        # tokens in the order of the string: unary operators before their operand, binary
+        # operators between theirs
+        elements = ASTUtilities.string2list(string)
+        positions = iter([index for index, element in enumerate(elements) if element.strip('()')])
+        tokens = [0] * len(order)
+        visits: List[Tuple[int, bool]] = [(0, False)]
+        while visits:
+            index, visited = visits.pop()
+            operands = childs[index]
+            if visited or not operands:
+                tokens[index] = next(positions)
+            elif len(operands) == 1:
+                visits.extend(((operands[0], False), (index, True)))
+            else:
+                visits.extend(((operands[1], False), (index, True), (operands[0], False)))
+
+        nodes = []
+        for index, node in enumerate(order):
+            points_to = tokens[parents[index]] if parents[index] >= 0 else None
+            if node.childs:
+                nodes.append(Node(
+                    operator=node.name, points_to=points_to, level=levels[index],
+                    token=tokens[index]
+                ))
+            else:
+                nodes.append(Node(
+                    is_leaf=True, is_feature=True, feature=node.name, points_to=points_to,
+                    level=levels[index], token=tokens[index]
+                ))
+        return AST.from_nodes(string, nodes, grammar)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            'size': len(self.nodes),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class ASTCache:
+    '''
+    Interning layer in front of AST: a bounded LRU cache of parsed constraints keyed by the
+    normalized constraint string. Each get returns a new AST, built from the cached one
+    without parsing, so callers may edit it.
+
+    With hash_consing, the cache keeps only the SharedNode tree of each constraint, where
+    equal subtrees of different constraints are the same node, and builds the AST from it.
+    All of them are parsed with the same grammar (ASTINFO by default).
+    '''
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        hash_consing: bool = False,
+        grammar: Optional[Grammar] = None
+    ) -> None:
+        self.grammar = grammar
+        self.entries: LRUCache[str, Union[AST, SharedNode]] = LRUCache(maxsize)
+        self.shared_nodes: Optional[SharedNodeTable] = None
+        if hash_consing:
+            self.shared_nodes = SharedNodeTable()
+
+    @staticmethod
+    def normalize(constraint: str) -> str:
+        return ASTUtilities.preprocessing(constraint)
+
+    def get_entry(self, key: str) -> Tuple[Union[AST, SharedNode], Optional[AST]]:
+        """ The cached entry of a normalized constraint, and its AST if it was just parsed """
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry, None
+
+        ast = AST(key, self.grammar)
+        entry = ast if self.shared_nodes is None else self.shared_nodes.from_ast(ast)
+        self.entries.put(key, entry)
+        return entry, ast
+
+    def get(self, constraint: str) -> AST:
+
+        key = ASTCache.normalize(constraint)
+        entry, parsed = self.get_entry(key)
+        if isinstance(entry, SharedNode):
+            if parsed is not None:
+                return parsed
+            return SharedNodeTable.to_ast(key, entry, self.grammar)
+        return entry.copy()
+
+    def get_shared_node(self, constraint: str) -> SharedNode:
+
+        if self.shared_nodes is None:
+            raise ValueError('The cache was created without hash_consing')
+
+        entry = self.get_entry(ASTCache.normalize(constraint))[0]
+        assert isinstance(entry, SharedNode)
+        return entry
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = self.entries.get_stats()
+        if self.shared_nodes is not None:
+            stats['shared_nodes'] = self.shared_nodes.get_stats()
+        return stats
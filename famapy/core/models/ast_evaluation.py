@@ -0,0 +1,164 @@
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from famapy.core.models.ast import AST
+from famapy.core.models.ast_cache import SharedNode, SharedNodeTable
+
+
+# numpy implementation of each operator of ASTINFO over boolean vectors
+OPERATIONS: dict[str, Callable[..., Any]] = {
+    'not': np.logical_not,
+    'and': np.logical_and,
+    'or': np.logical_or,
+    'implies': lambda left, right: np.logical_or(np.logical_not(left), right),
+    'requires': lambda left, right: np.logical_or(np.logical_not(left), right),
+    'excludes': lambda left, right: np.logical_not(np.logical_and(left, right)),
+}
+
+# (operation, register of the result, registers of the operands); features are loaded
+# with a None operation and the column of the feature as operand
+Instruction = Tuple[Optional[Callable[..., Any]], int, Tuple[int, ...]]
+
+
+class ASTEvaluator:
+    '''
+    Evaluates a set of constraints over many configurations at once.
+
+    The constraints are compiled into a flat program where each distinct subexpression is
+    computed once, as a vectorized operation over a boolean matrix with one row per
+    configuration and one column per feature (in the order given by features).
+    '''
+
+    def __init__(self, asts: Union[AST, Iterable[AST]], features: Sequence[str]) -> None:
+
+        if isinstance(asts, AST):
+            asts = [asts]
+
+        self.features = list(features)
+        self.columns = {feature: column for column, feature in enumerate(self.features)}
+        self.program: List[Instruction] = []
+        self.outputs: List[int] = []
+
+        table = SharedNodeTable()
+        registers: dict[SharedNode, int] = {}
+        for ast in asts:
+            root = table.from_ast(ast)
+            self.compile(root, registers)
+            self.outputs.append(registers[root])
+
+        self.number_of_registers = len(self.program)
+        self.last_uses = self.compute_last_uses()
+
+    def compile(self, root: SharedNode, registers: dict[SharedNode, int]) -> None:
+
+        stack: List[Tuple[SharedNode, bool]] = [(root, False)]
+
+        while stack:
+            node, visited = stack.pop()
+            if node in registers:
+                continue
+
+            if node.is_feature():
+                if node.name not in self.columns:
+                    raise ValueError(f'Feature {node.name} is not in the evaluated features')
+                registers[node] = len(self.program)
+                self.program.append((None, registers[node], (self.columns[node.name],)))
+            elif visited:
+                if node.name not in OPERATIONS:
+                    raise ValueError(f'Operator {node.name} cannot be evaluated')
+                registers[node] = len(self.program)
+                self.program.append((
+                    OPERATIONS[node.name],
+                    registers[node],
+                    tuple(registers[child] for child in node.childs)
+                ))
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.childs))
+
+    # position of the last instruction reading each register, to release it afterwards
+    def compute_last_uses(self) -> List[List[int]]:
+
+        last_use = {register: -1 for register in range(self.number_of_registers)}
+        for position, (operation, _, operands) in enumerate(self.program):
+            if operation is not None:
+                for register in operands:
+                    last_use[register] = position
+
+        outputs = set(self.outputs)
+        releases: List[List[int]] = [[] for _ in self.program]
+        for register, position in last_use.items():
+            if position >= 0 and register not in outputs:
+                releases[position].append(register)
+
+        return releases
+
+    def check_configurations(self, configurations: Any) -> Any:
+
+        matrix = np.asarray(configurations, dtype=bool)
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.features):
+            raise ValueError(
+                f'Expected a matrix of configurations x {len(self.features)} features, '
+                f'got shape {matrix.shape}'
+            )
+        return matrix
+
+    def evaluate_each(self, configurations: Any, chunk_size: Optional[int] = None) -> Any:
+        """
+        Returns a boolean matrix with one row per configuration and one column per
+        constraint, telling whether each configuration satisfies each constraint.
+        """
+
+        matrix = self.check_configurations(configurations)
+        result = np.empty((len(matrix), len(self.outputs)), dtype=bool)
+
+        for start, outputs in self.run_chunks(matrix, chunk_size):
+            for column, output in enumerate(outputs):
+                result[start:start + len(output), column] = output
+
+        return result
+
+    def evaluate(self, configurations: Any, chunk_size: Optional[int] = None) -> Any:
+        """ Returns the validity vector: whether each configuration satisfies all constraints """
+
+        matrix = self.check_configurations(configurations)
+        result = np.ones(len(matrix), dtype=bool)
+
+        for start, outputs in self.run_chunks(matrix, chunk_size):
+            for output in outputs:
+                result[start:start + len(output)] &= output
+
+        return result
+
+    def run_chunks(
+        self,
+        matrix: Any,
+        chunk_size: Optional[int]
+    ) -> Iterator[Tuple[int, List[Any]]]:
+
+        if chunk_size is None:
+            chunk_size = max(len(matrix), 1)
+
+        for start in range(0, len(matrix), chunk_size):
+            # one contiguous row per feature, so that loading a feature does not stride
+            columns = np.ascontiguousarray(matrix[start:start + chunk_size].T)
+            yield start, self.run(columns)
+
+    def run(self, columns: Any) -> List[Any]:
+
+        registers: List[Any] = [None] * self.number_of_registers
+
+        for position, (operation, register, operands) in enumerate(self.program):
+            if operation is None:
+                registers[register] = columns[operands[0]]
+            else:
+                registers[register] = operation(*(registers[operand] for operand in operands))
+            for released in self.last_uses[position]:
+                registers[released] = None
+
+        return [registers[output] for output in self.outputs]
+
+
+def compile_ast(ast: AST, features: Sequence[str]) -> ASTEvaluator:
+    return ASTEvaluator(ast, features)
@@ -0,0 +1,324 @@
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from famapy.core.models.ast import AST
+from famapy.core.models.ast_cache import SharedNode, SharedNodeTable
+
+
+# result of a simplification: a constraint, or a constant when it is always true or false
+Simplified = Union[bool, SharedNode]
+
+# value of each decided feature; features that are missing or None are undecided
+Assignment = Mapping[str, Optional[bool]]
+
+
+class PartialEvaluation(NamedTuple):
+    residuals: dict[int, AST]  # position of each undecided constraint -> simplified constraint
+    violated: List[int]  # positions of the constraints that are false
+
+
+# the operands of an operator, with the polarity they have in its negation normal form
+def nnf_operands(node: SharedNode, positive: bool) -> List[Tuple[SharedNode, bool]]:
+
+    if node.name == 'not':
+        return [(node.childs[0], not positive)]
+
+    left, right = node.childs
+    if node.name in ('and', 'or'):
+        return [(left, positive), (right, positive)]
+    if node.name in ('implies', 'requires'):
+        return [(left, not positive), (right, positive)]
+    if node.name == 'excludes':
+        return [(left, not positive), (right, not positive)]
+
+    raise ValueError(f'Operator {node.name} cannot be rewritten')
+
+
+class ASTRewriter:
+    '''
+    Rewrites constraints into smaller equivalent ones:
+    * normalize: "requires" becomes "implies", "A excludes B" becomes "not (A and B)" and
+      double negations are removed.
+    * to_nnf: negations are pushed down to the features, leaving only "and", "or" and
+      negated features.
+    * simplify: "and"/"or" chains are flattened, repeated operands are removed and
+      constants are folded, e.g. "A and A" is "A" and "A or not A" is always true.
+
+    * partial_evaluate: the constraint is evaluated with true, false or undecided features,
+      giving a constant or the simplified constraint over the undecided features.
+
+    The rewriting works on SharedNode trees and every result is memoized per subtree, so
+    subtrees repeated in one or several constraints are rewritten once.
+    '''
+
+    def __init__(self, shared_nodes: Optional[SharedNodeTable] = None) -> None:
+        self.shared_nodes = shared_nodes if shared_nodes is not None else SharedNodeTable()
+        self.normalized: dict[SharedNode, SharedNode] = {}
+        self.nnf: dict[Tuple[SharedNode, bool], SharedNode] = {}
+        self.simplified: dict[SharedNode, Simplified] = {}
+
+    def rewrite(self, ast: AST, nnf: bool = True) -> Union[bool, AST]:
+        """
+        Normalizes (and puts in negation normal form) and simplifies a constraint. Returns
+        a bool if the constraint is always true or always false.
+        """
+
+        node = self.normalize(self.shared_nodes.from_ast(ast))
+        if nnf:
+            node = self.to_nnf(node)
+
+        result = self.simplify(node)
+        if isinstance(result, bool):
+            return result
+
+        return AST(result.to_string())
+
+    def partial_evaluate(self, ast: AST, assignment: Assignment) -> Union[bool, AST]:
+        """
+        Evaluates a constraint with the decided features of a partial assignment. Returns its
+        value, or the simplified constraint if it depends on undecided features.
+        """
+
+        result = self.evaluate(self.shared_nodes.from_ast(ast), assignment, {})
+        if isinstance(result, bool):
+            return result
+
+        return AST(result.to_string())
+
+    def partial_evaluate_all(
+        self,
+        asts: Iterable[AST],
+        assignment: Assignment
+    ) -> PartialEvaluation:
+        """
+        Evaluates every constraint with the same partial assignment, evaluating the subtrees
+        shared by several constraints once. Satisfied constraints are left out of the result.
+        """
+
+        evaluation = PartialEvaluation({}, [])
+        values: dict[SharedNode, Simplified] = {}
+
+        for position, ast in enumerate(asts):
+            result = self.evaluate(self.shared_nodes.from_ast(ast), assignment, values)
+            if result is False:
+                evaluation.violated.append(position)
+            elif not isinstance(result, bool):
+                evaluation.residuals[position] = AST(result.to_string())
+
+        return evaluation
+
+    def evaluate(
+        self,
+        root: SharedNode,
+        assignment: Assignment,
+        values: dict[SharedNode, Simplified]
+    ) -> Simplified:
+
+        stack: List[Tuple[SharedNode, bool]] = [(root, False)]
+
+        while stack:
+            node, visited = stack.pop()
+            if node in values:
+                continue
+
+            if node.is_feature():
+                value = assignment.get(node.name)
+                values[node] = node if value is None else bool(value)
+                continue
+
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.childs))
+                continue
+
+            values[node] = self.fold(node.name, [values[child] for child in node.childs])
+
+        return values[root]
+
+    def make(self, name: str, *childs: SharedNode) -> SharedNode:
+        return self.shared_nodes.make(name, childs)
+
+    def negate(self, node: SharedNode) -> SharedNode:
+        if node.name == 'not' and node.childs:
+            return node.childs[0]
+        return self.make('not', node)
+
+    def normalize(self, root: SharedNode) -> SharedNode:
+
+        stack: List[Tuple[SharedNode, bool]] = [(root, False)]
+
+        while stack:
+            node, visited = stack.pop()
+            if node in self.normalized:
+                continue
+
+            if node.is_feature():
+                self.normalized[node] = node
+                continue
+
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.childs))
+                continue
+
+            childs = [self.normalized[child] for child in node.childs]
+            if node.name == 'not':
+                result = self.negate(childs[0])
+            elif node.name == 'requires':
+                result = self.make('implies', *childs)
+            elif node.name == 'excludes':
+                result = self.make('not', self.make('and', *childs))
+            else:
+                result = self.make(node.name, *childs)
+
+            self.normalized[node] = result
+
+        return self.normalized[root]
+
+    def to_nnf(self, root: SharedNode) -> SharedNode:
+
+        stack: List[Tuple[SharedNode, bool, bool]] = [(root, True, False)]
+
+        while stack:
+            node, positive, visited = stack.pop()
+            if (node, positive) in self.nnf:
+                continue
+
+            if node.is_feature():
+                self.nnf[(node, positive)] = node if positive else self.make('not', node)
+                continue
+
+            operands = nnf_operands(node, positive)
+
+            if not visited:
+                stack.append((node, positive, True))
+                stack.extend((child, polarity, False) for child, polarity in reversed(operands))
+                continue
+
+            childs = [self.nnf[operand] for operand in operands]
+            if node.name == 'not':
+                result = childs[0]
+            elif node.name in ('and', 'or'):
+                kind = 'and' if (node.name == 'and') == positive else 'or'
+                result = self.make(kind, *childs)
+            else:
+                result = self.make('or' if positive else 'and', *childs)
+
+            self.nnf[(node, positive)] = result
+
+        return self.nnf[(root, True)]
+
+    # operands of a chain of the same associative operator, e.g. A, B, C in A and (B and C)
+    @staticmethod
+    def chain(node: SharedNode) -> List[SharedNode]:
+
+        operands = []
+        stack = [node]
+
+        while stack:
+            item = stack.pop()
+            if item.name == node.name and len(item.childs) == 2:
+                stack.extend(reversed(item.childs))
+            else:
+                operands.append(item)
+
+        return operands
+
+    def simplify(self, root: SharedNode) -> Simplified:
+
+        stack: List[Tuple[SharedNode, bool]] = [(root, False)]
+
+        while stack:
+            node, visited = stack.pop()
+            if node in self.simplified:
+                continue
+
+            if node.is_feature():
+                self.simplified[node] = node
+                continue
+
+            # a chain is simplified at once, not one binary operator at a time
+            operands = node.childs
+            if node.name in ('and', 'or'):
+                operands = tuple(ASTRewriter.chain(node))
+
+            if not visited:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in reversed(operands))
+                continue
+
+            self.simplified[node] = self.fold(
+                node.name, [self.simplified[operand] for operand in operands]
+            )
+
+        return self.simplified[root]
+
+    def fold(self, name: str, operands: List[Simplified]) -> Simplified:  # noqa: MC0001
+
+        if name == 'not':
+            operand = operands[0]
+            if isinstance(operand, bool):
+                return not operand
+            return self.negate(operand)
+
+        if name in ('and', 'or'):
+            return self.fold_chain(name, operands)
+
+        left, right = operands
+
+        if name in ('implies', 'requires'):
+            if left is False or right is True:
+                return True
+            if left is True:
+                return right
+            if right is False:
+                return self.fold('not', [left])
+            assert isinstance(left, SharedNode) and isinstance(right, SharedNode)
+            if left is right:
+                return True
+            if self.negate(left) is right:
+                return right
+            return self.make(name, left, right)
+
+        if name == 'excludes':
+            if left is False or right is False:
+                return True
+            if left is True:
+                return self.fold('not', [right])
+            if right is True:
+                return self.fold('not', [left])
+            assert isinstance(left, SharedNode) and isinstance(right, SharedNode)
+            if left is right:
+                return self.negate(left)
+            if self.negate(left) is right:
+                return True
+            return self.make(name, left, right)
+
+        raise ValueError(f'Operator {name} cannot be rewritten')
+
+    def fold_chain(self, name: str, operands: List[Simplified]) -> Simplified:
+
+        # the constant that absorbs the chain ("and" with false) and the neutral one
+        absorbing = name == 'or'
+
+        items: dict[SharedNode, None] = {}
+        for operand in operands:
+            if isinstance(operand, bool):
+                if operand is absorbing:
+                    return absorbing
+                continue
+            for item in ASTRewriter.chain(operand) if operand.name == name else [operand]:
+                items[item] = None
+
+        negated = {item.childs[0] for item in items if item.name == 'not' and item.childs}
+        if any(item in negated for item in items):
+            return absorbing
+
+        if not items:
+            return not absorbing
+
+        nodes = list(items)
+        result = nodes[-1]
+        for node in reversed(nodes[:-1]):
+            result = self.make(name, node, result)
+
+        return result
@@ -0,0 +1,259 @@
+import mmap
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from famapy.core.models.ast import AST, Grammar, Node
+from famapy.core.models.symbol_table import SymbolTable
+from famapy.core.utils import paused_gc
+
+
+MAGIC = b'FMAST'
+VERSION = 1
+
+# opcode of the nodes that are features; operators are numbered from 1, first the unary
+# operators of the grammar and then the binary ones
+FEATURE = 0
+
+
+def encode_varint(value: int, output: bytearray) -> None:
+    """ Appends an unsigned integer in LEB128: 7 bits per byte, low bits first """
+
+    if value < 0:
+        raise ValueError('Only unsigned integers can be encoded')
+
+    while value >= 0x80:
+        output.append((value & 0x7F) | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def decode_varint(buffer: Any, position: int) -> Tuple[int, int]:
+    """ Returns the integer encoded at position and the position after it """
+
+    value = 0
+    shift = 0
+
+    while True:
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def decode_varints(buffer: Any) -> List[int]:
+    """ Decodes a buffer that only contains varints """
+
+    values = buffer.tolist()
+    # fast path: every value fits in one byte
+    if max(values, default=0) < 0x80:
+        return values
+
+    decoded = []
+    position = 0
+    while position < len(values):
+        value, position = decode_varint(values, position)
+        decoded.append(value)
+    return decoded
+
+
+def encode_string(string: str, output: bytearray) -> None:
+    data = string.encode('utf-8')
+    encode_varint(len(data), output)
+    output.extend(data)
+
+
+def decode_string(buffer: Any, position: int) -> Tuple[str, int]:
+    size, position = decode_varint(buffer, position)
+    return str(buffer[position:position + size], 'utf-8'), position + size
+
+
+def serialize_asts(asts: Iterable[AST], symbols: Optional[SymbolTable] = None) -> bytes:
+    """
+    Encodes constraints, parsed with the same grammar, as a bundle:
+
+    * header: magic, version, operators of the grammar and feature names of the symbol table
+    * number of constraints, and one record per constraint prefixed by its size
+    * record: preprocessed string, and the nodes in pre-order as (opcode, feature id for
+      features, token, index of the parent node + 1 or 0 for the root)
+
+    Features missing from the symbol table are added to it.
+    """
+
+    asts = list(asts)
+    if symbols is None:
+        symbols = SymbolTable()
+
+    grammar = asts[0].grammar if asts else Grammar()
+    if any(ast.grammar != grammar for ast in asts):
+        raise ValueError('All the constraints of a bundle must use the same grammar')
+
+    opcodes = {
+        operator: opcode
+        for opcode, operator in enumerate(grammar.unary_operators + grammar.binary_operators, 1)
+    }
+
+    records = bytearray()
+    record = bytearray()
+    for ast in asts:
+        record.clear()
+        encode_string(ast.string, record)
+        encode_varint(len(ast.nodes), record)
+
+        indexes: dict[int, int] = {}
+        for index, node in enumerate(ast.nodes):
+            indexes[node.token] = index
+            if node.is_feature:
+                encode_varint(FEATURE, record)
+                encode_varint(symbols.add(node.feature), record)
+            else:
+                encode_varint(opcodes[node.operator], record)
+            encode_varint(node.token, record)
+            encode_varint(indexes[node.points_to] + 1 if node.points_to is not None else 0, record)
+
+        encode_varint(len(record), records)
+        records.extend(record)
+
+    output = bytearray(MAGIC)
+    output.append(VERSION)
+    for operators in (grammar.unary_operators, grammar.binary_operators):
+        encode_varint(len(operators), output)
+        for operator in operators:
+            encode_string(operator, output)
+
+    encode_varint(len(symbols), output)
+    for name in symbols.names:
+        # auxiliary variables have no name, they are kept to preserve the numbering
+        encode_string(name if name is not None else '', output)
+
+    encode_varint(len(asts), output)
+    output.extend(records)
+    return bytes(output)
+
+
+class ASTBundle:
+    '''
+    Constraints encoded by serialize_asts, read from bytes, a memoryview or an mmap without
+    copying the buffer. Only the header is decoded when the bundle is opened; each AST is
+    decoded, without parsing its string, when it is requested.
+    '''
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> None:
+
+        # checked before the buffer is exported, so that an invalid mmap can be closed
+        header = bytes(buffer[:len(MAGIC) + 1])
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError('The buffer is not an AST bundle')
+        if header[-1] != VERSION:
+            raise ValueError(f'Unsupported AST bundle version {header[-1]}')
+
+        self.buffer = memoryview(buffer)
+        self.file_map: Optional[mmap.mmap] = None
+
+        position = len(MAGIC) + 1
+        operators: List[List[str]] = []
+        for _ in range(2):
+            number, position = decode_varint(self.buffer, position)
+            operators.append([])
+            for _ in range(number):
+                operator, position = decode_string(self.buffer, position)
+                operators[-1].append(operator)
+        self.grammar = Grammar(operators[0], operators[1])
+        self.operators = [''] + operators[0] + operators[1]
+
+        self.symbols = SymbolTable()
+        number, position = decode_varint(self.buffer, position)
+        for _ in range(number):
+            name, position = decode_string(self.buffer, position)
+            if name:
+                self.symbols.add(name)
+            else:
+                self.symbols.add_auxiliary()
+
+        # start of each record, found by skipping the records with their sizes
+        number, position = decode_varint(self.buffer, position)
+        self.offsets: List[Tuple[int, int]] = []
+        for _ in range(number):
+            size, position = decode_varint(self.buffer, position)
+            self.offsets.append((position, position + size))
+            position += size
+
+    @classmethod
+    def from_file(cls, filepath: str) -> 'ASTBundle':
+        """ Maps a bundle file in memory. The bundle must be closed to release the file """
+
+        with open(filepath, 'rb') as file:
+            file_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            bundle = cls(file_map)
+        except ValueError:
+            file_map.close()
+            raise
+
+        bundle.file_map = file_map
+        return bundle
+
+    def close(self) -> None:
+        self.buffer.release()
+        if self.file_map is not None:
+            self.file_map.close()
+
+    def __enter__(self) -> 'ASTBundle':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> AST:
+        return self.get_ast(index)
+
+    def __iter__(self) -> Iterator[AST]:
+        for index in range(len(self.offsets)):
+            yield self.get_ast(index)
+
+    def get_ast(self, index: int) -> AST:
+
+        names = self.symbols.names
+        operators = self.operators
+
+        start, end = self.offsets[index]
+        string, start = decode_string(self.buffer, start)
+        values = decode_varints(self.buffer[start:end])
+
+        nodes: List[Node] = []
+        position = 1
+        for _ in range(values[0]):
+            opcode = values[position]
+            if opcode == FEATURE:
+                feature = names[values[position + 1] - 1] or ''
+                position += 1
+            token = values[position + 1]
+            parent = values[position + 2]
+            position += 3
+
+            if parent:
+                points_to = nodes[parent - 1].token
+                level = nodes[parent - 1].level + 1
+            else:
+                points_to = None
+                level = 1
+
+            # positional arguments of Node: token, is_leaf, feature, is_feature,
+            # unary_operator, binary_operator, points_to, operator, level
+            if opcode == FEATURE:
+                nodes.append(Node(token, True, feature, True, False, False, points_to, '', level))
+            else:
+                nodes.append(Node(
+                    token, False, '', False, False, False, points_to, operators[opcode], level
+                ))
+
+        return AST.from_nodes(string, nodes, self.grammar)
+
+
+def load_asts(buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> List[AST]:
+    with paused_gc():
+        return list(ASTBundle(buffer))
@@ -0,0 +1,334 @@
+import itertools
+import shutil
+import tempfile
+from array import array
+from typing import Any, Generator, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from famapy.core.models.ast import AST
+from famapy.core.models.ast_cache import SharedNode, SharedNodeTable
+from famapy.core.models.ast_rewriting import nnf_operands
+from famapy.core.models.symbol_table import SymbolTable
+
+
+Clause = Tuple[int, ...]
+
+# formula in negation normal form used by the distribution mode: a literal, or an
+# ("and" | "or", operands) pair whose operands are not of the same kind
+NNF = Union[int, Tuple[str, Tuple[Any, ...]]]
+
+
+class CNF:
+    '''
+    Set of clauses over the variables of a symbol table.
+
+    The clauses are stored in a flat array of DIMACS literals, each clause followed by a 0,
+    instead of one Python object per clause and literal.
+    '''
+
+    def __init__(self, symbols: Optional[SymbolTable] = None) -> None:
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.literals = array('i')
+        self.number_of_clauses = 0
+        self.max_variable = 0
+
+    def __len__(self) -> int:
+        return self.number_of_clauses
+
+    def add_clause(self, clause: Iterable[int]) -> None:
+        literals = tuple(clause)
+        if 0 in literals:
+            raise ValueError('0 is not a valid literal')
+        if literals:
+            self.max_variable = max(self.max_variable, max(map(abs, literals)))
+        self.literals.extend(literals)
+        self.literals.append(0)
+        self.number_of_clauses += 1
+
+    def add_clauses(self, clauses: Iterable[Iterable[int]]) -> None:
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def get_clauses(self) -> Iterator[Clause]:
+        start = 0
+        literals = self.literals
+        for end, literal in enumerate(literals):
+            if literal == 0:
+                yield tuple(literals[start:end])
+                start = end + 1
+
+    def get_number_of_variables(self) -> int:
+        return max(len(self.symbols), self.max_variable)
+
+    def write_dimacs(self, file: TextIO) -> None:
+        """ Writes the clauses in DIMACS format, with the feature names as comments """
+
+        write_dimacs_header(
+            self.symbols, self.get_number_of_variables(), self.number_of_clauses, file
+        )
+
+        start = 0
+        literals = self.literals
+        for end, literal in enumerate(literals):
+            if literal == 0:
+                file.write(' '.join(map(str, literals[start:end + 1])))
+                file.write('\n')
+                start = end + 1
+
+
+def write_dimacs_header(
+    symbols: SymbolTable,
+    number_of_variables: int,
+    number_of_clauses: int,
+    file: TextIO
+) -> None:
+
+    for identifier, name in enumerate(symbols.names, start=1):
+        if name is not None:
+            file.write(f'c {identifier} {name}\n')
+
+    file.write(f'p cnf {number_of_variables} {number_of_clauses}\n')
+
+
+class CNFEncoder:
+    '''
+    Translates constraints into clauses over the variables of a symbol table.
+
+    In TSEITIN mode every distinct subformula gets an auxiliary variable defined as
+    equivalent to it, so the number of clauses is linear in the size of the constraints and
+    the auxiliary variables do not change the number of solutions. Subformulas shared by
+    several constraints are encoded only once.
+
+    In DISTRIBUTION mode the constraints are put in negation normal form and disjunctions
+    are distributed over conjunctions, which does not add variables but may produce an
+    exponential number of clauses.
+
+    Clauses are produced lazily, so they can be streamed into a CNF or a file. An encoder
+    remembers the subformulas it has already defined, so all the clauses it produces belong
+    to the same CNF.
+    '''
+
+    TSEITIN = 'tseitin'
+    DISTRIBUTION = 'distribution'
+
+    def __init__(self, symbols: Optional[SymbolTable] = None, mode: str = TSEITIN) -> None:
+        if mode not in (CNFEncoder.TSEITIN, CNFEncoder.DISTRIBUTION):
+            raise ValueError(f'Unknown encoding mode {mode}')
+
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.mode = mode
+        self.shared_nodes = SharedNodeTable()
+        self.literals: dict[SharedNode, int] = {}
+        self.gates: dict[Tuple[int, int], int] = {}
+
+    def encode(self, asts: Union[AST, Iterable[AST]], cnf: Optional[CNF] = None) -> CNF:
+
+        if cnf is None:
+            cnf = CNF(self.symbols)
+        elif cnf.symbols is not self.symbols:
+            raise ValueError('The CNF must use the symbol table of the encoder')
+
+        if isinstance(asts, AST):
+            asts = [asts]
+
+        for ast in asts:
+            cnf.add_clauses(self.iter_clauses(ast))
+
+        return cnf
+
+    def write_dimacs(self, asts: Union[AST, Iterable[AST]], file: TextIO) -> None:
+        """
+        Writes the clauses of the constraints as CNF.write_dimacs does, without keeping them
+        in memory: they go to a temporary file as they are encoded, and are copied after the
+        header once their number is known.
+        """
+
+        if isinstance(asts, AST):
+            asts = [asts]
+
+        number_of_clauses = 0
+        max_variable = 0
+        with tempfile.TemporaryFile('w+') as clauses:
+            for ast in asts:
+                for clause in self.iter_clauses(ast):
+                    if clause:
+                        max_variable = max(max_variable, max(map(abs, clause)))
+                    clauses.write(' '.join(map(str, (*clause, 0))))
+                    clauses.write('\n')
+                    number_of_clauses += 1
+
+            variables = max(len(self.symbols), max_variable)
+            write_dimacs_header(self.symbols, variables, number_of_clauses, file)
+            clauses.seek(0)
+            shutil.copyfileobj(clauses, file)
+
+    def iter_clauses(self, constraint: Union[AST, SharedNode]) -> Iterator[Clause]:
+
+        if isinstance(constraint, AST):
+            constraint = self.shared_nodes.from_ast(constraint)
+
+        if self.mode == CNFEncoder.DISTRIBUTION:
+            yield from self.distribute(self.to_nnf(constraint))
+            return
+
+        # the top level conjunctions and disjunctions do not need auxiliary variables
+        for conjunct, positive in flatten(constraint, True, conjunction=True):
+            disjuncts = flatten(conjunct, positive, conjunction=False)
+            clause = []
+            for disjunct, disjunct_positive in disjuncts:
+                yield from self.define(disjunct)
+                literal = self.literals[disjunct]
+                clause.append(literal if disjunct_positive else -literal)
+            normalized = normalize_clause(clause)
+            if normalized is not None:
+                yield normalized
+
+    # Tseitin encoding: every operator is rewritten in terms of AND gates
+    def define(self, root: SharedNode) -> Generator[Clause, None, None]:
+
+        stack: List[Tuple[SharedNode, bool]] = [(root, False)]
+
+        while stack:
+            node, visited = stack.pop()
+            if node in self.literals:
+                continue
+
+            if node.is_feature():
+                self.literals[node] = self.symbols.add(node.name)
+                continue
+
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.childs))
+                continue
+
+            operands = [self.literals[child] for child in node.childs]
+            if node.name == 'not':
+                literal = -operands[0]
+            elif node.name == 'and':
+                literal = yield from self.and_gate(operands[0], operands[1])
+            elif node.name == 'or':
+                literal = -(yield from self.and_gate(-operands[0], -operands[1]))
+            elif node.name in ('implies', 'requires'):
+                literal = -(yield from self.and_gate(operands[0], -operands[1]))
+            elif node.name == 'excludes':
+                literal = -(yield from self.and_gate(operands[0], operands[1]))
+            else:
+                raise ValueError(f'Operator {node.name} cannot be encoded')
+
+            self.literals[node] = literal
+
+    def and_gate(self, left: int, right: int) -> Generator[Clause, None, int]:
+
+        if left == right:
+            return left
+
+        key = (min(left, right), max(left, right))
+        variable = self.gates.get(key)
+
+        if variable is None:
+            variable = self.symbols.add_auxiliary()
+            self.gates[key] = variable
+            yield (-variable, left)
+            yield (-variable, right)
+            if left != -right:
+                yield (variable, -left, -right)
+
+        return variable
+
+    def to_nnf(self, root: SharedNode) -> NNF:
+
+        nnf: dict[Tuple[SharedNode, bool], NNF] = {}
+        stack: List[Tuple[SharedNode, bool, bool]] = [(root, True, False)]
+
+        while stack:
+            node, positive, visited = stack.pop()
+            if (node, positive) in nnf:
+                continue
+
+            if node.is_feature():
+                variable = self.symbols.add(node.name)
+                nnf[(node, positive)] = variable if positive else -variable
+                continue
+
+            operands = nnf_operands(node, positive)
+
+            if not visited:
+                stack.append((node, positive, True))
+                stack.extend(
+                    (child, child_positive, False)
+                    for child, child_positive in reversed(operands)
+                )
+                continue
+
+            if node.name == 'not':
+                nnf[(node, positive)] = nnf[operands[0]]
+                continue
+
+            kind = 'and' if (node.name == 'and') == positive else 'or'
+            if node.name in ('implies', 'requires', 'excludes'):
+                kind = 'or' if positive else 'and'
+
+            items: List[NNF] = []
+            for operand in operands:
+                formula = nnf[operand]
+                if isinstance(formula, tuple) and formula[0] == kind:
+                    items.extend(formula[1])
+                else:
+                    items.append(formula)
+            nnf[(node, positive)] = (kind, tuple(items))
+
+        return nnf[(root, True)]
+
+    def distribute(self, formula: NNF) -> Iterator[Clause]:
+
+        if isinstance(formula, int):
+            yield (formula,)
+            return
+
+        kind, operands = formula
+        if kind == 'and':
+            for operand in operands:
+                yield from self.distribute(operand)
+            return
+
+        for clauses in itertools.product(*(tuple(self.distribute(op)) for op in operands)):
+            normalized = normalize_clause(itertools.chain.from_iterable(clauses))
+            if normalized is not None:
+                yield normalized
+
+
+# splits a formula in the operands of its top level conjunction (or disjunction)
+def flatten(
+    root: SharedNode,
+    positive: bool,
+    conjunction: bool
+) -> List[Tuple[SharedNode, bool]]:
+
+    # operators that behave as a conjunction (or as a disjunction) in each polarity
+    splittable = {
+        True: {'and'} if conjunction else {'or', 'implies', 'requires', 'excludes'},
+        False: {'or', 'implies', 'requires', 'excludes'} if conjunction else {'and'},
+    }
+
+    items = []
+    stack = [(root, positive)]
+
+    while stack:
+        node, node_positive = stack.pop()
+        if node.name == 'not' and node.childs:
+            stack.append((node.childs[0], not node_positive))
+        elif node.childs and node.name in splittable[node_positive]:
+            stack.extend(reversed(nnf_operands(node, node_positive)))
+        else:
+            items.append((node, node_positive))
+
+    return items
+
+
+# removes repeated literals, or returns None if the clause is a tautology
+def normalize_clause(literals: Iterable[int]) -> Optional[Clause]:
+    clause = tuple(dict.fromkeys(literals))
+    seen = set(clause)
+    if any(-literal in seen for literal in clause):
+        return None
+    return clause
@@ -0,0 +1,294 @@
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from famapy.core.models.cnf import CNF, Clause
+from famapy.core.models.sat_solver import SATSolver
+
+
+# an interaction is a sorted tuple of literal indexes of different features: index 2 * i is
+# the selection of the i-th feature, 2 * i + 1 its deselection
+Interaction = Tuple[int, ...]
+
+
+class Coverage:
+    '''
+    Interactions of t literals covered by some configuration, or known to be invalid.
+
+    Interactions are grouped by their first t - 1 literals (the prefix), and the last
+    literals of the covered interactions of each prefix are stored as the bits of an int,
+    so a configuration is added with one bitwise operation per prefix. Prefixes are visited
+    in order, and the ones with no uncovered interactions left are not visited again.
+    '''
+
+    def __init__(self, strength: int, solver: SATSolver, variables: Sequence[int]) -> None:
+
+        features = len(variables)
+        if not 1 <= strength <= features:
+            raise ValueError('The strength must be between 1 and the number of features')
+
+        self.features = features
+        self.strength = strength
+        self.solver = solver
+        self.variables = list(variables)
+        self.indexes = {variable: index for index, variable in enumerate(self.variables)}
+        self.covered: dict[Interaction, int] = {}
+        self.full = (1 << 2 * features) - 1
+
+        self.prefixes = self.iter_prefixes()
+        self.pending: deque[Interaction] = deque()  # prefixes visited that may be uncovered
+
+    def iter_prefixes(self) -> Iterator[Interaction]:
+        for features in itertools.combinations(range(self.features), self.strength - 1):
+            for signs in itertools.product((0, 1), repeat=self.strength - 1):
+                yield tuple(2 * feature + sign for feature, sign in zip(features, signs))
+
+    def get_literal(self, index: int) -> int:
+        variable = self.variables[index >> 1]
+        return -variable if index & 1 else variable
+
+    def get_index(self, literal: int) -> Optional[int]:
+        feature = self.indexes.get(abs(literal))
+        if feature is None:
+            return None
+        return 2 * feature + (literal < 0)
+
+    def get_free(self, prefix: Interaction) -> int:
+        """ Last literals of the uncovered interactions of the prefix """
+
+        start = 2 * ((prefix[-1] >> 1) + 1) if prefix else 0
+        return self.full & ~((1 << start) - 1) & ~self.covered.get(prefix, 0)
+
+    def visit(self, prefix: Interaction) -> None:
+        """ Marks the interactions of the prefix that unit propagation proves invalid """
+
+        propagated = self.solver.get_propagated(self.get_literal(index) for index in prefix)
+        if propagated is None:
+            self.covered[prefix] = self.full
+            return
+
+        invalid = 0
+        for literal in propagated:
+            index = self.get_index(-literal)
+            if index is not None:
+                invalid |= 1 << index
+        self.covered[prefix] = self.covered.get(prefix, 0) | invalid
+
+    def get_uncovered(self, limit: int) -> List[Interaction]:
+        """ The first uncovered interactions, at most limit """
+
+        while self.pending and not self.get_free(self.pending[0]):
+            self.pending.popleft()
+
+        uncovered: List[Interaction] = []
+        position = 0
+        while len(uncovered) < limit:
+            if position < len(self.pending):
+                prefix = self.pending[position]
+            else:
+                following = next(self.prefixes, None)
+                if following is None:
+                    break
+                prefix = following
+                self.visit(prefix)
+                self.pending.append(prefix)
+            position += 1
+
+            free = self.get_free(prefix)
+            while free and len(uncovered) < limit:
+                lowest = free & -free
+                uncovered.append(prefix + (lowest.bit_length() - 1,))
+                free ^= lowest
+
+        return uncovered
+
+    def add_configuration(self, configuration: Sequence[int]) -> int:
+        """ Adds the interactions of a configuration (one literal per feature) """
+
+        selected = 0
+        for index in configuration:
+            selected |= 1 << index
+
+        added = 0
+        for prefix in itertools.combinations(sorted(configuration), self.strength - 1):
+            new = selected & self.get_free(prefix)
+            if new:
+                self.covered[prefix] = self.covered.get(prefix, 0) | new
+                added += bin(new).count('1')
+        return added
+
+    def exclude(self, interaction: Interaction) -> None:
+        """ Marks an invalid interaction """
+
+        prefix = interaction[:-1]
+        self.covered[prefix] = self.covered.get(prefix, 0) | 1 << interaction[-1]
+
+
+class TWiseSampler:
+    '''
+    Greedy t-wise covering arrays, as in YASA: each configuration starts from the first
+    interaction not covered yet and then tries to cover the next uncovered interactions
+    too, with a bounded number of solver calls, before it is completed by the solver. An
+    interaction that the current solution already satisfies is added without calling the
+    solver. Interactions whose literals cannot hold together are found by unit propagation
+    or when they fail to start a configuration, and are not covered.
+
+    The solver completes each configuration preferring the literals that have appeared in
+    fewer configurations, so consecutive configurations cover different interactions.
+
+    With several workers, each round builds one candidate configuration per worker, in a
+    pool of processes, from different starting interactions; every candidate that still
+    covers new interactions is kept.
+    '''
+
+    def __init__(
+        self,
+        cnf: CNF,
+        variables: Sequence[int],
+        strength: int = 2,
+        workers: int = 1,
+        calls: int = 10,
+        candidates: int = 500
+    ) -> None:
+
+        if workers < 1:
+            raise ValueError('The number of workers must be positive')
+
+        self.clauses = list(cnf.get_clauses())
+        self.number_of_variables = cnf.get_number_of_variables()
+        self.solver = SATSolver(cnf)
+        self.variables = list(variables)
+        self.strength = strength
+        self.workers = workers
+        self.calls = calls
+        self.candidates = candidates
+
+    def iter_configurations(self) -> Iterator[List[int]]:
+        """ Yields the configurations of the array, as lists of literals of the variables """
+
+        backbone = set(self.solver.get_backbone(self.variables))
+        if not self.solver.solve():
+            return
+
+        # the features of the backbone have the same value in every configuration
+        variables = [variable for variable in self.variables if variable not in backbone and
+                     -variable not in backbone]
+        fixed = sorted(backbone, key=abs)
+        if not variables:
+            yield fixed
+            return
+
+        # with fewer features than the strength, all their valid combinations are covered
+        coverage = Coverage(min(self.strength, len(variables)), self.solver, variables)
+        occurrences = [0] * (2 * len(variables))
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.clauses, self.number_of_variables)
+            )
+
+        try:
+            while True:
+                uncovered = coverage.get_uncovered(self.candidates)
+                if not uncovered:
+                    return
+
+                preferences = [
+                    coverage.get_literal(2 * feature + (occurrences[2 * feature] >
+                                                        occurrences[2 * feature + 1]))
+                    for feature in range(len(variables))
+                ]
+                seeds = uncovered[:self.workers]
+                arguments = [
+                    ([coverage.get_literal(index) for index in seed],
+                     [[coverage.get_literal(index) for index in item] for item in uncovered],
+                     preferences, self.calls)
+                    for seed in seeds
+                ]
+                if executor is None:
+                    results = [build_configuration(self.solver, *item) for item in arguments]
+                else:
+                    results = list(executor.map(build_in_worker, *zip(*arguments)))
+
+                for seed, model in zip(seeds, results):
+                    if model is None:
+                        coverage.exclude(seed)
+                        continue
+                    values = set(model)
+                    configuration = [
+                        2 * feature + (variable not in values)
+                        for feature, variable in enumerate(variables)
+                    ]
+                    if coverage.add_configuration(configuration):
+                        for index in configuration:
+                            occurrences[index] += 1
+                        yield sorted(
+                            fixed + [coverage.get_literal(index) for index in configuration],
+                            key=abs
+                        )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+
+def build_configuration(
+    solver: SATSolver,
+    seed: List[int],
+    candidates: List[List[int]],
+    preferences: List[int],
+    calls: int
+) -> Optional[List[int]]:
+    """
+    A solution with the literals of the seed and of as many candidates as possible, None if
+    the seed is invalid.
+    """
+
+    assumptions = list(seed)
+    if not solver.solve(assumptions, preferences):
+        return None
+
+    model = set(solver.get_model())
+    assigned = set(assumptions)
+    for candidate in candidates:
+        literals = [literal for literal in candidate if literal not in assigned]
+        if not literals or any(-literal in assigned for literal in literals):
+            continue
+        if all(literal in model for literal in literals):
+            assumptions.extend(literals)
+            assigned.update(literals)
+            continue
+        if not calls:
+            continue
+
+        calls -= 1
+        if solver.solve(assumptions + literals, preferences):
+            model = set(solver.get_model())
+            assumptions.extend(literals)
+            assigned.update(literals)
+
+    return sorted(model, key=abs)
+
+
+# solver of the worker processes, created once per process by the pool
+WORKER_SOLVER: Optional[SATSolver] = None
+
+
+def init_worker(clauses: List[Clause], number_of_variables: int) -> None:
+    global WORKER_SOLVER  # pylint: disable=global-statement
+    WORKER_SOLVER = SATSolver()
+    WORKER_SOLVER.add_variables(number_of_variables)
+    for clause in clauses:
+        WORKER_SOLVER.add_clause(clause)
+
+
+def build_in_worker(
+    seed: List[int],
+    candidates: List[List[int]],
+    preferences: List[int],
+    calls: int
+) -> Optional[List[int]]:
+    assert WORKER_SOLVER is not None
+    return build_configuration(WORKER_SOLVER, seed, candidates, preferences, calls)
@@ -0,0 +1,446 @@
+import heapq
+import random
+from typing import Any, Generator, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from famapy.core.models.cnf import CNF, Clause
+from famapy.core.models.symbol_table import SymbolTable
+
+
+# compilation step: a generator that yields the steps it depends on, receives the node
+# compiled by each of them and returns its own node
+Step = Generator[Any, int, int]
+
+
+class DDNNF:
+    '''
+    Decision-DNNF: a circuit of literals, conjunctions of children without common variables
+    and decisions on a variable, where both branches exclude each other. Nodes are numbered
+    in the order they are created, so the childs of a node always come before it.
+
+    The number of models of every node is computed when it is created, as an arbitrary
+    precision int, over the variables of its scope. A variable of a decision that does not
+    appear in one of its branches is free in that branch.
+    '''
+
+    LITERAL = 'literal'
+    AND = 'and'
+    DECISION = 'decision'
+
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, number_of_variables: int) -> None:
+        self.number_of_variables = number_of_variables
+        self.root = DDNNF.TRUE
+
+        # the false node is a decision without branches, the true node is an empty "and"
+        self.kinds: List[str] = [DDNNF.DECISION, DDNNF.AND]
+        self.literals: List[int] = [0, 0]  # literal of the literal nodes, variable of decisions
+        self.childs: List[Tuple[int, ...]] = [(), ()]
+        self.scopes: List[frozenset[int]] = [frozenset(), frozenset()]
+        self.counts: List[int] = [0, 1]
+        self.literal_nodes: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def share(self, root: int, number_of_variables: int) -> 'DDNNF':
+        """ Circuit with the given root over the same nodes, which are not copied """
+
+        ddnnf = DDNNF(number_of_variables)
+        ddnnf.root = root
+        ddnnf.kinds = self.kinds
+        ddnnf.literals = self.literals
+        ddnnf.childs = self.childs
+        ddnnf.scopes = self.scopes
+        ddnnf.counts = self.counts
+        ddnnf.literal_nodes = self.literal_nodes
+        return ddnnf
+
+    def add_node(
+        self,
+        kind: str,
+        literal: int,
+        childs: Tuple[int, ...],
+        scope: frozenset[int],
+        count: int
+    ) -> int:
+
+        self.kinds.append(kind)
+        self.literals.append(literal)
+        self.childs.append(childs)
+        self.scopes.append(scope)
+        self.counts.append(count)
+        return len(self.kinds) - 1
+
+    def make_literal(self, literal: int) -> int:
+        node = self.literal_nodes.get(literal)
+        if node is None:
+            node = self.add_node(DDNNF.LITERAL, literal, (), frozenset((abs(literal),)), 1)
+            self.literal_nodes[literal] = node
+        return node
+
+    def make_and(self, childs: Sequence[int]) -> int:
+
+        if DDNNF.FALSE in childs:
+            return DDNNF.FALSE
+        childs = tuple(child for child in childs if child != DDNNF.TRUE)
+        if not childs:
+            return DDNNF.TRUE
+        if len(childs) == 1:
+            return childs[0]
+
+        count = 1
+        for child in childs:
+            count *= self.counts[child]
+        scope = frozenset().union(*(self.scopes[child] for child in childs))
+        return self.add_node(DDNNF.AND, 0, childs, scope, count)
+
+    def make_decision(self, variable: int, high: int, low: int, scope: frozenset[int]) -> int:
+        """ Node for "(variable and high) or (not variable and low)" over the scope """
+
+        if high == low == DDNNF.FALSE:
+            return DDNNF.FALSE
+
+        free = len(scope) - 1
+        count = (
+            (self.counts[high] << (free - len(self.scopes[high]))) +
+            (self.counts[low] << (free - len(self.scopes[low])))
+        )
+        return self.add_node(DDNNF.DECISION, variable, (high, low), scope, count)
+
+    def count(self) -> int:
+        """ Number of assignments of all the variables that satisfy the circuit """
+        return self.counts[self.root] << (self.number_of_variables - len(self.scopes[self.root]))
+
+    def count_marginals(self) -> List[int]:
+        """
+        Number of models where each variable is true, indexed by variable, in one pass from
+        the root: each node receives the number of ways to complete its models into models
+        of the circuit (the derivative of the count by the count of the node).
+        """
+
+        marginals = [0] * (self.number_of_variables + 1)
+        if self.root == DDNNF.FALSE:
+            return marginals
+
+        counts = self.counts
+        scopes = self.scopes
+        derivatives = [0] * len(self.kinds)
+        free = self.number_of_variables - len(scopes[self.root])
+        derivatives[self.root] = 1 << free
+        if free:
+            half = counts[self.root] << (free - 1)
+            for variable in set(range(1, self.number_of_variables + 1)) - scopes[self.root]:
+                marginals[variable] += half
+
+        for node in range(self.root, 1, -1):
+            derivative = derivatives[node]
+            if not derivative:
+                continue
+
+            kind = self.kinds[node]
+            if kind == DDNNF.LITERAL:
+                if self.literals[node] > 0:
+                    marginals[self.literals[node]] += derivative
+            elif kind == DDNNF.AND:
+                for child in self.childs[node]:
+                    derivatives[child] += derivative * counts[node] // counts[child]
+            else:
+                variable = self.literals[node]
+                for child, positive in zip(self.childs[node], (True, False)):
+                    if child == DDNNF.FALSE:
+                        continue
+                    gap = len(scopes[node]) - 1 - len(scopes[child])
+                    derivatives[child] += derivative << gap
+                    models = (derivative * counts[child]) << gap
+                    if positive:
+                        marginals[variable] += models
+                    # the variables missing from the branch are free in it
+                    if gap:
+                        for other in scopes[node] - scopes[child] - {variable}:
+                            marginals[other] += models >> 1
+
+        return marginals
+
+    def iter_samples(self, generator: random.Random) -> Iterator[List[int]]:
+        """
+        Yields, without end, the variables true in models chosen uniformly at random: from
+        the root, each decision takes a branch with probability proportional to its number
+        of models, and the free variables take random values.
+        """
+
+        if self.root == DDNNF.FALSE:
+            raise ValueError('The circuit has no models')
+
+        # variables missing from each branch of the decisions reached, computed once
+        missing: dict[int, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        unused = sorted(set(range(1, self.number_of_variables + 1)) - self.scopes[self.root])
+        counts = self.counts
+        scopes = self.scopes
+
+        while True:
+            selected = [variable for variable in unused if generator.getrandbits(1)]
+            stack = [self.root]
+            while stack:
+                node = stack.pop()
+                kind = self.kinds[node]
+                if kind == DDNNF.LITERAL:
+                    if self.literals[node] > 0:
+                        selected.append(self.literals[node])
+                    continue
+                if kind == DDNNF.AND:
+                    stack.extend(self.childs[node])
+                    continue
+
+                variable = self.literals[node]
+                high, low = self.childs[node]
+                if node not in missing:
+                    missing[node] = (
+                        tuple(sorted(scopes[node] - scopes[high] - {variable})),
+                        tuple(sorted(scopes[node] - scopes[low] - {variable})),
+                    )
+                gap = len(scopes[node]) - 1 - len(scopes[high])
+                if generator.randrange(counts[node]) < counts[high] << gap:
+                    selected.append(variable)
+                    stack.append(high)
+                    free = missing[node][0]
+                else:
+                    stack.append(low)
+                    free = missing[node][1]
+                selected.extend(other for other in free if generator.getrandbits(1))
+
+            selected.sort()
+            yield selected
+
+    def get_commonalities(
+        self,
+        symbols: SymbolTable,
+        features: Optional[Iterable[str]] = None
+    ) -> dict[str, float]:
+        """ Fraction of the models where each feature (all by default) is selected """
+
+        total = self.count()
+        marginals = self.count_marginals()
+        if features is None:
+            features = symbols.get_features()
+        return {
+            feature: marginals[symbols.get_id(feature)] / total if total else 0.0
+            for feature in features
+        }
+
+
+class DDNNFCompiler:
+    '''
+    Compiles a CNF into a decision-DNNF, following a DPLL search: the clauses are simplified
+    by unit propagation, split into components that share no variables, and each component
+    is compiled by deciding on one of its variables.
+
+    Variables are decided in the reverse of a min-degree elimination order of the CNF, so
+    the variables that connect the most parts of the formula are decided first and the
+    components split early; the size of the result is exponential in the width of that
+    order instead of in the number of variables.
+
+    Components are cached by their clauses, so a component that is reached again under a
+    different assignment is compiled once. The cache and the nodes are kept between
+    compilations of the same compiler; each compilation returns its own circuit over them.
+    The search is run with an explicit stack, so deep decisions do not hit the recursion
+    limit.
+
+    The models are assignments of all the variables of the CNF. The auxiliary variables of
+    the Tseitin encoding are determined by the features, so they do not change the count.
+    '''
+
+    def __init__(self) -> None:
+        self.ddnnf = DDNNF(0)  # nodes of all the compilations
+        self.components: dict[Tuple[Clause, ...], int] = {}
+        self.ranks: dict[int, int] = {}
+
+    def compile(self, cnf: CNF) -> DDNNF:
+        clauses = list(cnf.get_clauses())
+        self.ranks = elimination_ranks(clauses)
+        root = run(self.compile_formula(clauses, ()))
+        return self.ddnnf.share(root, cnf.get_number_of_variables())
+
+    def compile_formula(self, clauses: List[Clause], literals: Tuple[int, ...]) -> Step:
+        """ Compiles the clauses assuming the literals, which are not part of the node """
+
+        conditioned = condition(clauses, literals)
+        if conditioned is None:
+            return DDNNF.FALSE
+
+        implied, residual = conditioned
+        childs = [self.ddnnf.make_literal(literal) for literal in implied]
+        for component in split_components(residual):
+            key = tuple(sorted(component))
+            node = self.components.get(key)
+            if node is None:
+                node = yield self.compile_component(key)
+                self.components[key] = node
+            if node == DDNNF.FALSE:
+                return DDNNF.FALSE
+            childs.append(node)
+
+        return self.ddnnf.make_and(childs)
+
+    def compile_component(self, clauses: Tuple[Clause, ...]) -> Step:
+
+        occurrences: dict[int, int] = {}
+        for clause in clauses:
+            for literal in clause:
+                variable = abs(literal)
+                occurrences[variable] = occurrences.get(variable, 0) + 1
+        variable = max(occurrences, key=lambda item: (self.ranks.get(item, 0), -item))
+
+        high = yield self.compile_formula(list(clauses), (variable,))
+        low = yield self.compile_formula(list(clauses), (-variable,))
+        return self.ddnnf.make_decision(variable, high, low, frozenset(occurrences))
+
+
+# runs a compilation step and the steps it yields, returning the result of the first one
+def run(step: Step) -> int:
+
+    stack = [step]
+    result: Optional[int] = None
+
+    while stack:
+        try:
+            child = stack[-1].send(result)  # type: ignore
+        except StopIteration as stop:
+            stack.pop()
+            result = stop.value
+            continue
+        stack.append(child)
+        result = None
+
+    assert result is not None
+    return result
+
+
+def condition(
+    clauses: Iterable[Clause],
+    literals: Iterable[int]
+) -> Optional[Tuple[List[int], List[Clause]]]:
+    """
+    Assigns the literals and propagates the unit clauses. Returns the literals implied by
+    propagation and the remaining clauses, or None if there is a conflict.
+    """
+
+    clauses = list(clauses)
+    # an empty clause cannot be satisfied
+    if not all(clauses):
+        return None
+
+    # literal -> clauses that contain its negation, which may become unit when it is assigned
+    watched: dict[int, List[int]] = {}
+    for index, clause in enumerate(clauses):
+        for literal in clause:
+            watched.setdefault(-literal, []).append(index)
+
+    assigned: set[int] = set()
+    implied: List[int] = []
+    queue: List[int] = []
+
+    def assign(literal: int, is_implied: bool) -> bool:
+        if -literal in assigned:
+            return False
+        if literal not in assigned:
+            assigned.add(literal)
+            queue.append(literal)
+            if is_implied:
+                implied.append(literal)
+        return True
+
+    # the unassigned literal of a clause that is not satisfied, 0 if there are several
+    def unit(clause: Clause) -> Optional[int]:
+        found = None
+        for literal in clause:
+            if literal in assigned:
+                return 0
+            if -literal not in assigned:
+                if found is not None:
+                    return 0
+                found = literal
+        return found
+
+    for literal in literals:
+        if not assign(literal, False):
+            return None
+    for clause in clauses:
+        if len(clause) == 1 and not assign(clause[0], True):
+            return None
+
+    while queue:
+        for index in watched.get(queue.pop(), ()):
+            found = unit(clauses[index])
+            if found is None or (found and not assign(found, True)):
+                return None
+
+    residual = []
+    for clause in clauses:
+        if not any(literal in assigned for literal in clause):
+            residual.append(tuple(literal for literal in clause if -literal not in assigned))
+    return implied, residual
+
+
+# position of each variable in a min-degree elimination order of the graph whose edges join
+# the variables that appear in the same clause
+def elimination_ranks(clauses: List[Clause]) -> dict[int, int]:
+
+    neighbours: dict[int, set[int]] = {}
+    for clause in clauses:
+        variables = {abs(literal) for literal in clause}
+        for variable in variables:
+            neighbours.setdefault(variable, set()).update(variables)
+    for variable, adjacent in neighbours.items():
+        adjacent.discard(variable)
+
+    heap = [(len(adjacent), variable) for variable, adjacent in neighbours.items()]
+    heapq.heapify(heap)
+    ranks: dict[int, int] = {}
+
+    while heap:
+        degree, variable = heapq.heappop(heap)
+        if variable in ranks or degree != len(neighbours[variable]):
+            continue  # outdated entry
+
+        # eliminating a variable connects all its neighbours
+        ranks[variable] = len(ranks)
+        adjacent = neighbours.pop(variable)
+        for other in adjacent:
+            neighbours[other].discard(variable)
+            neighbours[other].update(adjacent)
+            neighbours[other].discard(other)
+            heapq.heappush(heap, (len(neighbours[other]), other))
+
+    return ranks
+
+
+# groups the clauses that share variables, directly or through other clauses
+def split_components(clauses: List[Clause]) -> List[List[Clause]]:
+
+    parents: dict[int, int] = {}
+
+    def find(variable: int) -> int:
+        root = parents.setdefault(variable, variable)
+        while root != parents[root]:
+            parents[root] = parents[parents[root]]
+            root = parents[root]
+        return root
+
+    for clause in clauses:
+        first = find(abs(clause[0]))
+        for literal in clause[1:]:
+            other = find(abs(literal))
+            if other != first:
+                parents[other] = first
+
+    components: dict[int, List[Clause]] = {}
+    for clause in clauses:
+        components.setdefault(find(abs(clause[0])), []).append(clause)
+    return list(components.values())
+
+
+def count_models(cnf: CNF) -> int:
+    """ Number of assignments of the variables of the CNF that satisfy all the clauses """
+    return DDNNFCompiler().compile(cnf).count()
@@ -0,0 +1,310 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from famapy.core.models.cnf import Clause
+from famapy.core.models.sat_solver import SATSolver
+from famapy.core.utils import LRUCache
+
+
+# state of a FastDiag run: a stack of frames, each a tuple whose first item is its kind
+Frame = Tuple[Any, ...]
+Stack = Tuple[Frame, ...]
+
+CALL = 0  # FD(diagnosis, candidates, constraints) has to start
+CHECKED = 1  # waits for the consistency of its constraints
+FIRST_HALF = 2  # waits for the diagnosis of the first half of its candidates
+SECOND_HALF = 3  # waits for the diagnosis of the second half
+
+
+class ConsistencyChecker:
+    '''
+    Checks if sets of constraints are consistent with some background clauses (e.g. the
+    relations of the feature tree, that cannot be part of a diagnosis). Each constraint is
+    a group of clauses enabled by its own selector variable, so every check is a call to one
+    incremental solver with the selectors of the constraints as assumptions.
+
+    The solver is created when it is first needed and is not pickled, so a checker can be
+    sent to other processes.
+    '''
+
+    def __init__(self, background: Iterable[Clause], constraints: Iterable[Iterable[Clause]]):
+        self.background = [tuple(clause) for clause in background]
+        self.constraints = [[tuple(clause) for clause in constraint] for constraint in constraints]
+        self.solver: Optional[SATSolver] = None
+        self.selectors: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.constraints)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state['solver'] = None
+        return state
+
+    def get_solver(self) -> SATSolver:
+
+        if self.solver is None:
+            self.solver = SATSolver()
+            variables = max(
+                (abs(literal) for clause in self.all_clauses() for literal in clause),
+                default=0
+            )
+            self.selectors = list(range(variables + 1, variables + 1 + len(self.constraints)))
+            self.solver.add_variables(variables + len(self.constraints))
+            for clause in self.background:
+                self.solver.add_clause(clause)
+            for selector, constraint in zip(self.selectors, self.constraints):
+                for clause in constraint:
+                    self.solver.add_clause((-selector,) + clause)
+
+        return self.solver
+
+    def all_clauses(self) -> Iterable[Clause]:
+        yield from self.background
+        for constraint in self.constraints:
+            yield from constraint
+
+    def is_consistent(self, constraints: Iterable[int]) -> bool:
+        solver = self.get_solver()
+        return solver.solve([self.selectors[index] for index in sorted(constraints)])
+
+
+class FastDiag:
+    '''
+    Finds minimal diagnoses, sets of constraints whose removal makes the others consistent,
+    with FastDiag: the candidates are split in halves recursively, so a diagnosis of d
+    constraints out of n takes O(d log(n / d)) consistency checks. More diagnoses are found
+    by keeping, in turn, each constraint of the diagnoses already found (as in a hitting set
+    tree), until the requested number is reached.
+
+    Constraints are identified by their position in the checker, and earlier constraints are
+    preferred: they are kept whenever there is a choice.
+
+    With several workers, every time a check is needed the next checks that FastDiag could
+    make, for each possible answer, are started speculatively in a pool of processes, so the
+    answers that turn out to be needed are usually ready. The answers are kept in a cache,
+    which can be shared by several engines over the same checker (e.g. in a session).
+    '''
+
+    def __init__(
+        self,
+        checker: ConsistencyChecker,
+        workers: int = 1,
+        cache: Optional[LRUCache[frozenset[int], bool]] = None
+    ) -> None:
+
+        if workers < 1:
+            raise ValueError('The number of workers must be positive')
+
+        self.checker = checker
+        self.workers = workers
+        self.cache = cache if cache is not None else LRUCache(maxsize=100_000)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending: dict[frozenset[int], Future[bool]] = {}
+        self.deadline: Optional[float] = None
+        self.diagnoses: List[List[int]] = []
+
+    def find_diagnoses(
+        self,
+        number: int = 1,
+        timeout: Optional[float] = None
+    ) -> List[List[int]]:
+        """
+        Up to number minimal diagnoses, in the order they are found. Returns an empty list
+        if the constraints are consistent, or if the background alone is inconsistent. When
+        the timeout (in seconds) expires, the diagnoses found so far are returned.
+        """
+
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=init_worker, initargs=(self.checker,)
+            )
+
+        try:
+            return self.search(number)
+        except FutureTimeout:
+            return self.diagnoses
+        finally:
+            if self.executor is not None:
+                for future in self.pending.values():
+                    future.cancel()
+                self.executor.shutdown(wait=True)
+                self.executor = None
+            self.pending.clear()
+
+    def search(self, number: int) -> List[List[int]]:
+
+        self.diagnoses = []
+        constraints = frozenset(range(len(self.checker)))
+        if number < 1 or self.check(constraints, ()):
+            return self.diagnoses
+
+        # each node of the tree keeps some constraints, which cannot be in its diagnosis
+        queue: deque[frozenset[int]] = deque([frozenset()])
+        visited: set[frozenset[int]] = {frozenset()}
+        while queue and len(self.diagnoses) < number:
+            kept = queue.popleft()
+            diagnosis = next(
+                (diagnosis for diagnosis in self.diagnoses if kept.isdisjoint(diagnosis)), None
+            )
+            if diagnosis is None:
+                candidates = tuple(index for index in range(len(self.checker)) if index not in kept)
+                diagnosis = self.diagnose(candidates, constraints)
+                if diagnosis is None:
+                    continue
+                self.diagnoses.append(diagnosis)
+
+            for index in diagnosis:
+                child = kept | {index}
+                if child not in visited:
+                    visited.add(child)
+                    queue.append(child)
+
+        return self.diagnoses
+
+    def diagnose(
+        self,
+        candidates: Tuple[int, ...],
+        constraints: frozenset[int]
+    ) -> Optional[List[int]]:
+        """ A minimal diagnosis among the candidates, None if the rest are inconsistent """
+
+        if not candidates or not self.check(constraints - frozenset(candidates), ()):
+            return None
+
+        # FastDiag removes the first candidates it can, so the last ones are given first
+        query, stack, result = advance(((CALL, (), candidates[::-1], constraints),), None)
+        while query is not None:
+            answer = self.check(query, stack)
+            query, stack, result = advance(stack, answer)
+
+        return sorted(result)
+
+    def check(self, constraints: frozenset[int], stack: Stack) -> bool:
+        """ Consistency of the constraints; stack is the state of FastDiag that needs it """
+
+        answer = self.cache.get(constraints)
+        if answer is not None:
+            return answer
+
+        remaining = None
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise FutureTimeout()
+
+        if self.executor is None:
+            answer = self.checker.is_consistent(constraints)
+        else:
+            queries = [constraints] + self.speculate(constraints, stack)
+            # checks that FastDiag can no longer need are dropped if they have not started
+            for query in set(self.pending).difference(queries):
+                if self.pending[query].cancel():
+                    del self.pending[query]
+            for query in queries:
+                if query not in self.pending:
+                    self.pending[query] = self.executor.submit(check_in_worker, query)
+            answer = self.pending.pop(constraints).result(timeout=remaining)
+            self.collect()
+
+        self.cache.put(constraints, answer)
+        return answer
+
+    def speculate(self, query: frozenset[int], stack: Stack) -> List[frozenset[int]]:
+        """ Checks that FastDiag may need after query, for each possible answer """
+
+        limit = 2 * self.workers
+        queries: List[frozenset[int]] = []
+        frontier: deque[Tuple[frozenset[int], Stack]] = deque([(query, stack)])
+        explored = 0
+
+        while frontier and len(queries) < limit and explored < 8 * limit:
+            query, stack = frontier.popleft()
+            explored += 1
+            known = self.cache.data.get(query)
+            for answer in (False, True) if known is None else (known,):
+                following, following_stack, _ = advance(stack, answer)
+                if following is None:
+                    continue
+                if following not in self.cache and following not in queries:
+                    queries.append(following)
+                frontier.append((following, following_stack))
+
+        return queries[:limit]
+
+    def collect(self) -> None:
+        """ Stores the answers of the speculative checks that have finished """
+
+        for query, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[query]
+                if not future.cancelled():
+                    self.cache.put(query, future.result())
+
+
+def advance(stack: Stack, value: Any) -> Tuple[Optional[frozenset[int]], Stack, Any]:
+    """
+    Runs FastDiag, given the answer (value) to the check that the state needs, until the
+    next check. Returns (constraints to check, state, None), or (None, (), diagnosis) when
+    FastDiag finishes. States are immutable, so a state can be continued with both answers.
+    """
+
+    while stack:
+        frame = stack[-1]
+        stack = stack[:-1]
+        kind = frame[0]
+
+        if kind == CALL:
+            _, diagnosis, candidates, constraints = frame
+            if diagnosis:
+                return constraints, stack + ((CHECKED, candidates, constraints),), None
+            stack, value = split(stack, candidates, constraints)
+        elif kind == CHECKED:
+            _, candidates, constraints = frame
+            if value:
+                value = ()
+            else:
+                stack, value = split(stack, candidates, constraints)
+        elif kind == FIRST_HALF:
+            _, first, constraints = frame
+            stack += ((SECOND_HALF, value), (CALL, value, first, constraints - frozenset(value)))
+        else:
+            value = frame[1] + value
+
+    return None, stack, value
+
+
+# FD with an inconsistent diagnosis: a single candidate is the diagnosis, otherwise both
+# halves are diagnosed, the second one first
+def split(
+    stack: Stack,
+    candidates: Sequence[int],
+    constraints: frozenset[int]
+) -> Tuple[Stack, Any]:
+
+    if len(candidates) == 1:
+        return stack, tuple(candidates)
+
+    half = len(candidates) // 2
+    first, second = tuple(candidates[:half]), tuple(candidates[half:])
+    return stack + (
+        (FIRST_HALF, first, constraints),
+        (CALL, first, second, constraints - frozenset(first)),
+    ), None
+
+
+# checker of the worker processes, created once per process by the pool
+WORKER_CHECKER: Optional[ConsistencyChecker] = None
+
+
+def init_worker(checker: ConsistencyChecker) -> None:
+    global WORKER_CHECKER  # pylint: disable=global-statement
+    WORKER_CHECKER = checker
+
+
+def check_in_worker(constraints: frozenset[int]) -> bool:
+    assert WORKER_CHECKER is not None
+    return WORKER_CHECKER.is_consistent(constraints)
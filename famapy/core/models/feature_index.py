@@ -0,0 +1,129 @@
+from typing import Iterable, Iterator, List, Optional
+
+from famapy.core.exceptions import ElementNotFound
+from famapy.core.models.ast import AST
+from famapy.core.models.symbol_table import SymbolTable
+
+
+class FeatureIndex:
+    '''
+    Inverted index of a set of constraints: for each feature, the constraints that mention it
+    and the tokens of its nodes in each of them, and the number of constraints where each
+    pair of features appears together.
+
+    Constraints are identified by the id returned when they are added, and can be added and
+    removed at any time. Features are identified by the ids of the symbol table.
+    '''
+
+    def __init__(
+        self,
+        asts: Iterable[AST] = (),
+        symbols: Optional[SymbolTable] = None
+    ) -> None:
+
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.constraints: dict[int, AST] = {}
+        self.next_id = 0
+
+        # feature id -> constraint id -> tokens of the nodes of the feature
+        self.occurrences: dict[int, dict[int, List[int]]] = {}
+        # constraint id -> ids of its features, without repetitions
+        self.features: dict[int, List[int]] = {}
+        # feature id -> feature id -> number of constraints with both features
+        self.co_occurrences: dict[int, dict[int, int]] = {}
+
+        for ast in asts:
+            self.add(ast)
+
+    def __len__(self) -> int:
+        return len(self.constraints)
+
+    def __contains__(self, constraint_id: object) -> bool:
+        return constraint_id in self.constraints
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.constraints)
+
+    def add(self, ast: AST) -> int:
+        """ Indexes a constraint and returns its id """
+
+        constraint_id = self.next_id
+        self.next_id += 1
+        self.constraints[constraint_id] = ast
+
+        tokens: dict[int, List[int]] = {}
+        for node in ast.get_features():
+            tokens.setdefault(self.symbols.add(node.feature), []).append(node.token)
+
+        features = list(tokens)
+        self.features[constraint_id] = features
+        for feature, feature_tokens in tokens.items():
+            self.occurrences.setdefault(feature, {})[constraint_id] = feature_tokens
+            counts = self.co_occurrences.setdefault(feature, {})
+            for other in features:
+                if other != feature:
+                    counts[other] = counts.get(other, 0) + 1
+
+        return constraint_id
+
+    def remove(self, constraint_id: int) -> AST:
+        """ Removes a constraint from the index and returns it """
+
+        if constraint_id not in self.constraints:
+            raise ElementNotFound(constraint_id)
+
+        features = self.features.pop(constraint_id)
+        for feature in features:
+            occurrences = self.occurrences[feature]
+            del occurrences[constraint_id]
+            if not occurrences:
+                del self.occurrences[feature]
+
+            counts = self.co_occurrences[feature]
+            for other in features:
+                if other != feature:
+                    counts[other] -= 1
+                    if not counts[other]:
+                        del counts[other]
+            if not counts:
+                del self.co_occurrences[feature]
+
+        return self.constraints.pop(constraint_id)
+
+    def get_ast(self, constraint_id: int) -> AST:
+        try:
+            return self.constraints[constraint_id]
+        except KeyError:
+            raise ElementNotFound(constraint_id)
+
+    def get_constraints(self, feature: str) -> List[int]:
+        """ Ids of the constraints that mention the feature """
+        return list(self.get_occurrences(feature))
+
+    def get_occurrences(self, feature: str) -> dict[int, List[int]]:
+        """ Tokens of the nodes of the feature in each constraint that mentions it """
+
+        if feature not in self.symbols:
+            return {}
+        occurrences = self.occurrences.get(self.symbols.get_id(feature), {})
+        return {constraint_id: list(tokens) for constraint_id, tokens in occurrences.items()}
+
+    def get_features(self, constraint_id: int) -> List[str]:
+        """ Features of a constraint, in order of appearance """
+
+        if constraint_id not in self.features:
+            raise ElementNotFound(constraint_id)
+        return [self.get_name(feature) for feature in self.features[constraint_id]]
+
+    def get_co_occurring(self, feature: str) -> dict[str, int]:
+        """ Features that appear together with the feature, with the number of constraints """
+
+        if feature not in self.symbols:
+            return {}
+        counts = self.co_occurrences.get(self.symbols.get_id(feature), {})
+        return {self.get_name(other): count for other, count in counts.items()}
+
+    def get_name(self, feature: int) -> str:
+        name = self.symbols.get_name(feature)
+        assert name is not None
+        return name
@@ -0,0 +1,56 @@
+from typing import Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+class ProductMatrix:
+    '''
+    Enumerated products as a boolean matrix with one row per product and one column per
+    feature (in the order given by features), so that statistics over all the products,
+    e.g. the commonality of every feature, are column operations.
+    '''
+
+    def __init__(self, matrix: Any, features: Sequence[str]) -> None:
+        self.matrix = np.asarray(matrix, dtype=bool)
+        self.features = list(features)
+        self.columns = {feature: column for column, feature in enumerate(self.features)}
+
+        if self.matrix.ndim != 2 or self.matrix.shape[1] != len(self.features):
+            raise ValueError('The matrix must have one column per feature')
+
+    @classmethod
+    def from_products(
+        cls,
+        products: Iterable[Iterable[str]],
+        features: Sequence[str]
+    ) -> 'ProductMatrix':
+        """ Matrix of products given as the features they select """
+
+        columns = {feature: column for column, feature in enumerate(features)}
+        rows: List[List[int]] = [[columns[feature] for feature in product] for product in products]
+
+        matrix = np.zeros((len(rows), len(columns)), dtype=bool)
+        for row, selected in enumerate(rows):
+            matrix[row, selected] = True
+        return cls(matrix, features)
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def count_selections(self) -> Any:
+        """ Number of products that select each feature """
+        return np.count_nonzero(self.matrix, axis=0)
+
+    def get_commonalities(self, features: Optional[Iterable[str]] = None) -> dict[str, float]:
+        """ Fraction of the products where each feature (all by default) is selected """
+
+        if features is None:
+            features = self.features
+        if not len(self.matrix):
+            return {feature: 0.0 for feature in features}
+
+        counts = self.count_selections()
+        return {
+            feature: float(counts[self.columns[feature]]) / len(self.matrix)
+            for feature in features
+        }
@@ -0,0 +1,416 @@
+import heapq
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from famapy.core.models.cnf import CNF
+
+
+class SATSolver:
+    '''
+    Incremental CDCL solver: two watched literals per clause, learning of the first unique
+    implication point clause, VSIDS activities, phase saving and Luby restarts.
+
+    Clauses can be added between calls to solve, and the clauses learned in a call are kept
+    for the next ones, which makes repeated queries on the same formula cheap. Assumptions
+    are literals that only hold during one call, e.g. a feature selected to check if it is
+    dead, so the formula does not have to be encoded again for each query.
+    '''
+
+    RESTART_INTERVAL = 100
+    ACTIVITY_DECAY = 0.95
+
+    def __init__(self, cnf: Optional[CNF] = None) -> None:
+        # indexed by variable; the value of a variable is 1, -1 or 0 if it is unassigned
+        self.values: List[int] = [0]
+        self.levels: List[int] = [0]
+        self.reasons: List[Optional[int]] = [None]
+        self.phases: List[bool] = [False]
+        self.activities: List[float] = [0.0]
+
+        self.clauses: List[List[int]] = []
+        self.watches: dict[int, List[int]] = {}  # literal -> clauses where it is watched
+        self.trail: List[int] = []
+        self.trail_limits: List[int] = []  # start of each decision level in the trail
+        self.propagated = 0
+        self.preferred = 0  # preferences before this one are assigned
+        self.heap: List[Tuple[float, int]] = []
+        self.increment = 1.0
+
+        self.unsatisfiable = False
+        self.model: List[int] = []
+
+        if cnf is not None:
+            self.add_variables(cnf.get_number_of_variables())
+            for clause in cnf.get_clauses():
+                self.add_clause(clause)
+
+    @property
+    def number_of_variables(self) -> int:
+        return len(self.values) - 1
+
+    def add_variables(self, number: int) -> None:
+        """ Makes sure that the variables up to number exist """
+
+        for variable in range(len(self.values), number + 1):
+            self.values.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.phases.append(False)
+            self.activities.append(0.0)
+            heapq.heappush(self.heap, (0.0, variable))
+
+    def add_clause(self, clause: Iterable[int]) -> None:
+
+        self.backtrack(0)
+        literals = list(dict.fromkeys(clause))
+        if 0 in literals:
+            raise ValueError('0 is not a valid literal')
+        self.add_variables(max(map(abs, literals), default=0))
+
+        seen = set(literals)
+        if any(-literal in seen or self.value(literal) == 1 for literal in literals):
+            return
+        literals = [literal for literal in literals if self.value(literal) == 0]
+
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+        else:
+            self.attach(literals)
+
+    def value(self, literal: int) -> int:
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def solve(self, assumptions: Sequence[int] = (), preferences: Sequence[int] = ()) -> bool:
+        """
+        Whether the clauses and the assumptions can be satisfied. If they can, get_model
+        returns a solution. Preferences are literals decided, in order, before any other
+        variable; unlike assumptions, they may be false in the solution.
+        """
+
+        self.backtrack(0)
+        self.add_variables(max(map(abs, [*assumptions, *preferences]), default=0))
+        if self.unsatisfiable or self.propagate() is not None:
+            self.unsatisfiable = True
+            return False
+
+        conflicts = 0
+        restarts = 0
+        limit = luby(restarts) * SATSolver.RESTART_INTERVAL
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+                self.learn(conflict)
+                conflicts += 1
+                continue
+
+            if conflicts >= limit:
+                self.backtrack(0)
+                conflicts = 0
+                restarts += 1
+                limit = luby(restarts) * SATSolver.RESTART_INTERVAL
+
+            literal = 0
+            while len(self.trail_limits) < len(assumptions):
+                assumption = assumptions[len(self.trail_limits)]
+                value = self.value(assumption)
+                if value == 1:
+                    self.trail_limits.append(len(self.trail))
+                elif value == -1:
+                    self.backtrack(0)
+                    return False
+                else:
+                    literal = assumption
+                    break
+
+            while not literal and self.preferred < len(preferences):
+                if not self.values[abs(preferences[self.preferred])]:
+                    literal = preferences[self.preferred]
+                self.preferred += 1
+
+            if not literal:
+                variable = self.pick_variable()
+                if variable is None:
+                    self.model = [
+                        variable if value == 1 else -variable
+                        for variable, value in enumerate(self.values) if variable
+                    ]
+                    self.backtrack(0)
+                    return True
+                literal = variable if self.phases[variable] else -variable
+
+            self.trail_limits.append(len(self.trail))
+            self.assign(literal, None)
+
+    def get_model(self) -> List[int]:
+        """ Literals of all the variables in the last solution found """
+        return list(self.model)
+
+    def get_backbone(self, variables: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        Literals of the variables (all by default) that hold in every solution, or an empty
+        list if there are no solutions.
+
+        Candidates are taken from a first solution and each one is checked by solving with
+        its negation; every solution found removes the candidates it contradicts, and the
+        solver decides the negation of the remaining candidates first, so that it finds
+        solutions that remove as many of them as possible. Backbone literals are added as clauses.
+        """
+
+        if variables is not None:
+            variables = list(variables)
+            self.add_variables(max(variables, default=0))
+        if not self.solve():
+            return []
+
+        values = set(self.model)
+        if variables is None:
+            candidates = list(self.model)
+        else:
+            candidates = [variable if variable in values else -variable for variable in variables]
+
+        remaining = dict.fromkeys(candidates)
+        backbone = []
+        for literal in candidates:
+            if literal not in remaining:
+                continue
+            if self.solve([-literal], [-other for other in remaining]):
+                values = set(self.model)
+                for other in [item for item in remaining if item not in values]:
+                    del remaining[other]
+            else:
+                del remaining[literal]
+                backbone.append(literal)
+                self.add_clause([literal])
+
+        return backbone
+
+    def get_implications(self, pairs: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        The pairs (condition, literal) where every solution that satisfies the condition
+        satisfies the literal, checked with solution filtering as get_backbone.
+        """
+
+        pairs = list(pairs)
+        remaining = dict.fromkeys(pairs)
+        implied = []
+
+        for pair in pairs:
+            if pair not in remaining:
+                continue
+            condition, literal = pair
+            preferences = [item for other in remaining for item in (other[0], -other[1])]
+            if self.solve([condition, -literal], preferences):
+                values = set(self.model)
+                for other in [item for item in remaining if item[0] in values]:
+                    if other[1] not in values:
+                        del remaining[other]
+            else:
+                del remaining[pair]
+                implied.append(pair)
+
+        return implied
+
+    def get_propagated(self, literals: Iterable[int]) -> Optional[List[int]]:
+        """
+        Literals that hold by unit propagation when the literals are true (including them
+        and the ones that always hold), or None if propagation finds a conflict. Cheaper
+        than solve but incomplete: a conflict proves that the literals cannot hold together,
+        while a result does not prove that they can.
+        """
+
+        self.backtrack(0)
+        if self.unsatisfiable or self.propagate() is not None:
+            self.unsatisfiable = True
+            return None
+
+        literals = list(literals)
+        self.add_variables(max(map(abs, literals), default=0))
+        self.trail_limits.append(len(self.trail))
+        for literal in literals:
+            value = self.value(literal)
+            if not value:
+                self.assign(literal, None)
+                value = 1 if self.propagate() is None else -1
+            if value == -1:
+                self.backtrack(0)
+                return None
+
+        propagated = list(self.trail)
+        self.backtrack(0)
+        return propagated
+
+    def attach(self, literals: List[int]) -> int:
+        index = len(self.clauses)
+        self.clauses.append(literals)
+        self.watches.setdefault(literals[0], []).append(index)
+        self.watches.setdefault(literals[1], []).append(index)
+        return index
+
+    def assign(self, literal: int, reason: Optional[int]) -> None:
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level: int) -> None:
+
+        if len(self.trail_limits) <= level:
+            return
+
+        start = self.trail_limits[level]
+        values = self.values
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            values[variable] = 0
+            self.reasons[variable] = None
+            self.phases[variable] = literal > 0
+
+        # after a long backtrack (e.g. at the end of a solve) the heap is rebuilt at once,
+        # which also drops its outdated entries
+        if len(self.trail) - start > len(self.heap):
+            self.heap = [
+                (-activity, variable)
+                for variable, activity in enumerate(self.activities)
+                if variable and not values[variable]
+            ]
+            heapq.heapify(self.heap)
+        else:
+            for literal in self.trail[start:]:
+                heapq.heappush(self.heap, (-self.activities[abs(literal)], abs(literal)))
+
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.preferred = 0
+        self.propagated = min(self.propagated, start)
+
+    def propagate(self) -> Optional[int]:
+        """ Assigns the literals implied by the trail; returns a conflicting clause, if any """
+
+        values = self.values
+        clauses = self.clauses
+
+        while self.propagated < len(self.trail):
+            false_literal = -self.trail[self.propagated]
+            self.propagated += 1
+
+            watching = self.watches.get(false_literal, [])
+            kept: List[int] = []
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                # the false literal is moved to the second watched position
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+
+                first = clause[0]
+                first_value = values[abs(first)] if first > 0 else -values[abs(first)]
+                if first_value == 1:
+                    kept.append(index)
+                    continue
+
+                for other in range(2, len(clause)):
+                    literal = clause[other]
+                    value = values[abs(literal)] if literal > 0 else -values[abs(literal)]
+                    if value != -1:
+                        clause[1], clause[other] = literal, false_literal
+                        self.watches.setdefault(literal, []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if first_value == -1:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(first, index)
+
+            self.watches[false_literal] = kept
+
+        return None
+
+    def learn(self, conflict: int) -> None:
+        """ Learns the first unique implication point clause of a conflict and backjumps """
+
+        level = len(self.trail_limits)
+        learned = [0]
+        seen = set()
+        pending = 0
+        literal = 0
+        position = len(self.trail) - 1
+        reason: Optional[int] = conflict
+
+        while True:
+            assert reason is not None
+            for other in self.clauses[reason]:
+                variable = abs(other)
+                if other == literal or variable in seen or not self.levels[variable]:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if not pending:
+                break
+            reason = self.reasons[abs(literal)]
+
+        learned[0] = -literal
+        self.increment /= SATSolver.ACTIVITY_DECAY
+
+        if len(learned) == 1:
+            self.backtrack(0)
+            self.assign(learned[0], None)
+            return
+
+        # the literal of the highest level is watched with the asserted one
+        highest = max(range(1, len(learned)), key=lambda item: self.levels[abs(learned[item])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        self.backtrack(self.levels[abs(learned[1])])
+        self.assign(learned[0], self.attach(learned))
+
+    def bump(self, variable: int) -> None:
+        self.activities[variable] += self.increment
+        if self.activities[variable] > 1e100:
+            self.activities = [activity * 1e-100 for activity in self.activities]
+            self.increment *= 1e-100
+            self.heap = [(-self.activities[item], item) for _, item in self.heap]
+            heapq.heapify(self.heap)
+        if not self.values[variable]:
+            heapq.heappush(self.heap, (-self.activities[variable], variable))
+
+    def pick_variable(self) -> Optional[int]:
+        """ The unassigned variable with the highest activity """
+
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if not self.values[variable] and -activity == self.activities[variable]:
+                return variable
+        return None
+
+
+# Luby sequence: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+def luby(index: int) -> int:
+
+    size, exponent = 1, 0
+    while size < index + 1:
+        exponent += 1
+        size = 2 * size + 1
+
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        exponent -= 1
+        index = index % size
+
+    return 1 << exponent
@@ -0,0 +1,59 @@
+from typing import Iterable, Iterator, List, Optional
+
+from famapy.core.exceptions import ElementNotFound
+
+
+class SymbolTable:
+    '''
+    Maps feature names to consecutive integer ids starting at 1, so that they can be used
+    directly as DIMACS variables. Auxiliary variables (e.g. the ones introduced by the
+    Tseitin encoding) share the same numbering but have no name.
+    '''
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.ids: dict[str, int] = {}
+        self.names: List[Optional[str]] = []
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def add(self, name: str) -> int:
+        """ Returns the id of the name, registering it if it is new """
+
+        identifier = self.ids.get(name)
+        if identifier is None:
+            self.names.append(name)
+            identifier = len(self.names)
+            self.ids[name] = identifier
+        return identifier
+
+    def add_auxiliary(self) -> int:
+        self.names.append(None)
+        return len(self.names)
+
+    def get_id(self, name: str) -> int:
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise ElementNotFound(name)
+
+    def get_name(self, identifier: int) -> Optional[str]:
+        """ Name of a variable, or None if it is an auxiliary variable """
+
+        if not 1 <= identifier <= len(self.names):
+            raise ElementNotFound(identifier)
+        return self.names[identifier - 1]
+
+    def is_auxiliary(self, identifier: int) -> bool:
+        return self.get_name(identifier) is None
+
+    def get_features(self) -> List[str]:
+        return list(self.ids)
@@ -1,22 +1,30 @@
 from .abstract_operation import Operation
 
+from .configuration_validation import ConfigurationValidation  # pylint: disable=cyclic-import
 from .commonality import Commonality  # pylint: disable=cyclic-import
 from .core_features import CoreFeatures  # pylint: disable=cyclic-import
 from .dead_features import DeadFeatures  # pylint: disable=cyclic-import
 from .false_optional_features import FalseOptionalFeatures  # pylint: disable=cyclic-import
+from .feature_backbone import FeatureBackbone  # pylint: disable=cyclic-import
+from .features_commonality import FeaturesCommonality  # pylint: disable=cyclic-import
 from .error_detection import ErrorDetection  # pylint: disable=cyclic-import
-from .error_diagnosis import ErrorDiagnosis  # pylint: disable=cyclic-import
+from .error_diagnosis import ConstraintsDiagnosis, ErrorDiagnosis  # pylint: disable=cyclic-import
 from .products import Products  # pylint: disable=cyclic-import
+from .products_number import ProductsNumber  # pylint: disable=cyclic-import
+from .sampling import Sampling, UniformSampling  # pylint: disable=cyclic-import
+from .twise_sampling import GreedyTWiseSampling, TWiseSampling  # pylint: disable=cyclic-import
 from .valid import Valid  # pylint: disable=cyclic-import
 from .valid_configuration import ValidConfiguration  # pylint: disable=cyclic-import
 from .valid_product import ValidProduct  # pylint: disable=cyclic-import
-from .variability import Variability  # pylint: disable=cyclic-import
+from .variability import CountingVariability, Variability  # pylint: disable=cyclic-import
 from .count_leafs import CountLeafs  # pylint: disable=cyclic-import
 from .average_branching_factor import AverageBranchingFactor  # pylint: disable=cyclic-import
 
 __all__ = [
-    "Commonality", "DeadFeatures", "CoreFeatures", "FalseOptionalFeatures",
-    "ErrorDetection", "ErrorDiagnosis", "Operation", "Products", "Valid",
-    "ValidConfiguration", "ValidProduct", "Variability", "CountLeafs",
+    "Commonality", "ConfigurationValidation", "ConstraintsDiagnosis", "CountingVariability",
+    "DeadFeatures", "CoreFeatures", "FalseOptionalFeatures", "FeatureBackbone",
+    "FeaturesCommonality", "ErrorDetection", "ErrorDiagnosis", "GreedyTWiseSampling",
+    "Operation", "Products", "ProductsNumber", "Sampling", "TWiseSampling", "UniformSampling",
+    "Valid", "ValidConfiguration", "ValidProduct", "Variability", "CountLeafs",
     "AverageBranchingFactor"
 ]
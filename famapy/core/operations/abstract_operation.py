@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from famapy.core.models import VariabilityModel
 
+if TYPE_CHECKING:
+    from famapy.core.session import AnalysisSession  # pylint: disable=cyclic-import
+
 
 class Operation(ABC):
 
@@ -10,6 +13,10 @@ class Operation(ABC):
     def execute(self, model: VariabilityModel) -> 'Operation':
         pass
 
+    def execute_in(self, session: 'AnalysisSession') -> 'Operation':
+        """ Executes the operation on the model of a session, reusing its resources """
+        return self.execute(session.model)
+
     @abstractmethod
     def get_result(self) -> Any:
         pass
@@ -0,0 +1,189 @@
+import itertools
+import os
+from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type
+
+from famapy.core.models import AST, Configuration, VariabilityModel
+from famapy.core.models.ast_cache import SharedNode, SharedNodeTable
+from famapy.core.operations import Operation
+from famapy.core.utils import map_bounded
+
+
+# boolean value of each operator of ASTINFO from the values of its operands
+OPERATORS: dict[str, Callable[..., bool]] = {
+    'not': lambda operand: not operand,
+    'and': lambda left, right: left and right,
+    'or': lambda left, right: left or right,
+    'implies': lambda left, right: not left or right,
+    'requires': lambda left, right: not left or right,
+    'excludes': lambda left, right: not (left and right),
+}
+
+
+class ConfigurationValidation(Operation):
+    '''
+    Checks configurations against a model, one at a time with set_configuration, execute and
+    is_valid, or many at once with check_configurations and explain_configurations.
+
+    The batch methods create one operation per chunk of configurations and call prepare once
+    with the model, then check (or find_violated_constraint) for each configuration.
+
+    Plugins that implement get_constraints have the model encoded once by prepare, as its
+    constraints with the equal subexpressions shared, and each configuration is evaluated
+    on it: features missing from the configuration are deselected, and the violated
+    constraint is the first one that does not hold. Otherwise check executes the operation
+    again for each configuration, and find_violated_constraint can only report that the
+    configuration is not valid (UNKNOWN); plugins can also override prepare, check and
+    find_violated_constraint, e.g. to check configurations as assumptions of a solver.
+    '''
+
+    UNKNOWN = 'unknown constraint'
+
+    @abstractmethod
+    def __init__(self) -> None:
+        pass
+
+    @abstractmethod
+    def set_configuration(self, configuration: Configuration) -> None:
+        pass
+
+    @abstractmethod
+    def is_valid(self) -> bool:
+        pass
+
+    def get_constraints(self, model: VariabilityModel) -> Optional[List[AST]]:
+        """ Constraints of the model, its tree included, over the names of the features """
+        return None
+
+    def prepare(self, model: VariabilityModel) -> None:
+        """ Sets the model of the configurations checked by check, encoding its constraints """
+
+        # pylint: disable=attribute-defined-outside-init
+        self.model = model
+        self.encoding: Optional[List[Tuple[str, SharedNode]]] = None
+        constraints = self.get_constraints(model)
+        if constraints is not None:
+            table = SharedNodeTable()
+            self.encoding = [(ast.string, table.from_ast(ast)) for ast in constraints]
+
+    def check(self, configuration: Configuration) -> bool:
+
+        if getattr(self, 'encoding', None) is not None:
+            return self.find_violated_constraint(configuration) is None
+
+        self.set_configuration(configuration)
+        self.execute(self.model)
+        return self.is_valid()
+
+    def find_violated_constraint(self, configuration: Configuration) -> Optional[Any]:
+        """ A constraint of the model violated by the configuration, None if it is valid """
+
+        encoding = getattr(self, 'encoding', None)
+        if encoding is None:
+            return None if self.check(configuration) else ConfigurationValidation.UNKNOWN
+
+        selected = {
+            str(getattr(feature, 'name', feature))
+            for feature, value in configuration.elements.items() if value
+        }
+        values: dict[SharedNode, bool] = {}
+        for constraint, root in encoding:
+            if not evaluate(root, selected, values):
+                return constraint
+        return None
+
+    def check_configurations(
+        self,
+        model: VariabilityModel,
+        configurations: Iterable[Configuration],
+        workers: Optional[int] = 1,
+        chunk_size: int = 1000
+    ) -> List[bool]:
+        """
+        Validity of each configuration, in order. The configurations are checked in chunks
+        spread over a pool of processes (workers=None uses one per core, workers=1 checks
+        them in this process); the model and the configurations must be picklable to use
+        more than one worker.
+        """
+
+        return check_in_chunks(type(self), model, configurations, False, workers, chunk_size)
+
+    def explain_configurations(
+        self,
+        model: VariabilityModel,
+        configurations: Iterable[Configuration],
+        workers: Optional[int] = 1,
+        chunk_size: int = 1000
+    ) -> List[Optional[Any]]:
+        """ A violated constraint for each configuration, None for the valid ones """
+
+        return check_in_chunks(type(self), model, configurations, True, workers, chunk_size)
+
+
+def evaluate(root: SharedNode, selected: set[str], values: dict[SharedNode, bool]) -> bool:
+    """ Value of the constraint with the selected features, reusing the values computed """
+
+    stack: List[Tuple[SharedNode, bool]] = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if node in values:
+            continue
+        if not node.childs:
+            values[node] = node.name in selected
+        elif visited:
+            operator = OPERATORS.get(node.name)
+            if operator is None:
+                raise ValueError(f'Unknown operator: {node.name}')
+            values[node] = operator(*(values[child] for child in node.childs))
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.childs)
+    return values[root]
+
+
+def check_in_chunks(
+    operation: Type[ConfigurationValidation],
+    model: VariabilityModel,
+    configurations: Iterable[Configuration],
+    explain: bool,
+    workers: Optional[int],
+    chunk_size: int
+) -> List[Any]:
+
+    if chunk_size < 1:
+        raise ValueError('The chunk size must be positive')
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    iterator = iter(configurations)
+    chunks = iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
+    results: List[Any] = []
+
+    if workers == 1:
+        for chunk in chunks:
+            results.extend(check_chunk(operation, model, chunk, explain))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # only a few chunks are submitted ahead, so the configurations are read as needed
+        arguments = ((operation, model, chunk, explain) for chunk in chunks)
+        for chunk_results in map_bounded(executor, check_chunk, arguments, 2 * workers):
+            results.extend(chunk_results)
+
+    return results
+
+
+def check_chunk(
+    operation_type: Type[ConfigurationValidation],
+    model: VariabilityModel,
+    configurations: List[Configuration],
+    explain: bool
+) -> List[Any]:
+
+    operation = operation_type()
+    operation.prepare(model)
+    if explain:
+        return [operation.find_violated_constraint(item) for item in configurations]
+    return [operation.check(item) for item in configurations]
@@ -1,7 +1,14 @@
 from abc import abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
 
+from famapy.core.models import VariabilityModel
+from famapy.core.models.cnf import Clause
+from famapy.core.models.diagnosis import ConsistencyChecker, FastDiag
 from famapy.core.operations import Operation
+from famapy.core.utils import LRUCache
+
+if TYPE_CHECKING:
+    from famapy.core.session import AnalysisSession  # pylint: disable=cyclic-import
 
 
 class ErrorDiagnosis(Operation):
@@ -13,3 +20,87 @@ class ErrorDiagnosis(Operation):
     @abstractmethod
     def get_diagnosis_messages(self) -> list[Any]:
         pass
+
+
+class ConstraintsDiagnosis(ErrorDiagnosis):
+    '''
+    Diagnosis of an inconsistent model with famapy.core.models.diagnosis: each diagnosis is
+    a minimal set of constraints whose removal makes the model consistent.
+
+    Plugins implement get_background, the clauses that always hold (e.g. the feature tree),
+    and get_constraints, the clauses of each constraint by its name, earlier constraints
+    being kept when there is a choice. set_options sets the number of diagnoses, a time
+    budget in seconds and the number of processes that check consistency speculatively. In
+    an analysis session the consistency checks are cached and shared between executions.
+    '''
+
+    CHECKER = 'diagnosis_checker'
+    CHECKS = 'diagnosis_checks'
+
+    @abstractmethod
+    def __init__(self) -> None:
+        self.diagnoses: List[List[str]] = []
+        self.number = 1
+        self.timeout: Optional[float] = None
+        self.workers = 1
+
+    @abstractmethod
+    def get_background(self, model: VariabilityModel) -> Iterable[Clause]:
+        pass
+
+    @abstractmethod
+    def get_constraints(self, model: VariabilityModel) -> dict[str, List[Clause]]:
+        pass
+
+    def set_options(
+        self,
+        number: int = 1,
+        timeout: Optional[float] = None,
+        workers: int = 1
+    ) -> None:
+        self.number = number
+        self.timeout = timeout
+        self.workers = workers
+
+    def execute(self, model: VariabilityModel) -> 'ConstraintsDiagnosis':
+        names = list(self.get_constraints(model))
+        self.diagnose(self.create_checker(model), names, None)
+        return self
+
+    def execute_in(self, session: 'AnalysisSession') -> 'ConstraintsDiagnosis':
+        names = list(self.get_constraints(session.model))
+        checker = session.get_resource(ConstraintsDiagnosis.CHECKER, self.create_checker)
+        cache: LRUCache[frozenset[int], bool] = session.get_resource(
+            ConstraintsDiagnosis.CHECKS, lambda model: LRUCache(maxsize=100_000)
+        )
+        self.diagnose(checker, names, cache)
+        return self
+
+    def create_checker(self, model: VariabilityModel) -> ConsistencyChecker:
+        return ConsistencyChecker(
+            self.get_background(model), self.get_constraints(model).values()
+        )
+
+    def diagnose(
+        self,
+        checker: ConsistencyChecker,
+        names: List[str],
+        cache: Optional[LRUCache[frozenset[int], bool]]
+    ) -> None:
+
+        engine = FastDiag(checker, self.workers, cache)
+        self.diagnoses = [
+            [names[index] for index in diagnosis]
+            for diagnosis in engine.find_diagnoses(self.number, self.timeout)
+        ]
+
+    def get_result(self) -> List[List[str]]:
+        return self.diagnoses
+
+    def get_diagnoses(self) -> List[List[str]]:
+        return self.diagnoses
+
+    def get_diagnosis_messages(self) -> list[Any]:
+        return [
+            'Remove the constraints: ' + ', '.join(diagnosis) for diagnosis in self.diagnoses
+        ]
@@ -0,0 +1,98 @@
+from abc import abstractmethod
+from typing import TYPE_CHECKING, Any, List, Tuple
+
+from famapy.core.models import VariabilityModel
+from famapy.core.models.cnf import CNF
+from famapy.core.models.sat_solver import SATSolver
+from famapy.core.models.symbol_table import SymbolTable
+from famapy.core.operations.core_features import CoreFeatures
+from famapy.core.operations.dead_features import DeadFeatures
+from famapy.core.operations.false_optional_features import FalseOptionalFeatures
+
+if TYPE_CHECKING:
+    from famapy.core.session import AnalysisSession  # pylint: disable=cyclic-import
+
+
+class FeatureBackbone(CoreFeatures, DeadFeatures, FalseOptionalFeatures):
+    '''
+    Core, dead and false optional features computed together from the backbone of the
+    model: the features selected (core) or deselected (dead) in every product.
+
+    The backbone is found with one incremental solver, filtering the candidates with every
+    solution found instead of checking each feature with its own solver calls. A false
+    optional feature is then an optional feature that is selected in every product with its
+    parent, which is checked in the same way.
+
+    Plugins implement encode and get_optional_features. The operation is found by the names
+    of the three contracts, so it replaces them in plugins that do not implement them.
+    '''
+
+    @abstractmethod
+    def __init__(self) -> None:
+        self.core_features: List[Any] = []
+        self.dead_features: List[Any] = []
+        self.false_optional_features: List[Any] = []
+
+    @abstractmethod
+    def encode(self, model: VariabilityModel) -> CNF:
+        """ Clauses of the model, with the features named in the symbol table """
+
+    @abstractmethod
+    def get_optional_features(self, model: VariabilityModel) -> List[Tuple[str, str]]:
+        """ Pairs (feature, parent) of the features that are optional in their parent """
+
+    def execute(self, model: VariabilityModel) -> 'FeatureBackbone':
+        cnf = self.encode(model)
+        return self.analyze(model, SATSolver(cnf), cnf.symbols)
+
+    def execute_in(self, session: 'AnalysisSession') -> 'FeatureBackbone':
+        cnf = session.get_cnf(self.encode)
+        return self.analyze(session.model, session.get_solver(self.encode), cnf.symbols)
+
+    def analyze(
+        self,
+        model: VariabilityModel,
+        solver: SATSolver,
+        symbols: SymbolTable
+    ) -> 'FeatureBackbone':
+
+        features = symbols.get_features()
+        if not solver.solve():
+            # every feature of a void model is dead
+            self.core_features, self.dead_features = [], features
+            self.false_optional_features = []
+            return self
+
+        backbone = set(solver.get_backbone(symbols.get_id(feature) for feature in features))
+        self.core_features = [
+            feature for feature in features if symbols.get_id(feature) in backbone
+        ]
+        self.dead_features = [
+            feature for feature in features if -symbols.get_id(feature) in backbone
+        ]
+
+        optional = [
+            (symbols.get_id(parent), symbols.get_id(feature))
+            for feature, parent in self.get_optional_features(model)
+            if -symbols.get_id(feature) not in backbone
+        ]
+        self.false_optional_features = [
+            symbols.get_name(feature) for _, feature in solver.get_implications(optional)
+        ]
+        return self
+
+    def get_result(self) -> dict[str, List[Any]]:
+        return {
+            'core_features': self.core_features,
+            'dead_features': self.dead_features,
+            'false_optional_features': self.false_optional_features,
+        }
+
+    def get_core_features(self) -> List[Any]:
+        return self.core_features
+
+    def get_dead_features(self) -> List[Any]:
+        return self.dead_features
+
+    def get_false_optional_features(self) -> List[Any]:
+        return self.false_optional_features
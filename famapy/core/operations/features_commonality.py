@@ -0,0 +1,27 @@
+from abc import abstractmethod
+from typing import Any, Iterable, List, Optional
+
+from famapy.core.operations import Operation
+
+
+class FeaturesCommonality(Operation):
+    '''
+    Commonality of many features at once: the fraction of the products of the model where
+    each one is selected.
+
+    Implementations should compute them together instead of one Commonality per feature,
+    e.g. from the marginal counts of a d-DNNF (DDNNF.get_commonalities) or from the column
+    sums of the enumerated products (ProductMatrix.get_commonalities).
+    '''
+
+    @abstractmethod
+    def __init__(self) -> None:
+        self.features: Optional[List[Any]] = None
+
+    def set_features(self, features: Optional[Iterable[Any]]) -> None:
+        """ Features whose commonality is computed, all of them if it is None """
+        self.features = list(features) if features is not None else None
+
+    @abstractmethod
+    def get_commonalities(self) -> dict[Any, float]:
+        pass
@@ -1,10 +1,39 @@
+import hashlib
+import itertools
+import uuid
 from abc import abstractmethod
-from typing import Any
+from typing import Any, ClassVar, Iterator, NamedTuple, Optional, Tuple
 
 from famapy.core.operations import Operation
+from famapy.core.utils import LRUCache
+
+
+class ProductsPage(NamedTuple):
+    products: list[Any]
+    cursor: Optional[str]  # cursor to request the next page, None if there are no more
 
 
 class Products(Operation):
+    '''
+    Products of a model, available after execute.
+
+    Plugins implement get_products, which returns all of them. Plugins that can enumerate
+    them one at a time also override iter_products, so the memory stays bounded.
+
+    get_products_page returns the products in pages, each one with the cursor of the next.
+    A cursor is bound to the owner of the products, a name of the model, and is rejected
+    for any other. By default it names the enumeration and the number of products already
+    returned: the enumeration of the previous page is kept suspended (a bounded number of
+    them for all the operations), so the next page continues it, and after it is evicted,
+    or in another process, the products before the cursor are enumerated again. Plugins
+    with a resumable enumeration can override iter_products_from.
+    '''
+
+    # enumerations suspended after a page, by the cursor of the next page
+    suspended: ClassVar[LRUCache[str, Iterator[Tuple[Any, str]]]] = LRUCache(64)
+
+    # owner of the products when the pages do not name one, unique to the operation
+    owner: Optional[str] = None
 
     @abstractmethod
     def __init__(self) -> None:
@@ -13,3 +42,86 @@ class Products(Operation):
     @abstractmethod
     def get_products(self) -> list[Any]:
         pass
+
+    def iter_products(self) -> Iterator[Any]:
+        return iter(self.get_products())
+
+    def iter_products_from(self, cursor: Optional[str] = None) -> Iterator[Tuple[Any, str]]:
+        """ Yields each product after the cursor with the cursor that follows it """
+
+        if cursor is None:
+            enumeration, offset = uuid.uuid4().hex, 0
+        else:
+            enumeration, _, position = cursor.rpartition(':')
+            if not enumeration or not position.isdigit():
+                raise ValueError(f'Invalid cursor: {cursor}')
+            offset = int(position)
+
+        products = itertools.islice(self.iter_products(), offset, None)
+        for number, product in enumerate(products, offset + 1):
+            yield product, f'{enumeration}:{number}'
+
+    def get_products_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        owner: Optional[str] = None
+    ) -> ProductsPage:
+        """
+        The next limit products after the cursor (from the first product if it is None),
+        with the cursor of the following page. The owner names the model, so the cursor is
+        valid for other operations on it; by default the cursor is only valid for this one.
+        """
+
+        if owner is None:
+            if self.owner is None:
+                self.owner = uuid.uuid4().hex
+            owner = self.owner
+
+        page = Products.resume_page(limit, cursor, owner)
+        if page is not None:
+            return page
+        inner_cursor = None if cursor is None else cursor.partition('/')[2]
+        return Products.take_page(limit, owner, self.iter_products_from(inner_cursor))
+
+    @staticmethod
+    def resume_page(limit: int, cursor: Optional[str], owner: str) -> Optional[ProductsPage]:
+        """
+        The next page of the enumeration suspended at the cursor, None if there is none, so
+        the products can be requested without executing the operation again.
+        """
+
+        if limit < 1:
+            raise ValueError('The limit must be positive')
+        if cursor is None:
+            return None
+        token, separator, _ = cursor.partition('/')
+        if not separator or token != owner_token(owner):
+            raise ValueError(f'Invalid cursor for this model: {cursor}')
+
+        enumeration = Products.suspended.pop(cursor)
+        if enumeration is None:
+            return None
+        return Products.take_page(limit, owner, enumeration)
+
+    @staticmethod
+    def take_page(
+        limit: int,
+        owner: str,
+        enumeration: Iterator[Tuple[Any, str]]
+    ) -> ProductsPage:
+
+        products = []
+        inner_cursor = None
+        for product, inner_cursor in itertools.islice(enumeration, limit):
+            products.append(product)
+
+        if len(products) < limit or inner_cursor is None:
+            return ProductsPage(products, None)
+        cursor = f'{owner_token(owner)}/{inner_cursor}'
+        Products.suspended.put(cursor, enumeration)
+        return ProductsPage(products, cursor)
+
+
+def owner_token(owner: str) -> str:
+    return hashlib.sha256(owner.encode()).hexdigest()[:32]
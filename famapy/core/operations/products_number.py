@@ -0,0 +1,20 @@
+from abc import abstractmethod
+
+from famapy.core.operations import Operation
+
+
+class ProductsNumber(Operation):
+    '''
+    Number of products of a model, available after execute, as an arbitrary precision int.
+
+    Implementations should count the products without enumerating them, e.g. by compiling
+    the model into a d-DNNF with famapy.core.models.ddnnf.
+    '''
+
+    @abstractmethod
+    def __init__(self) -> None:
+        pass
+
+    @abstractmethod
+    def get_products_number(self) -> int:
+        pass
@@ -0,0 +1,98 @@
+import itertools
+import random
+from abc import abstractmethod
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional
+
+from famapy.core.models import VariabilityModel
+from famapy.core.models.cnf import CNF
+from famapy.core.models.ddnnf import DDNNF, DDNNFCompiler
+from famapy.core.models.symbol_table import SymbolTable
+from famapy.core.operations import Operation
+
+if TYPE_CHECKING:
+    from famapy.core.session import AnalysisSession  # pylint: disable=cyclic-import
+
+
+class Sampling(Operation):
+    '''
+    Random sample of the products of a model, available after execute.
+
+    set_sample_size sets the number of products and set_seed makes the sample reproducible.
+    iter_sample yields the products one at a time, so large samples can be consumed
+    without keeping them in memory; get_sample returns all of them.
+    '''
+
+    @abstractmethod
+    def __init__(self) -> None:
+        self.sample_size = 1
+        self.seed: Optional[int] = None
+
+    def set_sample_size(self, sample_size: int) -> None:
+        if sample_size < 0:
+            raise ValueError('The sample size cannot be negative')
+        self.sample_size = sample_size
+
+    def set_seed(self, seed: Optional[int]) -> None:
+        self.seed = seed
+
+    @abstractmethod
+    def iter_sample(self) -> Iterator[Any]:
+        pass
+
+    def get_sample(self) -> List[Any]:
+        return list(self.iter_sample())
+
+
+class UniformSampling(Sampling):
+    '''
+    Products sampled uniformly at random, with replacement, from a d-DNNF of the model:
+    the circuit is compiled once and each product is drawn with DDNNF.iter_samples, in time
+    proportional to the part of the circuit it goes through and whatever the number of
+    products. Products are lists of the names of their selected features.
+
+    Plugins implement encode. In an analysis session the circuit is compiled from the
+    encoding of the session and shared with the other executions.
+    '''
+
+    CIRCUIT = 'ddnnf'
+
+    @abstractmethod
+    def __init__(self) -> None:
+        super().__init__()
+        self.ddnnf: Optional[DDNNF] = None
+        self.symbols = SymbolTable()
+
+    @abstractmethod
+    def encode(self, model: VariabilityModel) -> CNF:
+        """ Clauses of the model, with the features named in the symbol table """
+
+    def execute(self, model: VariabilityModel) -> 'UniformSampling':
+        cnf = self.encode(model)
+        self.ddnnf = DDNNFCompiler().compile(cnf)
+        self.symbols = cnf.symbols
+        return self
+
+    def execute_in(self, session: 'AnalysisSession') -> 'UniformSampling':
+        cnf = session.get_cnf(self.encode)
+        self.ddnnf = session.get_resource(
+            UniformSampling.CIRCUIT, lambda model: DDNNFCompiler().compile(cnf)
+        )
+        self.symbols = cnf.symbols
+        return self
+
+    def get_result(self) -> List[Any]:
+        return self.get_sample()
+
+    def iter_sample(self) -> Iterator[List[str]]:
+
+        if self.ddnnf is None:
+            raise ValueError('The operation must be executed before sampling')
+        # a void model has no products to sample
+        if not self.sample_size or self.ddnnf.root == DDNNF.FALSE:
+            return
+
+        names = self.symbols.names
+        samples = self.ddnnf.iter_samples(random.Random(self.seed))
+        for sample in itertools.islice(samples, self.sample_size):
+            product = [names[variable - 1] for variable in sample if variable <= len(names)]
+            yield [name for name in product if name is not None]
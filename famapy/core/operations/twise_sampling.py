@@ -0,0 +1,85 @@
+from abc import abstractmethod
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional
+
+from famapy.core.models import VariabilityModel
+from famapy.core.models.cnf import CNF
+from famapy.core.models.covering_array import TWiseSampler
+from famapy.core.operations import Operation
+
+if TYPE_CHECKING:
+    from famapy.core.session import AnalysisSession  # pylint: disable=cyclic-import
+
+
+class TWiseSampling(Operation):
+    '''
+    Sample of products that covers every valid interaction of t features (the strength):
+    every combination of selections and deselections of t features that some product has
+    appears in some product of the sample. Pairwise sampling is strength 2.
+
+    iter_sample yields the products as they are found; get_sample returns all of them.
+    '''
+
+    @abstractmethod
+    def __init__(self) -> None:
+        self.strength = 2
+
+    def set_strength(self, strength: int) -> None:
+        if strength < 1:
+            raise ValueError('The strength must be positive')
+        self.strength = strength
+
+    @abstractmethod
+    def iter_sample(self) -> Iterator[Any]:
+        pass
+
+    def get_sample(self) -> List[Any]:
+        return list(self.iter_sample())
+
+
+class GreedyTWiseSampling(TWiseSampling):
+    '''
+    T-wise sample built greedily with famapy.core.models.covering_array.TWiseSampler, one
+    product at a time, on the features of the symbol table of the model. Products are lists
+    of the names of their selected features.
+
+    Plugins implement encode. set_workers sets the number of processes that build candidate
+    products in parallel. In an analysis session the encoding of the session is used.
+    '''
+
+    @abstractmethod
+    def __init__(self) -> None:
+        super().__init__()
+        self.workers = 1
+        self.cnf: Optional[CNF] = None
+
+    @abstractmethod
+    def encode(self, model: VariabilityModel) -> CNF:
+        """ Clauses of the model, with the features named in the symbol table """
+
+    def set_workers(self, workers: int) -> None:
+        self.workers = workers
+
+    def execute(self, model: VariabilityModel) -> 'GreedyTWiseSampling':
+        self.cnf = self.encode(model)
+        return self
+
+    def execute_in(self, session: 'AnalysisSession') -> 'GreedyTWiseSampling':
+        self.cnf = session.get_cnf(self.encode)
+        return self
+
+    def get_result(self) -> List[Any]:
+        return self.get_sample()
+
+    def iter_sample(self) -> Iterator[List[str]]:
+
+        if self.cnf is None:
+            raise ValueError('The operation must be executed before sampling')
+
+        symbols = self.cnf.symbols
+        features = symbols.get_features()
+        variables = [symbols.get_id(feature) for feature in features]
+        sampler = TWiseSampler(self.cnf, variables, self.strength, self.workers)
+        for configuration in sampler.iter_configurations():
+            selected = set(configuration)
+            yield [feature for feature, variable in zip(features, variables)
+                   if variable in selected]
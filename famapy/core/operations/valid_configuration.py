@@ -1,10 +1,10 @@
 from abc import abstractmethod
 
 from famapy.core.models import Configuration
-from famapy.core.operations import Operation
+from famapy.core.operations.configuration_validation import ConfigurationValidation
 
 
-class ValidConfiguration(Operation):
+class ValidConfiguration(ConfigurationValidation):
 
     @abstractmethod
     def __init__(self) -> None:
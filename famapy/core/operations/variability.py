@@ -1,6 +1,23 @@
 from abc import abstractmethod
+from fractions import Fraction
+from typing import TYPE_CHECKING, cast
 
+from famapy.core.exceptions import OperationNotFound
+from famapy.core.models import VariabilityModel
 from famapy.core.operations import Operation
+from famapy.core.operations.products_number import ProductsNumber
+
+if TYPE_CHECKING:
+    from famapy.core.session import AnalysisSession  # pylint: disable=cyclic-import
+
+
+def compute_variability(products_number: int, features_number: int) -> Fraction:
+    """ Number of products divided by the number of non empty sets of features """
+
+    combinations = (1 << features_number) - 1
+    if not combinations:
+        return Fraction(0)
+    return Fraction(products_number, combinations)
 
 
 class Variability(Operation):
@@ -12,3 +29,52 @@ class Variability(Operation):
     @abstractmethod
     def get_variability(self) -> float:
         pass
+
+
+class CountingVariability(Variability):
+    '''
+    Variability computed from the number of products, without enumerating them, as an exact
+    fraction (get_exact_variability) and as a float (get_variability).
+
+    Plugins implement get_features_number and get_products_number, e.g. counting the models
+    of their CNF with famapy.core.models.ddnnf. In an analysis session the count is taken
+    from the ProductsNumber operation of the plugin, if it has one, so it is computed once.
+    '''
+
+    @abstractmethod
+    def __init__(self) -> None:
+        self.variability = Fraction(0)
+
+    @abstractmethod
+    def get_features_number(self, model: VariabilityModel) -> int:
+        pass
+
+    @abstractmethod
+    def get_products_number(self, model: VariabilityModel) -> int:
+        pass
+
+    def execute(self, model: VariabilityModel) -> 'CountingVariability':
+        self.variability = compute_variability(
+            self.get_products_number(model), self.get_features_number(model)
+        )
+        return self
+
+    def execute_in(self, session: 'AnalysisSession') -> 'CountingVariability':
+        try:
+            operation = cast(ProductsNumber, session.use_operation('ProductsNumber'))
+        except OperationNotFound:
+            return self.execute(session.model)
+
+        self.variability = compute_variability(
+            operation.get_products_number(), self.get_features_number(session.model)
+        )
+        return self
+
+    def get_result(self) -> float:
+        return self.get_variability()
+
+    def get_variability(self) -> float:
+        return float(self.variability)
+
+    def get_exact_variability(self) -> Fraction:
+        return self.variability
@@ -1,14 +1,15 @@
 from types import ModuleType
-from typing import Any, Callable, Type, cast
+from typing import Any, Callable, Iterable, Optional, Type, cast
 from collections import UserList
 
+from famapy.core.cache import ResultCache, model_digest
 from famapy.core.exceptions import (
     OperationNotFound,
     PluginNotFound,
     TransformationNotFound,
 )
-from famapy.core.models import VariabilityModel
-from famapy.core.operations import Operation
+from famapy.core.models import Configuration, VariabilityModel
+from famapy.core.operations import ConfigurationValidation, Operation
 from famapy.core.transformations import (
     TextToModel,
     Transformation,
@@ -28,9 +29,13 @@ class Operations(UserList[Type[Operation]]):  # pylint: disable=too-many-ancesto
     def search_by_name(self, name: str) -> Type[Operation]:
         # This has been modified to use the parent class name
         candidates = filter(lambda op: op.__bases__[0].__name__ == name, self.data)
+        # operations that implement several contracts, e.g. FeatureBackbone for CoreFeatures
+        ancestors = filter(
+            lambda op: any(base.__name__ == name for base in op.__mro__[1:]), self.data
+        )
 
         try:
-            operation = next(candidates, None)
+            operation = next(candidates, None) or next(ancestors, None)
         except StopIteration:
             raise OperationNotFound
         else:
@@ -67,9 +72,62 @@ class Plugin:
     def append_transformations(self, transformation: Type[Transformation]) -> None:
         self.transformations.append(transformation)
 
-    def use_operation(self, name: str, src: VariabilityModel) -> Operation:
-        operation = self.operations.search_by_name(name)
-        return operation().execute(model=src)
+    def use_operation(
+        self,
+        name: str,
+        src: VariabilityModel,
+        parameters: Optional[dict[str, Any]] = None
+    ) -> Operation:
+        """ Executes the operation; each parameter is set with its setter, e.g. set_seed """
+
+        operation = self.operations.search_by_name(name)()
+        for parameter, value in (parameters or {}).items():
+            getattr(operation, f'set_{parameter}')(value)
+        return operation.execute(model=src)
+
+    def use_operation_cached(
+        self,
+        name: str,
+        src: VariabilityModel,
+        cache: ResultCache,
+        parameters: Optional[dict[str, Any]] = None
+    ) -> Any:
+        """
+        Result of the operation, taken from the cache unless the model, the code of the
+        plugin or the parameters have changed. Models that cannot be pickled are not cached.
+        """
+
+        digest = model_digest(src)
+        if digest is None:
+            return self.use_operation(name, src, parameters).get_result()
+
+        key = cache.get_key(cache.get_fingerprint(self.module), name, digest, parameters)
+        return cache.get_or_compute(
+            key, lambda: self.use_operation(name, src, parameters).get_result()
+        )
+
+    def use_operation_batch(
+        self,
+        name: str,
+        src: VariabilityModel,
+        configurations: Iterable[Configuration],
+        explain: bool = False,
+        workers: Optional[int] = 1
+    ) -> list[Any]:
+        """
+        Checks many configurations with a ValidConfiguration or ValidProduct operation.
+        Returns the validity of each one, or a violated constraint (None if it is valid)
+        when explain is True.
+        """
+
+        operation_type = self.operations.search_by_name(name)
+        if not issubclass(operation_type, ConfigurationValidation):
+            raise OperationNotFound(f'{name} does not check configurations')
+
+        operation = operation_type()
+        if explain:
+            return operation.explain_configurations(src, configurations, workers)
+        return cast(list[Any], operation.check_configurations(src, configurations, workers))
 
     def use_transformation_t2m(self, src: str) -> VariabilityModel:
         extension = extract_filename_extension(src)
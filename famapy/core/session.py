@@ -0,0 +1,70 @@
+from typing import Any, Callable, Type, TypeVar
+
+from famapy.core.models import VariabilityModel
+from famapy.core.models.cnf import CNF
+from famapy.core.models.sat_solver import SATSolver
+from famapy.core.operations import Operation
+from famapy.core.plugins import Plugin
+
+
+T = TypeVar('T')
+
+
+class AnalysisSession:
+    '''
+    Runs several operations of a plugin on one model, sharing the work they can reuse.
+
+    Operations are executed with execute_in, which by default calls execute with the model.
+    Operations that override it can ask the session for resources, e.g. an encoding of the
+    model, that are created by the first operation that needs them and reused by the rest;
+    get_cnf and get_solver keep one encoding of the model and one incremental solver loaded
+    with it, which operations query with assumptions instead of adding clauses to it (other
+    than clauses implied by the model, e.g. its backbone).
+
+    Each operation is executed once per session and keeps its own result accessors; an
+    operation that implements several contracts is shared by all of them. If the
+    model changes, clear must be called to discard what was computed from it.
+    '''
+
+    ENCODING = 'cnf'
+    SOLVER = 'solver'
+
+    def __init__(self, plugin: Plugin, model: VariabilityModel) -> None:
+        self.plugin = plugin
+        self.model = model
+        self.resources: dict[str, Any] = {}
+        self.operations: dict[Type[Operation], Operation] = {}
+
+    def get_resource(self, name: str, factory: Callable[[VariabilityModel], T]) -> T:
+        """ The resource with the name, created from the model the first time """
+
+        if name not in self.resources:
+            self.resources[name] = factory(self.model)
+        return self.resources[name]
+
+    def get_cnf(self, encode: Callable[[VariabilityModel], CNF]) -> CNF:
+        """ Clauses of the model, encoded the first time """
+        return self.get_resource(AnalysisSession.ENCODING, encode)
+
+    def get_solver(self, encode: Callable[[VariabilityModel], CNF]) -> SATSolver:
+        """ Incremental solver loaded with the clauses of get_cnf """
+        return self.get_resource(
+            AnalysisSession.SOLVER, lambda model: SATSolver(self.get_cnf(encode))
+        )
+
+    def use_operation(self, name: str) -> Operation:
+        """ The operation with the name, executed on the model of the session """
+
+        operation_type = self.plugin.operations.search_by_name(name)
+        operation = self.operations.get(operation_type)
+        if operation is None:
+            operation = operation_type().execute_in(self)
+            self.operations[operation_type] = operation
+        return operation
+
+    def get_result(self, name: str) -> Any:
+        return self.use_operation(name).get_result()
+
+    def clear(self) -> None:
+        self.resources.clear()
+        self.operations.clear()
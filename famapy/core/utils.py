@@ -1,2 +1,101 @@
+import gc
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, Generic, Iterable, Iterator, Optional, Tuple, TypeVar
+
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+
 def extract_filename_extension(filename: str) -> str:
     return filename.split('.')[-1]
+
+
+def map_bounded(
+    executor: Executor,
+    function: Callable[..., V],
+    arguments: Iterable[Tuple[Any, ...]],
+    in_flight: int
+) -> Iterator[V]:
+    """
+    Results of the function for each tuple of arguments, in order, as Executor.map, but
+    submitting at most in_flight calls ahead of the results consumed, so the arguments are
+    read lazily and the memory stays bounded.
+    """
+
+    pending: 'deque[Future[V]]' = deque()
+    for item in arguments:
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+        pending.append(executor.submit(function, *item))
+    while pending:
+        yield pending.popleft().result()
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Disables the cyclic garbage collector while many acyclic objects are created (e.g. the
+    nodes of thousands of ASTs), which otherwise triggers repeated full collections.
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class LRUCache(Generic[K, V]):
+    """ Bounded mapping that discards the least recently used entries first """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError('maxsize must be a positive number')
+        self.maxsize = maxsize
+        self.data: OrderedDict[K, V] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.data
+
+    def get(self, key: K) -> Optional[V]:
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        return self.data.pop(key, None)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -35,6 +35,23 @@ def use_operation(plugin: str, operation: str, filename: str, versions: int = 1)
     return {'result': result}
 
 
+@hug.cli()
+@hug.get('/get-products/{plugin}/')
+def get_products(
+    plugin: str,
+    filename: str,
+    limit: int = 100,
+    cursor: str = '',
+    versions: int = 1
+) -> dict[str, Any]:
+    """
+    Get a page of the products of a model gave a plugin and one input file.
+    - The returned cursor requests the next page, it is None after the last one
+    """
+    page = dm.get_products_page_from_file(plugin, filename, limit, cursor or None)
+    return {'products': page.products, 'cursor': page.cursor}
+
+
 @hug.cli()
 def use_operation_from_fm_file(
     plugin: str,
@@ -29,6 +29,9 @@ setuptools.setup(
             'prospector',
             'mypy',
             'coverage',
+        ],
+        'numpy': [
+            'numpy',
         ]
     },
     scripts=['scripts/famapy_admin.py']
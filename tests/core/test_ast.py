@@ -0,0 +1,362 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import raises
+
+from famapy.core.models import AST
+from famapy.core.models.ast import (
+    ASTCHECK, ASTINFO, ASTUtilities, Grammar, parse_constraints, parse_constraints_file
+)
+from famapy.core.models.ast_cache import ASTCache, SharedNodeTable
+from famapy.core.models.ast_rewriting import ASTRewriter
+from famapy.core.utils import map_bounded
+
+
+def nodes_summary(ast):
+    return [(node.get_name(), node.token, node.points_to, node.level) for node in ast.get_nodes()]
+
+
+class TestASTParser:
+
+    def test_blank_spaces(self):
+        assert ASTUtilities.preprocessing('  A and(  B or C )  ') == 'A and (B or C)'
+        assert ASTUtilities.preprocessing('(A)and(B)') == '(A) and (B)'
+        assert ASTUtilities.preprocessing('( (A  and B) )or C') == '((A and B)) or C'
+
+    def test_single_feature(self):
+        ast = AST('(A)')
+        assert nodes_summary(ast) == [('A', 0, None, 1)]
+
+    def test_unary_operator(self):
+        ast = AST('not A')
+        assert nodes_summary(ast) == [('not', 0, None, 1), ('A', 1, 0, 2)]
+
+    def test_precedence(self):
+        ast = AST('A implies B or C')
+        assert nodes_summary(ast) == [
+            ('or', 3, None, 1),
+            ('implies', 1, 3, 2),
+            ('A', 0, 1, 3),
+            ('B', 2, 1, 3),
+            ('C', 4, 3, 2),
+        ]
+
+    def test_right_associativity(self):
+        ast = AST('A or B or C')
+        assert nodes_summary(ast) == [
+            ('or', 1, None, 1),
+            ('A', 0, 1, 2),
+            ('or', 3, 1, 2),
+            ('B', 2, 3, 3),
+            ('C', 4, 3, 3),
+        ]
+
+    def test_parentheses(self):
+        ast = AST('A and (B or C) and not (D or E)')
+        assert ast.list == ['A', 'and', '(B', 'or', 'C)', 'and', 'not', '(D', 'or', 'E)']
+        assert nodes_summary(ast) == [
+            ('and', 1, None, 1),
+            ('A', 0, 1, 2),
+            ('and', 5, 1, 2),
+            ('or', 3, 5, 3),
+            ('B', 2, 3, 4),
+            ('C', 4, 3, 4),
+            ('not', 6, 5, 3),
+            ('or', 8, 6, 4),
+            ('D', 7, 8, 5),
+            ('E', 9, 8, 5),
+        ]
+
+    def test_unary_operator_inside_parentheses(self):
+        ast = AST('(not A) or B')
+        assert nodes_summary(ast) == [
+            ('or', 2, None, 1),
+            ('not', 0, 2, 2),
+            ('A', 1, 0, 3),
+            ('B', 3, 2, 2),
+        ]
+
+    def test_misplaced_parentheses(self):
+        with raises(SyntaxError):
+            AST('A) and (B')
+
+
+class TestGrammar:
+
+    def test_precedence(self):
+        grammar = Grammar(binary_operators=['and', 'or', 'implies', 'excludes', 'requires'])
+        assert AST('A and B or C').get_root().get_name() == 'or'
+        assert AST('A and B or C', grammar).get_root().get_name() == 'and'
+        assert grammar.get_precedence('or') == 2
+        assert grammar.get_precedence('A') == 0
+
+    def test_custom_operators(self):
+        grammar = Grammar(unary_operators=['neg'], binary_operators=['iff', 'and'])
+        ast = AST('neg A iff (B and not)', grammar)
+        assert [node.get_name() for node in ast.get_nodes()] == [
+            'iff', 'neg', 'A', 'and', 'B', 'not'
+        ]
+        with raises(SyntaxError):
+            AST('A iff', grammar)
+        with raises(ValueError):
+            Grammar(unary_operators=['not'], binary_operators=['not'])
+
+    def test_default_grammar(self):
+        default = ASTINFO.get_grammar()
+        try:
+            ASTINFO.set_binary_operators(['and', 'or'])
+            assert AST('A and B or C').get_root().get_name() == 'and'
+            assert parse_constraints(['A and B or C'], workers=2).asts[0].get_root().get_name() == 'and'
+        finally:
+            ASTINFO.set_binary_operators(list(default.binary_operators))
+        assert ASTINFO.get_grammar() == default
+
+
+class TestASTCHECK:
+
+    def test_empty_string(self):
+        with raises(ValueError) as error:
+            AST('   ')
+        assert str(error.value) == 'ValueError: Empty string'
+
+    def test_error_position(self):
+        with raises(SyntaxError) as error:
+            ASTCHECK.check_all('A and B or or C')
+        assert str(error.value) == 'SyntaxError: There cannot be two adjacent binary operators: or or'
+        assert error.value.offset == 3
+
+    def test_errors_are_raised_in_check_order(self):
+        # adjacent features and parentheses both fail, parentheses are checked first
+        with raises(SyntaxError) as error:
+            ASTCHECK.check_all('(A B')
+        assert str(error.value) == (
+            'SyntaxError: There is not the same number of open parentheses as closed ones'
+        )
+        assert error.value.offset == 0
+
+    def test_binary_operator_with_parentheses(self):
+        with raises(SyntaxError) as error:
+            ASTCHECK.check_all('(A (and B))')
+        assert str(error.value) == (
+            'SyntaxError: A binary operator cannot be preceded or succeeded by parentheses: '
+            '(and B))'
+        )
+        assert error.value.offset == 1
+
+
+class TestASTNavigation:
+
+    def test_childs_and_parent(self):
+        ast = AST('A and (B or not C)')
+        root = ast.get_root()
+        first, second = ast.get_childs(root)
+        assert (first.get_name(), second.get_name()) == ('A', 'or')
+        assert ast.get_first_child(second).get_name() == 'B'
+        assert ast.get_second_child(second).get_name() == 'not'
+        assert ast.get_childs(first) == []
+        assert ast.get_parent(first) is root
+        assert ast.get_parent(root) is None
+        assert ast.get_node(second.token) is second
+
+    def test_derived_properties(self):
+        ast = AST('A and (B or not C) and A')
+        assert ast.get_height() == 5
+        assert [node.get_name() for node in ast.get_features()] == ['A', 'B', 'C', 'A']
+        assert [node.token for node in ast.get_nodes_by_feature('A')] == [0, 7]
+        assert not hasattr(ast.get_root(), '__dict__')
+
+    def test_traversals(self):
+        ast = AST('A and (B or not C)')
+        assert [node.get_name() for node in ast.iter_preorder()] == [
+            'and', 'A', 'or', 'B', 'not', 'C'
+        ]
+        assert [node.get_name() for node in ast.iter_postorder()] == [
+            'A', 'B', 'C', 'not', 'or', 'and'
+        ]
+        subtree = ast.get_second_child(ast.get_root())
+        assert [node.get_name() for node in ast.iter_postorder(subtree)] == ['B', 'C', 'not', 'or']
+        assert str(ast) == '\n"A and (B or not C)"\n\nand\n\tA\n\tor\n\t\tB\n\t\tnot\n\t\t\tC'
+
+    def test_deep_constraints(self):
+        chain = AST(' or '.join(f'A{idx}' for idx in range(5000)))
+        assert chain.get_height() == 5000
+        assert [node.get_name() for node in chain.iter_postorder()][:2] == ['A0', 'A1']
+        assert len(str(chain).splitlines()) == 3 + len(chain.get_nodes())
+
+        negations = AST('not ' * 5000 + '(A and B)')
+        assert negations.get_height() == 5002
+        with raises(SyntaxError):
+            AST('not ' * 5000 + '(A and B')
+
+
+class TestASTEdit:
+
+    def test_edit_inside_parentheses(self):
+        ast = AST('A and (B or C)')
+        first, second = ast.get_features()[:2]
+        changes = ast.edit(12, 1, 'not D')
+        assert ast.string == 'A and (B or not D)'
+        assert nodes_summary(ast) == nodes_summary(AST('A and (B or not D)'))
+        assert ast.get_features()[:2] == [first, second]
+        assert [node.get_name() for node in changes.changed] == ['or', 'not', 'D', 'and']
+        assert sorted(node.get_name() for node in changes.removed) == ['C', 'or']
+
+    def test_edit_whole_constraint(self):
+        ast = AST('A or B and C')
+        feature = ast.get_features()[-1]
+        changes = ast.edit(0, 6, '(A or B)')
+        assert nodes_summary(ast) == nodes_summary(AST('(A or B) and C'))
+        assert ast.get_features()[-1] is feature
+        assert feature not in changes.changed
+
+    def test_edit_top_level_operand(self):
+        ast = AST(' and '.join(f'F{number}' for number in range(100)))
+        nodes = ast.get_nodes()
+        changes = ast.edit(ast.string.index('F50 '), 3, 'not G')
+        assert nodes_summary(ast) == nodes_summary(AST(ast.string))
+        assert [node.get_name() for node in changes.changed] == ['not', 'G'] + ['and'] * 51
+        assert [node.get_name() for node in changes.removed] == ['F50']
+        assert len(set(ast.get_nodes()) & set(nodes)) == len(nodes) - 1
+
+        # the operators around the operand would take part of a weaker one
+        ast = AST('A and B or C')
+        ast.edit(6, 1, 'D or E')
+        assert nodes_summary(ast) == nodes_summary(AST('A and D or E or C'))
+
+    def test_invalid_edit(self):
+        ast = AST('A and (B or C)')
+        summary = nodes_summary(ast)
+        with raises(SyntaxError, match='binary operators at end: and'):
+            ast.edit(12, 1, 'and')
+        with raises(ValueError):
+            ast.edit(20, 1, 'D')
+        assert ast.string == 'A and (B or C)'
+        assert nodes_summary(ast) == summary
+class TestASTCache:
+
+    def test_lru_statistics(self):
+        cache = ASTCache(maxsize=2)
+        ast = cache.get('A implies B')
+        assert nodes_summary(cache.get(' A   implies B ')) == nodes_summary(ast)
+        cache.get('B implies C')
+        cache.get('C implies D')
+        assert cache.get_stats() == {
+            'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 3, 'evictions': 1
+        }
+
+    def test_hash_consing(self):
+        cache = ASTCache(hash_consing=True)
+        first = cache.get_shared_node('(A implies B) and not X')
+        second = cache.get_shared_node('not X or (A implies B)')
+        assert first.childs[0] is second.childs[1]
+        assert first.childs[1] is second.childs[0]
+        assert first.to_string() == '(A implies B) and not X'
+        assert cache.get_stats()['shared_nodes']['hits'] == 5
+
+    def test_copies(self):
+        for cache in (ASTCache(), ASTCache(hash_consing=True)):
+            ast = cache.get('A and (B or not C)')
+            ast.edit(0, 1, 'D')
+            for _ in range(2):
+                copy = cache.get('A and (B or not C)')
+                assert copy is not ast
+                assert nodes_summary(copy) == nodes_summary(AST('A and (B or not C)'))
+
+    def test_hash_consing_disabled(self):
+        with raises(ValueError):
+            ASTCache().get_shared_node('A')
+
+    def test_shared_node_string(self):
+        table = SharedNodeTable()
+        node = table.from_ast(AST('not (A or B) and (C or not D)'))
+        assert node.to_string() == 'not (A or B) and (C or not D)'
+        assert AST(node.to_string()).string == 'not (A or B) and (C or not D)'
+
+
+def rewrite(constraint, nnf=True):
+    result = ASTRewriter().rewrite(AST(constraint), nnf=nnf)
+    return result if isinstance(result, bool) else result.string
+
+
+class TestASTRewriter:
+
+    def test_normalize(self):
+        assert rewrite('A requires B', nnf=False) == 'A implies B'
+        assert rewrite('A excludes B', nnf=False) == 'not (A and B)'
+        assert rewrite('not not A', nnf=False) == 'A'
+
+    def test_negation_normal_form(self):
+        assert rewrite('not (A excludes B)') == 'A and B'
+        assert rewrite('not (A and (B or not C))') == 'not A or (not B and C)'
+        assert rewrite('A implies B') == 'not A or B'
+
+    def test_simplify(self):
+        assert rewrite('A and A') == 'A'
+        assert rewrite('(A and B) and (B and C)') == 'A and (B and C)'
+        assert rewrite('A or (B or not A)') is True
+        assert rewrite('A and (B and not A)') is False
+        assert rewrite('A implies A', nnf=False) is True
+        assert rewrite('A excludes not A', nnf=False) is True
+
+    def test_partial_evaluation(self):
+        rewriter = ASTRewriter()
+        ast = AST('(A implies B) and (C or not D)')
+        assert rewriter.partial_evaluate(ast, {'A': False, 'C': True}) is True
+        assert rewriter.partial_evaluate(ast, {'A': True, 'B': False}) is False
+        assert rewriter.partial_evaluate(ast, {'A': True, 'D': None, 'C': False}).string == (
+            'B and not D'
+        )
+
+    def test_partial_evaluation_of_many_constraints(self):
+        asts = [AST('A implies B'), AST('A excludes C'), AST('B or C'), AST('D or not B')]
+        evaluation = ASTRewriter().partial_evaluate_all(asts, {'A': True, 'C': True})
+        assert {position: ast.string for position, ast in evaluation.residuals.items()} == {
+            0: 'B', 3: 'D or not B'
+        }
+        assert evaluation.violated == [1]
+
+    def test_memoization(self):
+        rewriter = ASTRewriter()
+        rewriter.rewrite(AST('(A or B) and C'))
+        rewritten = len(rewriter.simplified)
+        rewriter.rewrite(AST('(A or B) and D'))
+        assert len(rewriter.simplified) == rewritten + 2
+
+
+class TestBulkParser:
+
+    constraints = ['A implies B', 'A and or B', '', 'not (B or C)']
+
+    def check_parsed(self, parsed):
+        assert sorted(parsed.asts) == [0, 3]
+        assert parsed.asts[3].string == 'not (B or C)'
+        assert [(error.position, error.offset) for error in parsed.errors] == [(1, 1), (2, None)]
+        assert parsed.symbols.get_features() == ['A', 'B', 'C']
+        first = parsed.asts[0].get_nodes_by_feature('B')[0]
+        second = parsed.asts[3].get_nodes_by_feature('B')[0]
+        assert first.feature is second.feature
+
+    def test_in_process(self):
+        self.check_parsed(parse_constraints(self.constraints, workers=1))
+
+    def test_process_pool(self):
+        self.check_parsed(parse_constraints(self.constraints, workers=2, chunk_size=1))
+
+    def test_bounded_submissions(self):
+        read = []
+
+        def arguments():
+            for number in range(100):
+                read.append(number)
+                yield (number,)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for number, result in enumerate(map_bounded(executor, abs, arguments(), 4)):
+                assert result == number
+                assert len(read) <= number + 5
+
+    def test_file(self, tmp_path):
+        filepath = tmp_path / 'constraints.txt'
+        filepath.write_text('A requires B\n\nB excludes\n')
+        parsed = parse_constraints_file(str(filepath), workers=1)
+        assert list(parsed.asts) == [0]
+        assert [error.position for error in parsed.errors] == [2]
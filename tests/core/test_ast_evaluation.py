@@ -0,0 +1,53 @@
+import itertools
+
+from pytest import importorskip, raises
+
+from famapy.core.models import AST
+
+np = importorskip('numpy')
+
+from famapy.core.models.ast_evaluation import ASTEvaluator, compile_ast  # noqa: E402
+
+
+FEATURES = ['A', 'B', 'C']
+ALL_CONFIGURATIONS = np.array(list(itertools.product([False, True], repeat=3)))
+
+
+def expected(function):
+    return np.array([function(*configuration) for configuration in ALL_CONFIGURATIONS])
+
+
+class TestASTEvaluator:
+
+    def test_operators(self):
+        cases = {
+            'not A': lambda a, b, c: not a,
+            'A and B': lambda a, b, c: a and b,
+            'A or B': lambda a, b, c: a or b,
+            'A implies B': lambda a, b, c: not a or b,
+            'A requires B': lambda a, b, c: not a or b,
+            'A excludes B': lambda a, b, c: not (a and b),
+            'not (A or B) and C': lambda a, b, c: not (a or b) and c,
+        }
+        for constraint, function in cases.items():
+            evaluator = compile_ast(AST(constraint), FEATURES)
+            assert (evaluator.evaluate(ALL_CONFIGURATIONS) == expected(function)).all()
+
+    def test_several_constraints(self):
+        evaluator = ASTEvaluator([AST('A implies B'), AST('B excludes C')], FEATURES)
+        each = evaluator.evaluate_each(ALL_CONFIGURATIONS, chunk_size=3)
+        assert each.shape == (8, 2)
+        assert (each[:, 0] == expected(lambda a, b, c: not a or b)).all()
+        assert (each[:, 1] == expected(lambda a, b, c: not (b and c))).all()
+        assert (evaluator.evaluate(ALL_CONFIGURATIONS) == each.all(axis=1)).all()
+
+    def test_shared_subexpressions(self):
+        evaluator = ASTEvaluator([AST('A implies B'), AST('C or (A implies B)')], FEATURES)
+        # A, B, implies, C, or
+        assert len(evaluator.program) == 5
+
+    def test_errors(self):
+        with raises(ValueError):
+            compile_ast(AST('A and D'), FEATURES)
+        with raises(ValueError):
+            compile_ast(AST('A and B'), FEATURES).evaluate(np.zeros((2, 2), dtype=bool))
@@ -0,0 +1,65 @@
+from pytest import raises
+
+from famapy.core.models import AST
+from famapy.core.models.ast import Grammar
+from famapy.core.models.ast_serialization import (
+    ASTBundle, decode_varint, encode_varint, load_asts, serialize_asts
+)
+from famapy.core.models.symbol_table import SymbolTable
+
+
+def nodes_summary(ast):
+    return [(node.get_name(), node.token, node.points_to, node.level) for node in ast.get_nodes()]
+
+
+def test_varint():
+    output = bytearray()
+    for value in (0, 127, 128, 300, 2 ** 40):
+        encode_varint(value, output)
+    position = 0
+    values = []
+    while position < len(output):
+        value, position = decode_varint(output, position)
+        values.append(value)
+    assert values == [0, 127, 128, 300, 2 ** 40]
+
+
+def test_round_trip():
+    asts = [
+        AST('A and (B or not C)'),
+        AST('((A)) requires D'),
+        AST(' or '.join(f'F{idx}' for idx in range(200))),
+    ]
+    symbols = SymbolTable(['D'])
+    bundle = ASTBundle(memoryview(serialize_asts(asts, symbols)))
+
+    assert len(bundle) == 3
+    assert bundle.symbols.get_features() == ['D', 'A', 'B', 'C'] + [f'F{idx}' for idx in range(200)]
+    for ast, loaded in zip(asts, bundle):
+        assert loaded.string == ast.string
+        assert loaded.list == ast.list
+        assert nodes_summary(loaded) == nodes_summary(ast)
+    assert bundle[0].get_features()[0].feature is bundle[1].get_features()[0].feature
+
+
+def test_grammar():
+    grammar = Grammar(binary_operators=['and', 'or'])
+    data = serialize_asts([AST('A and B or C', grammar)])
+    loaded = load_asts(data)[0]
+    assert loaded.grammar == grammar
+    assert loaded.get_root().get_name() == 'and'
+    with raises(ValueError):
+        serialize_asts([AST('A and B', grammar), AST('A and B')])
+
+
+def test_file(tmp_path):
+    filepath = tmp_path / 'constraints.bin'
+    filepath.write_bytes(serialize_asts([AST('A implies B')]))
+    with ASTBundle.from_file(str(filepath)) as bundle:
+        assert bundle[0].string == 'A implies B'
+
+    filepath.write_bytes(b'FMAST\x63')
+    with raises(ValueError, match='version'):
+        ASTBundle.from_file(str(filepath))
+    with raises(ValueError):
+        ASTBundle(b'constraints')
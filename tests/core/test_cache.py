@@ -0,0 +1,170 @@
+import os
+import subprocess
+import sys
+from types import ModuleType
+from unittest import mock
+
+import pytest
+
+from famapy.core import discover
+from famapy.core.cache import ResultCache, model_digest, plugin_fingerprint
+from famapy.core.discover import DiscoverMetamodels
+from famapy.core.exceptions import TransformationNotFound
+from famapy.core.plugins import Plugin
+
+import one_plugin
+
+
+class Model:
+
+    def __init__(self, features, ranks):
+        self.features = features
+        self.ranks = ranks
+
+
+class Feature:
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+
+
+class TestResultCache:
+
+    def test_memory(self):
+        cache = ResultCache()
+        calls = []
+        for _ in range(3):
+            assert cache.get_or_compute('key', lambda: calls.append(1)) is None
+        assert calls == [1]
+
+    def test_copies(self, tmp_path):
+        for cache in (ResultCache(), ResultCache(str(tmp_path))):
+            result = cache.get_or_compute('key', lambda: {'features': ['A']})
+            result['features'].append('B')
+            cache.get_or_compute('key', lambda: None)['features'].append('C')
+            assert cache.get_or_compute('key', lambda: None) == {'features': ['A']}
+
+    def test_keys(self):
+        cache = ResultCache()
+        key = cache.get_key('plugin', 'Sampling', 'model', {'seed': 1, 'sample_size': 2})
+        assert key == cache.get_key('plugin', 'Sampling', 'model', {'sample_size': 2, 'seed': 1})
+        assert key != cache.get_key('plugin', 'Sampling', 'model', {'seed': 2, 'sample_size': 2})
+        assert key != cache.get_key('other', 'Sampling', 'model', {'seed': 1, 'sample_size': 2})
+
+    def test_disk(self, tmp_path):
+        ResultCache(str(tmp_path)).get_or_compute('key', lambda: [1, 2, 3])
+        # another process reads it from disk
+        assert ResultCache(str(tmp_path)).get_or_compute('key', lambda: None) == [1, 2, 3]
+        # results that cannot be pickled stay in memory
+        cache = ResultCache(str(tmp_path))
+        assert cache.get_or_compute('lambda', lambda: lambda: 3)() == 3
+        assert len(list(tmp_path.glob('*/*.pickle'))) == 1
+
+    def test_eviction(self, tmp_path):
+        cache = ResultCache(str(tmp_path), max_disk_size=1000)
+        for number in range(10):
+            cache.get_or_compute(str(number), lambda: bytes(300))
+        files = list(tmp_path.glob('*/*.pickle'))
+        assert 0 < len(files) <= 3
+        assert sum(file.stat().st_size for file in files) <= 1000
+
+    def test_overwrite(self, tmp_path):
+        cache = ResultCache(str(tmp_path))
+        for _ in range(3):
+            cache.store('key', bytes(300))
+        assert cache.disk_size == (tmp_path / 'ke' / 'key.pickle').stat().st_size == 300
+
+    def test_plugin_fingerprint(self, tmp_path):
+        (tmp_path / 'operations.py').write_text('RESULT = 1\n')
+        module = ModuleType('plugin')
+        module.__path__ = [str(tmp_path)]
+        fingerprint = plugin_fingerprint(module)
+        assert plugin_fingerprint(module) == fingerprint
+        (tmp_path / 'operations.py').write_text('RESULT = 2\n')
+        assert plugin_fingerprint(module) != fingerprint
+
+    def test_core_fingerprint(self, tmp_path):
+        # a change in famapy.core changes the fingerprint of every plugin
+        (tmp_path / 'plugin').mkdir()
+        (tmp_path / 'core').mkdir()
+        (tmp_path / 'core' / 'operations.py').write_text('RESULT = 1\n')
+        module = ModuleType('plugin')
+        module.__path__ = [str(tmp_path / 'plugin')]
+        with mock.patch('famapy.core.cache.__file__', str(tmp_path / 'core' / 'cache.py')):
+            fingerprint = plugin_fingerprint(module)
+            (tmp_path / 'core' / 'operations.py').write_text('RESULT = 2\n')
+            assert plugin_fingerprint(module) != fingerprint
+
+    def test_model_digest(self):
+        assert model_digest([1, 2]) == model_digest([1, 2]) != model_digest([2, 1])
+        assert model_digest(lambda: None) is None
+
+        model = Model({'A', 'B', 'C'}, {'A': 1, 'B': 2})
+        assert model_digest(model) == model_digest(Model({'C', 'B', 'A'}, {'B': 2, 'A': 1}))
+        assert model_digest(model) != model_digest(Model({'A', 'B'}, {'A': 1, 'B': 2}))
+
+    def test_cyclic_model_digest(self):
+        def cyclic_model(names):
+            model = Model(set(), {})
+            root = Feature(names[0])
+            model.features = {root, Feature(names[1], root)}
+            root.model = model
+            return model
+
+        assert model_digest(cyclic_model('AB')) == model_digest(cyclic_model('AB'))
+        assert model_digest(cyclic_model('AB')) != model_digest(cyclic_model('AC'))
+
+        chain = None
+        for number in range(5000):
+            chain = Feature(str(number), chain)
+        assert model_digest({chain}) is not None
+
+    def test_model_digest_across_processes(self):
+        code = (
+            'from famapy.core.cache import model_digest\n'
+            'model = [{"feature" + str(number) for number in range(50)}, {"A": frozenset("xyz")}]\n'
+            'model.append(model)\n'
+            'print(model_digest(model))\n'
+        )
+        digests = {
+            subprocess.run(
+                [sys.executable, '-c', code], capture_output=True, check=True, text=True,
+                env={**os.environ, 'PYTHONHASHSEED': str(seed)}
+            ).stdout
+            for seed in range(3)
+        }
+        assert len(digests) == 1
+
+
+class TestCachedOperations:
+
+    @mock.patch.object(discover, 'filter_modules_from_plugin_paths')
+    def test_use_operation_from_file(self, mocker, tmp_path):
+        mocker.return_value = [one_plugin]
+        model = tmp_path / 'model.ext'
+        model.write_text('model')
+        search = DiscoverMetamodels(cache=ResultCache(str(tmp_path / 'cache')))
+
+        with mock.patch.object(
+            Plugin, 'use_transformation_t2m', autospec=True,
+            side_effect=Plugin.use_transformation_t2m
+        ) as transformation:
+            for _ in range(2):
+                assert search.use_operation_from_file('plugin1', 'Operation', str(model)) == \
+                    '123456'
+            assert transformation.call_count == 1
+
+            # a new process finds the result on disk; a changed model is analysed again
+            search.cache = ResultCache(str(tmp_path / 'cache'))
+            search.use_operation_from_file('plugin1', 'Operation', str(model))
+            assert transformation.call_count == 1
+            model.write_text('changed')
+            search.use_operation_from_file('plugin1', 'Operation', str(model))
+            assert transformation.call_count == 2
+
+            # the same content with another extension is transformed by another plugin
+            other = tmp_path / 'model.other'
+            other.write_text('changed')
+            with pytest.raises(TransformationNotFound):
+                search.use_operation_from_file('plugin1', 'Operation', str(other))
@@ -0,0 +1,88 @@
+import io
+import itertools
+
+from pytest import raises
+
+from famapy.core.exceptions import ElementNotFound
+from famapy.core.models import AST
+from famapy.core.models.cnf import CNF, CNFEncoder
+from famapy.core.models.symbol_table import SymbolTable
+
+
+def count_solutions(cnf, features):
+    """ Number of assignments of the features that can be extended to a solution """
+    clauses = list(cnf.get_clauses())
+    variables = cnf.get_number_of_variables()
+    solutions = set()
+    for values in itertools.product([False, True], repeat=variables):
+        if all(any(values[abs(literal) - 1] == (literal > 0) for literal in clause)
+               for clause in clauses):
+            solutions.add(tuple(values[cnf.symbols.get_id(feature) - 1] for feature in features))
+    return len(solutions)
+
+
+class TestSymbolTable:
+
+    def test_ids(self):
+        symbols = SymbolTable(['A', 'B'])
+        assert symbols.add('A') == 1
+        assert symbols.add('C') == 3
+        assert symbols.add_auxiliary() == 4
+        assert symbols.get_name(2) == 'B'
+        assert symbols.is_auxiliary(4)
+        assert symbols.get_features() == ['A', 'B', 'C']
+        with raises(ElementNotFound):
+            symbols.get_id('D')
+
+
+class TestCNFEncoder:
+
+    def test_tseitin_top_level(self):
+        cnf = CNFEncoder(SymbolTable(['A', 'B', 'C'])).encode(AST('A and (B or not C)'))
+        assert list(cnf.get_clauses()) == [(1,), (2, -3)]
+
+    def test_tseitin_shares_subformulas(self):
+        encoder = CNFEncoder()
+        cnf = encoder.encode([AST('(A and B) or C'), AST('D or (A and B)')])
+        # one auxiliary variable for "A and B" and its three clauses
+        assert len(cnf.symbols) == 5
+        assert len(cnf) == 5
+
+    def test_distribution(self):
+        cnf = CNFEncoder(mode=CNFEncoder.DISTRIBUTION).encode(AST('A or (B and not C)'))
+        assert list(cnf.get_clauses()) == [(1, 2), (1, -3)]
+        assert len(cnf.symbols) == 3
+
+    def test_equisatisfiable(self):
+        constraints = [
+            AST('not (A excludes B) or (C requires not D)'),
+            AST('(A implies (B and not C)) and not (D or A)'),
+            AST('A or not A'),
+        ]
+        features = ['A', 'B', 'C', 'D']
+        expected = [13, 4, 16]
+        for constraint, solutions in zip(constraints, expected):
+            for mode in (CNFEncoder.TSEITIN, CNFEncoder.DISTRIBUTION):
+                cnf = CNFEncoder(SymbolTable(features), mode).encode(constraint)
+                assert count_solutions(cnf, features) == solutions
+
+    def test_dimacs(self):
+        file = io.StringIO()
+        CNFEncoder().write_dimacs([AST('A implies B'), AST('not C')], file)
+        assert file.getvalue() == 'c 1 A\nc 2 B\nc 3 C\np cnf 3 2\n-1 2 0\n-3 0\n'
+
+    def test_streamed_dimacs(self):
+        constraints = [AST('(A and B) or (C and D)'), AST('E excludes (A or C)'), AST('F')]
+        for mode in (CNFEncoder.TSEITIN, CNFEncoder.DISTRIBUTION):
+            streamed = io.StringIO()
+            CNFEncoder(mode=mode).write_dimacs(iter(constraints), streamed)
+            encoded = io.StringIO()
+            CNFEncoder(mode=mode).encode(constraints).write_dimacs(encoded)
+            assert streamed.getvalue() == encoded.getvalue()
+
+    def test_invalid_literal(self):
+        cnf = CNF()
+        with raises(ValueError):
+            cnf.add_clause([1, 0])
+        assert len(cnf) == 0
+        assert len(cnf.literals) == 0
@@ -0,0 +1,82 @@
+import itertools
+import random
+
+from pytest import raises
+
+from famapy.core.models.cnf import CNF
+from famapy.core.models.covering_array import TWiseSampler
+from famapy.core.models.sat_solver import SATSolver
+
+
+def solutions(clauses, variables):
+    for values in itertools.product([False, True], repeat=variables):
+        model = {variable if value else -variable for variable, value in enumerate(values, 1)}
+        if all(any(literal in model for literal in clause) for clause in clauses):
+            yield model
+
+
+def interactions(configurations, strength):
+    return {
+        interaction
+        for configuration in configurations
+        for interaction in itertools.combinations(sorted(configuration, key=abs), strength)
+    }
+
+
+class TestTWiseSampler:
+
+    def test_pairwise(self):
+        # 1 is the root, 2 and 3 are alternative children, 4 is optional
+        cnf = CNF()
+        cnf.add_clauses([(1,), (-2, 1), (-3, 1), (-1, 2, 3), (-2, -3), (-4, 1)])
+        configurations = list(TWiseSampler(cnf, [1, 2, 3, 4]).iter_configurations())
+        models = solutions(list(cnf.get_clauses()), 4)
+        assert interactions(configurations, 2) == interactions(models, 2)
+        assert all(1 in configuration for configuration in configurations)
+        assert len(configurations) == 4
+
+    def test_void_model(self):
+        cnf = CNF()
+        cnf.add_clauses([(1,), (-1,)])
+        assert list(TWiseSampler(cnf, [1]).iter_configurations()) == []
+
+    def test_workers(self):
+        with raises(ValueError):
+            TWiseSampler(CNF(), [], workers=0)
+
+    def test_random_formulas(self):
+        generator = random.Random(0)
+        for _ in range(150):
+            variables = generator.randint(1, 6)
+            strength = generator.choice([1, 2, 3])
+            cnf = CNF()
+            for _ in range(generator.randint(0, 6)):
+                cnf.add_clause([
+                    generator.choice([-1, 1]) * generator.randint(1, variables)
+                    for _ in range(generator.randint(1, 3))
+                ])
+            cnf.max_variable = variables
+            models = list(solutions(list(cnf.get_clauses()), variables))
+
+            sampler = TWiseSampler(
+                cnf, range(1, variables + 1), strength, calls=generator.randint(0, 5),
+                candidates=generator.randint(1, 50)
+            )
+            configurations = [set(item) for item in sampler.iter_configurations()]
+            assert all(configuration in models for configuration in configurations)
+            strength = min(strength, variables)
+            assert interactions(configurations, strength) == interactions(models, strength)
+
+    def test_parallel(self):
+        cnf = CNF()
+        cnf.add_clause((1,))
+        for feature in range(2, 30):
+            cnf.add_clause((-feature, feature // 2))
+        configurations = list(TWiseSampler(cnf, range(1, 30), workers=2).iter_configurations())
+
+        # the pairs that are not covered are invalid
+        solver = SATSolver(cnf)
+        covered = interactions(configurations, 2)
+        for first, second in itertools.combinations(range(1, 30), 2):
+            for pair in itertools.product((first, -first), (second, -second)):
+                assert pair in covered or not solver.solve(pair)
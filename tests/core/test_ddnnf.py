@@ -0,0 +1,154 @@
+import itertools
+import random
+
+from famapy.core.models import AST
+from famapy.core.models.cnf import CNF, CNFEncoder
+from famapy.core.models.ddnnf import DDNNF, DDNNFCompiler, condition, count_models
+from famapy.core.models.symbol_table import SymbolTable
+
+
+def solutions(cnf):
+    clauses = list(cnf.get_clauses())
+    for values in itertools.product([False, True], repeat=cnf.get_number_of_variables()):
+        if all(any(values[abs(literal) - 1] == (literal > 0) for literal in clause)
+               for clause in clauses):
+            yield values
+
+
+def count_solutions(cnf):
+    return sum(1 for _ in solutions(cnf))
+
+
+class TestDDNNF:
+
+    def test_condition(self):
+        assert condition([(1, 2), (-2, 3), (-3, 4, 5)], [-1]) == ([2, 3], [(4, 5)])
+        assert condition([(1,), (-1, 2), (-2,)], []) is None
+
+    def test_count(self):
+        cnf = CNF()
+        cnf.add_clauses([(1,), (-2, 1), (-3, 1), (-1, 2, 3)])
+        assert count_models(cnf) == 3
+
+    def test_unsatisfiable(self):
+        cnf = CNF()
+        cnf.add_clauses([(1, 2), (-1, 2), (1, -2), (-1, -2)])
+        ddnnf = DDNNFCompiler().compile(cnf)
+        assert ddnnf.root == DDNNF.FALSE
+        assert ddnnf.count() == 0
+
+    def test_empty_clause(self):
+        cnf = CNF()
+        cnf.add_clauses([(1, 2), ()])
+        ddnnf = DDNNFCompiler().compile(cnf)
+        assert ddnnf.root == DDNNF.FALSE
+        assert count_models(cnf) == 0
+
+    def test_reused_compiler(self):
+        compiler = DDNNFCompiler()
+        first = CNF()
+        first.add_clauses([(1, 2), (3, 4, 5)])
+        second = CNF()
+        second.add_clause((1, 2))
+
+        ddnnf = compiler.compile(first)
+        assert ddnnf.count() == 21
+        assert compiler.compile(second).count() == 3
+        assert ddnnf.count() == 21
+        assert compiler.compile(first).count() == 21
+
+    def test_free_variables(self):
+        cnf = CNF()
+        cnf.add_clause((1, 2))
+        cnf.max_variable = 200
+        assert count_models(cnf) == 3 * 2 ** 198
+
+    def test_random_formulas(self):
+        generator = random.Random(0)
+        for _ in range(300):
+            cnf = CNF()
+            variables = generator.randint(1, 8)
+            for _ in range(generator.randint(0, 12)):
+                cnf.add_clause([
+                    generator.choice([-1, 1]) * generator.randint(1, variables)
+                    for _ in range(generator.randint(1, 3))
+                ])
+            assert count_models(cnf) == count_solutions(cnf)
+
+    def test_marginals(self):
+        generator = random.Random(1)
+        for _ in range(200):
+            cnf = CNF()
+            variables = generator.randint(1, 7)
+            for _ in range(generator.randint(0, 10)):
+                cnf.add_clause([
+                    generator.choice([-1, 1]) * generator.randint(1, variables)
+                    for _ in range(generator.randint(1, 3))
+                ])
+            cnf.max_variable = variables
+            marginals = [0] * (variables + 1)
+            for values in solutions(cnf):
+                for variable, value in enumerate(values, 1):
+                    marginals[variable] += value
+            assert DDNNFCompiler().compile(cnf).count_marginals() == marginals
+
+    def test_commonalities(self):
+        cnf = CNF(SymbolTable(['A', 'B', 'C', 'D']))
+        cnf.add_clauses([(1,), (-2, 1), (-3, 1), (-1, 2, 3), (-4, 3)])
+        commonalities = DDNNFCompiler().compile(cnf).get_commonalities(cnf.symbols)
+        # products: AB, AC, ACD, ABC, ABCD
+        assert commonalities == {'A': 1.0, 'B': 0.6, 'C': 0.8, 'D': 0.4}
+
+    def test_tseitin_encoding(self):
+        # the auxiliary variables do not change the number of solutions
+        constraints = [AST('(A and B) or (C and D)'), AST('E excludes (A or C)')]
+        tseitin = CNFEncoder().encode(constraints)
+        distribution = CNFEncoder(mode=CNFEncoder.DISTRIBUTION).encode(constraints)
+        assert len(tseitin.symbols) > len(distribution.symbols)
+        assert count_models(tseitin) == count_models(distribution) == count_solutions(distribution)
+
+    def test_large_model(self):
+        # a deep hierarchy of optional features and many independent groups: too many
+        # products to enumerate
+        cnf = CNF()
+        cnf.add_clause((1,))
+        for feature in range(2, 3001):
+            cnf.add_clause((-feature, feature // 2))
+        assert count_models(cnf) > 2 ** 1000
+
+    def test_samples(self):
+        generator = random.Random(2)
+        for _ in range(50):
+            cnf = CNF()
+            variables = generator.randint(1, 5)
+            for _ in range(generator.randint(0, 6)):
+                cnf.add_clause([
+                    generator.choice([-1, 1]) * generator.randint(1, variables)
+                    for _ in range(generator.randint(1, 3))
+                ])
+            cnf.max_variable = variables
+            models = {
+                tuple(variable for variable, value in enumerate(values, 1) if value)
+                for values in solutions(cnf)
+            }
+            ddnnf = DDNNFCompiler().compile(cnf)
+            if not models:
+                continue
+
+            # every model is drawn, with roughly the same frequency
+            draws = 400 * len(models)
+            frequencies = dict.fromkeys(models, 0)
+            for sample in itertools.islice(ddnnf.iter_samples(generator), draws):
+                frequencies[tuple(sample)] += 1
+            assert len(frequencies) == len(models)
+            assert all(abs(value - 400) < 120 for value in frequencies.values())
+
+    def test_samples_of_large_model(self):
+        cnf = CNF()
+        cnf.add_clause((1,))
+        for feature in range(2, 3001):
+            cnf.add_clause((-feature, feature // 2))
+        ddnnf = DDNNFCompiler().compile(cnf)
+        for sample in itertools.islice(ddnnf.iter_samples(random.Random(0)), 20):
+            selected = set(sample)
+            assert all(feature // 2 in selected for feature in selected if feature > 1)
@@ -0,0 +1,110 @@
+import itertools
+import random
+
+from pytest import raises
+
+from famapy.core.models.diagnosis import CALL, ConsistencyChecker, FastDiag, advance
+from famapy.core.utils import LRUCache
+
+
+def is_satisfiable(clauses, variables):
+    for values in itertools.product([False, True], repeat=variables):
+        model = {variable if value else -variable for variable, value in enumerate(values, 1)}
+        if all(any(literal in model for literal in clause) for clause in clauses):
+            return True
+    return False
+
+
+def minimal_diagnoses(background, constraints, variables):
+
+    def consistent(indexes):
+        clauses = background + [clause for index in indexes for clause in constraints[index]]
+        return is_satisfiable(clauses, variables)
+
+    everything = set(range(len(constraints)))
+    if not consistent(()) or consistent(everything):
+        return set()
+
+    diagnoses = set()
+    for size in range(1, len(constraints) + 1):
+        for diagnosis in itertools.combinations(everything, size):
+            if consistent(everything - set(diagnosis)) and \
+                    not any(found <= set(diagnosis) for found in diagnoses):
+                diagnoses.add(frozenset(diagnosis))
+    return diagnoses
+
+
+def random_clause(generator, variables):
+    return tuple(
+        generator.choice([-1, 1]) * generator.randint(1, variables)
+        for _ in range(generator.randint(1, 2))
+    )
+
+
+class TestFastDiag:
+
+    def test_diagnosis(self):
+        # A requires B, A excludes B and A is selected
+        checker = ConsistencyChecker([(1,)], [[(-1, 2)], [(-1, -2)], [(3,)]])
+        assert FastDiag(checker).find_diagnoses(5) == [[1], [0]]
+
+    def test_preferred_diagnosis(self):
+        # the earlier constraints are kept
+        checker = ConsistencyChecker([], [[(1,)], [(-1,)], [(2,)]])
+        assert FastDiag(checker).find_diagnoses() == [[1]]
+
+    def test_consistent(self):
+        checker = ConsistencyChecker([(1,)], [[(1, 2)], [(2,)]])
+        assert FastDiag(checker).find_diagnoses() == []
+        checker = ConsistencyChecker([(1,), (-1,)], [[(2,)]])
+        assert FastDiag(checker).find_diagnoses() == []
+
+    def test_workers(self):
+        with raises(ValueError):
+            FastDiag(ConsistencyChecker([], []), workers=0)
+
+    def test_random_models(self):
+        generator = random.Random(0)
+        for _ in range(200):
+            variables = generator.randint(2, 5)
+            background = [
+                random_clause(generator, variables) for _ in range(generator.randint(0, 2))
+            ]
+            constraints = [
+                [random_clause(generator, variables) for _ in range(generator.randint(1, 2))]
+                for _ in range(generator.randint(1, 7))
+            ]
+            expected = minimal_diagnoses(background, constraints, variables)
+            number = generator.randint(1, 4)
+
+            found = FastDiag(ConsistencyChecker(background, constraints)).find_diagnoses(number)
+            assert len(found) == min(number, len(expected))
+            assert len({frozenset(diagnosis) for diagnosis in found}) == len(found)
+            assert all(frozenset(diagnosis) in expected for diagnosis in found)
+
+    def test_parallel(self):
+        generator = random.Random(1)
+        constraints = [[(generator.choice([-1, 1]) * generator.randint(1, 20),)] for _ in range(30)]
+        background = [(-variable, variable + 1) for variable in range(1, 20)]
+        checker = ConsistencyChecker(background, constraints)
+        expected = FastDiag(checker).find_diagnoses(3)
+        assert FastDiag(checker, workers=2).find_diagnoses(3) == expected
+
+    def test_shared_cache(self):
+        checker = ConsistencyChecker([(1,)], [[(-1, 2)], [(-1, -2)], [(3,)]])
+        cache = LRUCache(maxsize=100)
+        expected = FastDiag(checker, cache=cache).find_diagnoses(2)
+        misses = cache.misses
+        assert FastDiag(checker, cache=cache).find_diagnoses(2) == expected
+        assert cache.misses == misses
+
+    def test_timeout(self):
+        checker = ConsistencyChecker([], [[(1,)], [(-1,)]])
+        assert FastDiag(checker).find_diagnoses(2, timeout=0) == []
+
+    def test_states(self):
+        # a state can be continued with both answers
+        query, stack, _ = advance(((CALL, (), (0, 1), frozenset({0, 1})),), None)
+        assert query == frozenset({1})
+        assert advance(stack, True) == (None, (), (0,))
+        assert advance(stack, False)[0] == frozenset({0})
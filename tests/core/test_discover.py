@@ -4,13 +4,29 @@ from unittest import mock
 from famapy.core import discover
 from famapy.core.discover import DiscoverMetamodels
 from famapy.core.models import VariabilityModel
-from famapy.core.plugins import PluginNotFound
+from famapy.core.operations import Products
+from famapy.core.plugins import Plugin, PluginNotFound
 
 import one_plugin
 import two_plugins
 import complex_plugin
 
 
+class NumberedProducts(Products):
+
+    def __init__(self):
+        pass
+
+    def execute(self, model):
+        return self
+
+    def get_result(self):
+        return self.get_products()
+
+    def get_products(self):
+        return list(range(10))
+
+
 class TestDiscover:
 
     def test_discover(self):
@@ -88,3 +104,34 @@ class TestDiscoverApplyFunctions:
         )
 
         assert operation.get_result() == '123456'
+
+    @mock.patch.object(discover, 'filter_modules_from_plugin_paths')
+    def test_products_page_from_file(self, mocker, tmp_path):
+        mocker.return_value = [one_plugin]
+        search = DiscoverMetamodels()
+        first = tmp_path / 'first.ext'
+        first.write_text('first')
+        second = tmp_path / 'second.ext'
+        second.write_text('second')
+
+        with mock.patch.object(
+            Plugin, 'use_transformation_t2m', autospec=True,
+            side_effect=Plugin.use_transformation_t2m
+        ) as transformation, mock.patch.object(
+            Plugin, 'use_operation', side_effect=lambda *_: NumberedProducts()
+        ) as operation:
+            page = search.get_products_page_from_file('plugin1', str(first), 2)
+            page = search.get_products_page_from_file('plugin1', str(first), 2, page.cursor)
+            # the next page continues the suspended enumeration
+            assert page.products == [2, 3]
+            assert transformation.call_count == operation.call_count == 1
+
+            # the cursor of a file is rejected for another one
+            with raises(ValueError):
+                search.get_products_page_from_file('plugin1', str(second), 2, page.cursor)
+            Products.suspended.clear()
+            with raises(ValueError):
+                search.get_products_page_from_file('plugin1', str(second), 2, page.cursor)
+            assert search.get_products_page_from_file(
+                'plugin1', str(first), 2, page.cursor
+            ).products == [4, 5]
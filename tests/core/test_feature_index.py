@@ -0,0 +1,32 @@
+from pytest import raises
+
+from famapy.core.exceptions import ElementNotFound
+from famapy.core.models import AST
+from famapy.core.models.feature_index import FeatureIndex
+
+
+def test_queries():
+    index = FeatureIndex([AST('A implies B'), AST('B excludes (C or not A)'), AST('D or D')])
+    assert index.get_constraints('A') == [0, 1]
+    assert index.get_occurrences('D') == {2: [0, 2]}
+    assert index.get_features(1) == ['B', 'C', 'A']
+    assert index.get_co_occurring('A') == {'B': 2, 'C': 1}
+    assert index.get_co_occurring('D') == {}
+    assert index.get_constraints('E') == []
+
+
+def test_incremental_updates():
+    index = FeatureIndex([AST('A implies B'), AST('A and C')])
+    constraint_id = index.add(AST('A or B'))
+    assert index.get_co_occurring('A') == {'B': 2, 'C': 1}
+
+    assert index.remove(0).string == 'A implies B'
+    assert index.get_constraints('A') == [1, constraint_id]
+    assert index.get_co_occurring('B') == {'A': 1}
+
+    index.remove(1)
+    assert index.get_co_occurring('C') == {}
+    assert index.get_constraints('C') == []
+    assert list(index) == [constraint_id]
+    with raises(ElementNotFound):
+        index.remove(1)
@@ -0,0 +1,502 @@
+import itertools
+from fractions import Fraction
+from types import ModuleType
+
+from pytest import approx, raises
+
+from famapy.core.models import AST, Configuration, VariabilityModel
+from famapy.core.models.cnf import CNF
+from famapy.core.models.ddnnf import count_models
+from famapy.core.models.sat_solver import SATSolver
+from famapy.core.models.symbol_table import SymbolTable
+from famapy.core.operations import (
+    ConstraintsDiagnosis, CoreFeatures, CountingVariability, FeatureBackbone,
+    GreedyTWiseSampling, Products, ProductsNumber, UniformSampling, Valid, ValidConfiguration
+)
+from famapy.core.plugins import Plugin
+from famapy.core.session import AnalysisSession
+
+
+class RequiresModel(VariabilityModel):
+    """ Model where each feature requires the previous one """
+
+    def __init__(self, features):
+        self.features = features
+
+    @staticmethod
+    def get_extension():
+        return 'requires'
+
+
+class SelectedFeatures(Configuration):
+
+    def __init__(self, elements):
+        self.elements = elements
+
+
+class RequiresValidConfiguration(ValidConfiguration):
+
+    def __init__(self):
+        self.configuration = None
+        self.result = False
+
+    def set_configuration(self, configuration):
+        self.configuration = configuration
+
+    def execute(self, model):
+        self.result = self.find_violated(model, self.configuration) is None
+        return self
+
+    def get_result(self):
+        return self.result
+
+    def is_valid(self):
+        return self.result
+
+    def find_violated_constraint(self, configuration):
+        return self.find_violated(self.model, configuration)
+
+    @staticmethod
+    def find_violated(model, configuration):
+        for previous, feature in zip(model.features, model.features[1:]):
+            if configuration.elements.get(feature) and not configuration.elements.get(previous):
+                return f'{feature} requires {previous}'
+        return None
+
+
+class ExecutedValidConfiguration(RequiresValidConfiguration):
+
+    find_violated_constraint = ValidConfiguration.find_violated_constraint
+
+
+class ConstraintsValidConfiguration(ExecutedValidConfiguration):
+
+    def get_constraints(self, model):
+        return [
+            AST(f'{feature} requires {previous}')
+            for previous, feature in zip(model.features, model.features[1:])
+        ]
+
+    def execute(self, model):
+        raise AssertionError('The configurations must be checked on the encoding')
+
+
+class StreamedProducts(Products):
+
+    def __init__(self):
+        self.generated = 0
+
+    def execute(self, model):
+        return self
+
+    def get_result(self):
+        return self.get_products()
+
+    def get_products(self):
+        return list(self.iter_products())
+
+    def iter_products(self):
+        # an unbounded number of products, generated while they are consumed
+        for number in itertools.count():
+            self.generated += 1
+            yield [f'F{number}']
+
+
+class ListedProducts(Products):
+
+    def __init__(self):
+        pass
+
+    def execute(self, model):
+        return self
+
+    def get_result(self):
+        return self.get_products()
+
+    def get_products(self):
+        return [['A'], ['A', 'B'], ['A', 'C']]
+
+
+class TestProducts:
+
+    def test_streaming(self):
+        products = StreamedProducts()
+        assert next(products.iter_products()) == ['F0']
+        first = products.get_products_page(limit=3)
+        assert products.get_products_page(limit=2, cursor=first.cursor).products == [
+            ['F3'], ['F4']
+        ]
+        # the second page continues the enumeration of the first one
+        assert products.generated == 6
+
+    def test_cursor(self):
+        products = StreamedProducts()
+        first = products.get_products_page(limit=2, owner='model')
+        second = products.get_products_page(limit=2, cursor=first.cursor, owner='model')
+        assert first.products + second.products == [['F0'], ['F1'], ['F2'], ['F3']]
+        assert second.cursor.endswith(':4')
+
+        # without the suspended enumeration, e.g. in another process, the cursor still works
+        Products.suspended.clear()
+        third = StreamedProducts().get_products_page(
+            limit=2, cursor=second.cursor, owner='model'
+        )
+        assert third.products == [['F4'], ['F5']]
+        with raises(ValueError):
+            products.get_products_page(limit=2, cursor='4', owner='model')
+
+    def test_foreign_cursor(self):
+        products = StreamedProducts()
+        page = products.get_products_page(limit=2)
+        assert products.get_products_page(limit=2, cursor=page.cursor).products == [
+            ['F2'], ['F3']
+        ]
+
+        # the cursor of a model is rejected for another one, suspended or not
+        page = products.get_products_page(limit=2, owner='a')
+        for _ in range(2):
+            with raises(ValueError):
+                StreamedProducts().get_products_page(limit=2, cursor=page.cursor)
+            with raises(ValueError):
+                products.get_products_page(limit=2, cursor=page.cursor, owner='b')
+            Products.suspended.clear()
+
+    def test_list_implementation(self):
+        products = ListedProducts()
+        assert list(products.iter_products()) == products.get_products()
+        page = products.get_products_page(limit=2)
+        assert page.products == [['A'], ['A', 'B']]
+        last_page = products.get_products_page(limit=2, cursor=page.cursor)
+        assert last_page == (([['A', 'C']]), None)
+
+    def test_missing_implementation(self):
+
+        class NoProducts(Products):
+            def __init__(self):
+                pass
+
+            def execute(self, model):
+                return self
+
+            def get_result(self):
+                return None
+
+        with raises(TypeError):
+            NoProducts()
+
+
+class TestValidConfiguration:
+
+    model = RequiresModel(['A', 'B', 'C'])
+    configurations = [
+        SelectedFeatures({'A': True, 'B': True}),
+        SelectedFeatures({'C': True}),
+        SelectedFeatures({}),
+        SelectedFeatures({'A': True, 'C': True}),
+    ]
+
+    def test_check_configurations(self):
+        operation = RequiresValidConfiguration()
+        assert operation.check_configurations(self.model, self.configurations, chunk_size=3) == [
+            True, False, True, False
+        ]
+
+    def test_explain_configurations(self):
+        operation = RequiresValidConfiguration()
+        assert operation.explain_configurations(self.model, iter(self.configurations)) == [
+            None, 'C requires B', None, 'C requires B'
+        ]
+
+    def test_constraints(self):
+        operation = ConstraintsValidConfiguration()
+        assert operation.check_configurations(self.model, self.configurations) == [
+            True, False, True, False
+        ]
+        assert operation.explain_configurations(self.model, self.configurations, workers=2) == [
+            None, 'C requires B', None, 'C requires B'
+        ]
+
+    def test_unknown_constraint(self):
+        operation = ExecutedValidConfiguration()
+        assert operation.explain_configurations(self.model, self.configurations) == [
+            None, ValidConfiguration.UNKNOWN, None, ValidConfiguration.UNKNOWN
+        ]
+
+    def test_workers(self):
+        operation = RequiresValidConfiguration()
+        configurations = self.configurations * 10
+        assert operation.check_configurations(
+            self.model, configurations, workers=2, chunk_size=7
+        ) == operation.check_configurations(self.model, configurations)
+
+
+class ClausesModel(VariabilityModel):
+
+    def __init__(self, clauses):
+        self.clauses = clauses
+        self.encodings = 0
+
+    @staticmethod
+    def get_extension():
+        return 'clauses'
+
+    def encode(self):
+        self.encodings += 1
+        cnf = CNF(SymbolTable(['A', 'B', 'C', 'D']))
+        cnf.add_clauses(self.clauses)
+        return cnf
+
+
+class ClausesValid(Valid):
+
+    def __init__(self):
+        self.result = False
+
+    def execute(self, model):
+        self.result = SATSolver(model.encode()).solve()
+        return self
+
+    def execute_in(self, session):
+        self.result = session.get_solver(ClausesModel.encode).solve()
+        return self
+
+    def get_result(self):
+        return self.result
+
+    def is_valid(self):
+        return self.result
+
+
+class ClausesCoreFeatures(CoreFeatures):
+
+    def __init__(self):
+        self.result = []
+
+    def execute(self, model):
+        raise AssertionError('The operation must be executed in a session')
+
+    def execute_in(self, session):
+        solver = session.get_solver(ClausesModel.encode)
+        variables = solver.number_of_variables
+        self.result = [v for v in range(1, variables + 1) if not solver.solve([-v])]
+        return self
+
+    def get_result(self):
+        return self.result
+
+    def get_core_features(self):
+        return self.result
+
+
+class ClausesFeatureBackbone(FeatureBackbone):
+
+    def __init__(self):
+        super().__init__()
+
+    def encode(self, model):
+        return model.encode()
+
+    def get_optional_features(self, model):
+        return [('B', 'A'), ('C', 'A'), ('D', 'C')]
+
+
+class ClausesProductsNumber(ProductsNumber):
+
+    def __init__(self):
+        self.result = 0
+
+    def execute(self, model):
+        self.result = count_models(model.encode())
+        return self
+
+    def get_result(self):
+        return self.result
+
+    def get_products_number(self):
+        return self.result
+
+
+class ClausesVariability(CountingVariability):
+
+    def __init__(self):
+        super().__init__()
+
+    def get_features_number(self, model):
+        return 4
+
+    def get_products_number(self, model):
+        raise AssertionError('The count must be taken from ProductsNumber')
+
+
+class ManyFeaturesVariability(CountingVariability):
+    """ Model of independent optional features below a root """
+
+    def __init__(self):
+        super().__init__()
+
+    def get_features_number(self, model):
+        return 101
+
+    def get_products_number(self, model):
+        return 2 ** 100
+
+
+class ClausesDiagnosis(ConstraintsDiagnosis):
+
+    def __init__(self):
+        super().__init__()
+
+    # the first clause is the root, the rest are constraints named by their position
+    def get_background(self, model):
+        return model.clauses[:1]
+
+    def get_constraints(self, model):
+        return {f'c{index}': [clause] for index, clause in enumerate(model.clauses[1:], 1)}
+
+
+class ClausesSampling(UniformSampling):
+
+    def __init__(self):
+        super().__init__()
+
+    def encode(self, model):
+        return model.encode()
+
+
+class ClausesTWiseSampling(GreedyTWiseSampling):
+
+    def __init__(self):
+        super().__init__()
+
+    def encode(self, model):
+        return model.encode()
+
+
+class TestSampling:
+
+    def test_uniform_sampling(self):
+        # A is the root, B and C are optional, D is an optional child of C
+        model = ClausesModel([(1,), (-2, 1), (-3, 1), (-4, 3)])
+        operation = ClausesSampling()
+        operation.set_sample_size(600)
+        operation.set_seed(0)
+        sample = operation.execute(model).get_sample()
+        assert len(sample) == 600
+        products = {tuple(product) for product in sample}
+        assert products == {('A',), ('A', 'B'), ('A', 'C'), ('A', 'B', 'C'), ('A', 'C', 'D'),
+                            ('A', 'B', 'C', 'D')}
+        # the same seed gives the same sample
+        assert operation.get_sample() == sample
+
+    def test_void_model(self):
+        operation = ClausesSampling()
+        operation.set_sample_size(10)
+        assert operation.execute(ClausesModel([(1,), (-1,)])).get_sample() == []
+        with raises(ValueError):
+            operation.set_sample_size(-1)
+
+    def test_session(self):
+        plugin = Plugin(ModuleType('clauses_plugin'))
+        plugin.append_operation(ClausesSampling)
+        model = ClausesModel([(1,), (-2, 1), (-3, 1), (-4, 3)])
+        session = AnalysisSession(plugin, model)
+        assert all('A' in product for product in session.get_result('Sampling'))
+        operation = ClausesSampling()
+        operation.set_sample_size(5)
+        assert len(operation.execute_in(session).get_result()) == 5
+        assert model.encodings == 1
+
+    def test_pairwise_sampling(self):
+        # A is the root, B and C are optional, D is an optional child of C
+        model = ClausesModel([(1,), (-2, 1), (-3, 1), (-4, 3)])
+        session = AnalysisSession(Plugin(ModuleType('clauses_plugin')), model)
+        operation = ClausesTWiseSampling()
+        sample = operation.execute_in(session).get_sample()
+        for first, second in itertools.combinations('BCD', 2):
+            for selected in itertools.product((True, False), repeat=2):
+                # D requires C
+                if (first, second) != ('C', 'D') or selected != (False, True):
+                    assert any((first in product, second in product) == selected
+                               for product in sample)
+        with raises(ValueError):
+            operation.set_strength(0)
+
+
+class TestVariability:
+
+    def test_exact_variability(self):
+        operation = ManyFeaturesVariability().execute(None)
+        assert operation.get_exact_variability() == Fraction(2 ** 100, 2 ** 101 - 1)
+        assert operation.get_variability() == approx(0.5)
+
+    def test_session(self):
+        plugin = Plugin(ModuleType('clauses_plugin'))
+        plugin.append_operation(ClausesProductsNumber)
+        plugin.append_operation(ClausesVariability)
+        # A is the root, B and C are optional, D is an optional child of C
+        model = ClausesModel([(1,), (-2, 1), (-3, 1), (-4, 3)])
+        session = AnalysisSession(plugin, model)
+        assert session.use_operation('Variability').get_exact_variability() == Fraction(6, 15)
+
+
+class TestAnalysisSession:
+
+    def test_shared_solver(self):
+        plugin = Plugin(ModuleType('clauses_plugin'))
+        plugin.append_operation(ClausesValid)
+        plugin.append_operation(ClausesCoreFeatures)
+        model = ClausesModel([(1,), (-1, 2), (-3, 1), (3, 4)])
+
+        session = AnalysisSession(plugin, model)
+        assert session.get_result('Valid')
+        assert session.get_result('CoreFeatures') == [1, 2]
+        assert session.use_operation('Valid').is_valid()
+        assert model.encodings == 1
+
+        session.clear()
+        assert session.get_result('Valid')
+        assert model.encodings == 2
+
+    def test_feature_backbone(self):
+        plugin = Plugin(ModuleType('clauses_plugin'))
+        plugin.append_operation(ClausesValid)
+        plugin.append_operation(ClausesFeatureBackbone)
+        # A is the root, B and C are optional, D is an optional child of C; B requires C and
+        # D excludes A
+        model = ClausesModel([(1,), (-2, 1), (-3, 1), (-4, 3), (-2, 3), (-4, -1)])
+
+        session = AnalysisSession(plugin, model)
+        assert session.get_result('Valid')
+        assert session.use_operation('CoreFeatures').get_core_features() == ['A']
+        assert session.use_operation('DeadFeatures').get_dead_features() == ['D']
+        assert session.use_operation('FalseOptionalFeatures').get_false_optional_features() == []
+        assert session.use_operation('CoreFeatures') is session.use_operation('DeadFeatures')
+        assert model.encodings == 1
+
+        model.clauses.append((-1, 3))
+        assert ClausesFeatureBackbone().execute(model).get_result() == {
+            'core_features': ['A', 'C'],
+            'dead_features': ['D'],
+            'false_optional_features': ['C'],
+        }
+
+    def test_void_model(self):
+        model = ClausesModel([(1,), (-1,)])
+        operation = ClausesFeatureBackbone().execute(model)
+        assert operation.get_dead_features() == ['A', 'B', 'C', 'D']
+        assert operation.get_core_features() == []
+
+    def test_diagnosis(self):
+        plugin = Plugin(ModuleType('clauses_plugin'))
+        plugin.append_operation(ClausesDiagnosis)
+        # A is the root, A requires B, B excludes A and C is selected
+        model = ClausesModel([(1,), (-1, 2), (-2, -1), (3,)])
+
+        session = AnalysisSession(plugin, model)
+        operation = session.use_operation('ErrorDiagnosis')
+        assert operation.get_diagnoses() == [['c2']]
+        assert operation.get_diagnosis_messages() == ['Remove the constraints: c2']
+
+        operation = ClausesDiagnosis()
+        operation.set_options(number=3)
+        assert operation.execute_in(session).get_result() == [['c2'], ['c1']]
@@ -0,0 +1,26 @@
+from pytest import importorskip, raises
+
+np = importorskip('numpy')
+
+from famapy.core.models.product_matrix import ProductMatrix  # noqa: E402
+
+
+FEATURES = ['A', 'B', 'C']
+
+
+class TestProductMatrix:
+
+    def test_commonalities(self):
+        matrix = ProductMatrix.from_products([['A'], ['A', 'B'], ['A', 'C'], ['A', 'B']], FEATURES)
+        assert len(matrix) == 4
+        assert list(matrix.count_selections()) == [4, 2, 1]
+        assert matrix.get_commonalities() == {'A': 1.0, 'B': 0.5, 'C': 0.25}
+        assert matrix.get_commonalities(['C']) == {'C': 0.25}
+
+    def test_no_products(self):
+        matrix = ProductMatrix.from_products([], FEATURES)
+        assert matrix.get_commonalities(['A']) == {'A': 0.0}
+
+    def test_columns(self):
+        with raises(ValueError):
+            ProductMatrix(np.ones((2, 2)), FEATURES)
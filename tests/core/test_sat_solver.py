@@ -0,0 +1,125 @@
+import itertools
+import random
+
+from famapy.core.models.cnf import CNF
+from famapy.core.models.sat_solver import SATSolver, luby
+
+
+def solutions(clauses, variables):
+    for values in itertools.product([False, True], repeat=variables):
+        model = {variable if value else -variable for variable, value in enumerate(values, 1)}
+        if all(any(literal in model for literal in clause) for clause in clauses):
+            yield model
+
+
+def is_satisfiable(clauses, variables, assumptions=()):
+    for values in itertools.product([False, True], repeat=variables):
+        model = {variable if value else -variable for variable, value in enumerate(values, 1)}
+        if all(literal in model for literal in assumptions) and \
+                all(any(literal in model for literal in clause) for clause in clauses):
+            return True
+    return False
+
+
+class TestSATSolver:
+
+    def test_luby(self):
+        assert [luby(index) for index in range(10)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2]
+
+    def test_solve(self):
+        cnf = CNF()
+        cnf.add_clauses([(1,), (-1, 2), (-2, 3, 4), (-3, -4)])
+        solver = SATSolver(cnf)
+        assert solver.solve()
+        model = set(solver.get_model())
+        assert {1, 2} <= model and (3 in model) != (4 in model)
+
+    def test_assumptions(self):
+        cnf = CNF()
+        cnf.add_clauses([(-1, 2), (-2, 3)])
+        solver = SATSolver(cnf)
+        assert not solver.solve([1, -3])
+        # the assumptions do not stay in the solver
+        assert solver.solve([-3])
+        assert -1 in solver.get_model()
+        solver.add_clause([1])
+        assert not solver.solve([-3])
+        assert solver.solve()
+
+    def test_unknown_preferences(self):
+        cnf = CNF()
+        cnf.add_clauses([(-1, 2)])
+        solver = SATSolver(cnf)
+        # variables beyond the ones of the clauses are added as free variables
+        assert solver.solve([1], [-5, 4])
+        assert {1, 2, -5, 4} <= set(solver.get_model())
+        assert solver.get_implications([(1, 2), (5, 6)]) == [(1, 2)]
+
+    def test_unsatisfiable(self):
+        solver = SATSolver()
+        for clause in itertools.product([-1, 1], [-2, 2], [-3, 3]):
+            solver.add_clause(clause)
+        assert not solver.solve()
+
+    def test_random_formulas(self):
+        generator = random.Random(0)
+        for _ in range(300):
+            variables = generator.randint(1, 8)
+            solver = SATSolver()
+            solver.add_variables(variables)
+            clauses = []
+            for _ in range(3):
+                for _ in range(generator.randint(0, 2 * variables)):
+                    clause = [
+                        generator.choice([-1, 1]) * generator.randint(1, variables)
+                        for _ in range(generator.randint(1, 3))
+                    ]
+                    clauses.append(clause)
+                    solver.add_clause(clause)
+                assumptions = [
+                    generator.choice([-1, 1]) * generator.randint(1, variables)
+                    for _ in range(generator.randint(0, 2))
+                ]
+                satisfiable = solver.solve(assumptions)
+                assert satisfiable == is_satisfiable(clauses, variables, assumptions)
+                if satisfiable:
+                    model = set(solver.get_model())
+                    assert all(literal in model for literal in assumptions)
+                    assert all(any(literal in model for literal in clause) for clause in clauses)
+
+    def test_backbone(self):
+        generator = random.Random(1)
+        for _ in range(200):
+            variables = generator.randint(1, 7)
+            clauses = [
+                [generator.choice([-1, 1]) * generator.randint(1, variables)
+                 for _ in range(generator.randint(1, 3))]
+                for _ in range(generator.randint(0, 2 * variables))
+            ]
+            models = list(solutions(clauses, variables))
+            solver = SATSolver()
+            solver.add_variables(variables)
+            for clause in clauses:
+                solver.add_clause(clause)
+
+            backbone = set(solver.get_backbone())
+            expected = set.intersection(*models) if models else set()
+            assert backbone == expected
+
+            pairs = [(condition, literal)
+                     for condition in range(-variables, variables + 1) if condition
+                     for literal in range(-variables, variables + 1) if literal]
+            implied = set(solver.get_implications(pairs))
+            assert implied == {
+                (condition, literal) for condition, literal in pairs
+                if all(literal in model for model in models if condition in model)
+            }
+
+    def test_propagated(self):
+        cnf = CNF()
+        cnf.add_clauses([(1,), (-2, 3), (-3, 4), (-4, -5)])
+        solver = SATSolver(cnf)
+        assert set(solver.get_propagated([2])) == {1, 2, 3, 4, -5}
+        assert solver.get_propagated([2, 5]) is None
+        assert solver.get_propagated([-1]) is None
+        assert solver.solve([2])